@@ -4,9 +4,11 @@ from pydantic import BaseModel, Field
 from typing import Any, Dict, Optional
 from datetime import datetime
 
-from app.core.services.risk_service import run_risk_engine_v14
+from app.core.services.risk_service import run_risk_engine_v14_cached
+from app.core.utils.logger import get_logger
 
 router = APIRouter()
+logger = get_logger("http", "api")
 
 # Store last result
 LAST_RESULT: Optional[Dict[str, Any]] = None
@@ -84,6 +86,8 @@ class Shipment(BaseModel):
     # === PRIORITY PROFILE FIELDS =====================================
     priority_profile: Optional[str] = Field(default=None)
     priority_weights: Optional[Dict[str, int]] = Field(default=None)
+    # === REPRODUCIBILITY ==============================================
+    seed: Optional[int] = Field(default=None)
 
 
 @router.post("/analyze")
@@ -99,7 +103,7 @@ async def analyze(shipment: Shipment):
     try:
         # Convert Shipment to dict for engine
         shipment_dict = shipment.model_dump()
-        result = run_risk_engine_v14(shipment_dict)
+        result = await run_risk_engine_v14_cached(shipment_dict)
         
         # Add shipment data to result for dashboard display
         result['shipment'] = {
@@ -162,10 +166,10 @@ async def analyze(shipment: Shipment):
         }
 
         return response_payload
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"[API ERROR] Analysis failed: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.error("Analysis failed: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Risk engine failed: {str(e)}")
 
 
@@ -245,7 +249,8 @@ async def run_analysis(request: Request):
             "buyer": payload.get("buyer"),
             "seller": payload.get("seller"),
             "priority_profile": payload.get("priority_profile"),
-            "priority_weights": payload.get("priority_weights")
+            "priority_weights": payload.get("priority_weights"),
+            "seed": payload.get("seed")
         }
         
         # Save to session for overview page
@@ -257,10 +262,10 @@ async def run_analysis(request: Request):
         # Run analysis using existing analyze function
         return await analyze(shipment)
         
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"[API ERROR] run_analysis failed: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.error("run_analysis failed: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Risk analysis failed: {str(e)}")
 
 
@@ -1,6 +1,7 @@
 # app/api/__init__.py
 from fastapi import APIRouter, Request
 from .v1.analyze import router as analyze_router
+from .v1.risk_routes import router as risk_router
 from datetime import datetime
 
 # Create main API router
@@ -8,6 +9,7 @@ router = APIRouter()
 
 # Include v1 router
 router.include_router(analyze_router, prefix="/v1", tags=["v1"])
+router.include_router(risk_router, prefix="/v1", tags=["v1"])
 
 # Climate Data Endpoint
 @router.post("/climate_data")
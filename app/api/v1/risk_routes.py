@@ -3,20 +3,22 @@ RISKCAST API v1 - Risk Routes
 Risk analysis endpoints
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
 from datetime import datetime
+import json
 
-from app.core.services.risk_service import run_risk_engine_v14
-from app.core.engine_v2.risk_pipeline import RiskPipeline
+from app.core.services.risk_service import run_risk_engine_v14_cached
+from app.core.engine_v2.risk_pipeline import get_risk_pipeline
 from app.core.scenario_engine.simulation_engine import SimulationEngine
 from app.core.scenario_engine.delta_engine import DeltaEngine
 from app.core.scenario_engine.scenario_store import ScenarioStore
 from app.core.scenario_engine.presets import ScenarioPresets
 from app.core.engine_v2.llm_reasoner import LLMReasoner
-from app.core.report.pdf_builder import PDFReportBuilder
-from fastapi.responses import Response, StreamingResponse  # type: ignore
+from app.core.services.report_jobs import ReportBusyError, ReportJob, report_jobs
+from app.core.services.batch_jobs import BatchBusyError, BatchJob, batch_jobs, detect_format
+from fastapi.responses import JSONResponse, Response, StreamingResponse  # type: ignore
 
 router = APIRouter()
 
@@ -24,7 +26,7 @@ router = APIRouter()
 simulation_engine = SimulationEngine()
 delta_engine = DeltaEngine()
 scenario_store = ScenarioStore()
-llm_reasoner = LLMReasoner(use_llm=True)
+llm_reasoner = LLMReasoner()
 
 
 class ShipmentModel(BaseModel):
@@ -69,6 +71,8 @@ class ShipmentModel(BaseModel):
     priority_weights: Optional[Dict[str, int]] = None
     # Multi-language support
     language: Optional[str] = "en"  # Language code: vi, en, zh
+    # Optional seed for reproducible Monte Carlo results
+    seed: Optional[int] = None
 
 
 @router.post("/risk/analyze")
@@ -78,11 +82,13 @@ async def analyze_risk(shipment: ShipmentModel):
     """
     try:
         shipment_dict = shipment.model_dump()
-        result = run_risk_engine_v14(shipment_dict)
+        result = await run_risk_engine_v14_cached(shipment_dict)
         return {
             "status": "success",
             "result": result
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Risk analysis failed: {str(e)}")
 
@@ -124,7 +130,7 @@ async def analyze_risk_v2(shipment: ShipmentModel):
         shipment_dict.pop("language", None)
         
         # Initialize pipeline
-        pipeline = RiskPipeline()
+        pipeline = get_risk_pipeline()
         
         # Run analysis with language support
         result = await pipeline.run(shipment_dict, language=language)
@@ -139,6 +145,55 @@ async def analyze_risk_v2(shipment: ShipmentModel):
         raise HTTPException(status_code=500, detail=f"Risk analysis v2 failed: {str(e)}")
 
 
+class RankRequest(BaseModel):
+    """Request model for candidate ranking"""
+    candidates: List[Dict[str, Any]]  # Candidate shipments (carrier × route × container)
+    top_k: Optional[int] = None  # Return only the best k candidates
+
+
+@router.post("/risk/v2/rank")
+async def rank_candidates_v2(request: RankRequest):
+    """
+    Rank candidate shipments with Engine v2 (FAHP + batch TOPSIS)
+    
+    All candidates share one FAHP weight solve and are scored in a single
+    vectorized TOPSIS pass over the criteria that differ between them
+    (risk context, region-adjusted port/climate, network risk of the
+    carrier and ports, transit time, optional cost); closeness is relative
+    to the candidate set.
+    
+    Request Body:
+    - candidates: List of shipment dicts (route, pol, pod, carrier,
+      transit_time, carrier_rating, container_match, optional id and
+      cost/freight_cost/price)
+    - top_k: Optional number of candidates to return
+    
+    Returns ranked list (rank 1 = best) with closeness scores. Equal
+    candidates share a rank ("tied"); when no criterion differs, all are
+    tied at rank 1 with closeness null.
+    """
+    if not request.candidates:
+        raise HTTPException(status_code=400, detail="At least one candidate is required")
+    
+    try:
+        pipeline = get_risk_pipeline()
+        ranked = pipeline.rank_alternatives(request.candidates)
+        
+        if request.top_k is not None:
+            ranked = ranked[:max(request.top_k, 0)]
+        
+        return {
+            "status": "success",
+            "engine_version": "v2",
+            "method": "fahp_topsis",
+            "candidate_count": len(request.candidates),
+            "criteria": list(ranked[0]["criteria"]) if ranked else [],
+            "ranking": ranked
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Candidate ranking failed: {str(e)}")
+
+
 def extract_origin_from_route(route: str) -> str:
     """Extract origin port code from route string"""
     if not route:
@@ -250,6 +305,8 @@ class SaveScenarioRequest(BaseModel):
     result: Optional[Dict[str, Any]] = None
     baseline_score: Optional[float] = None
     description: Optional[str] = None
+    tags: Optional[List[str]] = None
+    owner: Optional[str] = None
 
 
 @router.post("/risk/v2/simulation/save")
@@ -261,7 +318,9 @@ async def save_scenario(request: SaveScenarioRequest):
             adjustments=request.adjustments,
             result=request.result,
             baseline_score=request.baseline_score,
-            description=request.description
+            description=request.description,
+            tags=request.tags,
+            owner=request.owner
         )
         
         if not success:
@@ -297,14 +356,19 @@ async def load_scenario(name: str):
 
 
 @router.get("/risk/v2/simulation/list")
-async def list_scenarios():
-    """List all saved scenarios"""
+async def list_scenarios(limit: Optional[int] = None,
+                         offset: int = 0,
+                         tag: Optional[str] = None,
+                         owner: Optional[str] = None):
+    """List saved scenarios (paginated, optional tag/owner filter)"""
     try:
-        scenarios = scenario_store.list_scenarios()
+        scenarios = scenario_store.list_scenarios(limit=limit, offset=offset, tag=tag, owner=owner)
         
         return {
             "status": "success",
             "count": len(scenarios),
+            "total": scenario_store.get_scenario_count(tag=tag, owner=owner),
+            "offset": offset,
             "scenarios": scenarios
         }
     except Exception as e:
@@ -431,6 +495,52 @@ class PDFReportRequest(BaseModel):
     scenario_comparisons: Optional[List[Dict[str, Any]]] = None
     charts: Optional[Dict[str, str]] = None  # Base64 chart images
     route: Optional[str] = None
+    language: str = "en"  # en, vi, zh
+    layout: str = "letter"  # letter, a4
+
+
+def _report_data(request: PDFReportRequest) -> Dict[str, Any]:
+    """Report data dictionary for PDFReportBuilder"""
+    return {
+        "risk_score": request.risk_score,
+        "risk_level": request.risk_level,
+        "confidence": request.confidence,
+        "profile": request.profile,
+        "matrix": request.matrix,
+        "factors": request.factors,
+        "drivers": request.drivers or [],
+        "recommendations": request.recommendations or [],
+        "timeline": request.timeline or [],
+        "network": request.network or {},
+        "scenario_comparisons": request.scenario_comparisons or [],
+        "charts": request.charts or {},
+        "route": request.route or "Unknown Route",
+    }
+
+
+def _submit_report_job(request: PDFReportRequest) -> ReportJob:
+    """Submit a report job, mapping validation/backpressure errors to HTTP"""
+    try:
+        return report_jobs.submit(_report_data(request), language=request.language, layout=request.layout)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ReportBusyError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+
+
+def _pdf_response(job: ReportJob) -> Response:
+    """Serve a finished job's PDF from the render cache (410 once it has left the cache)"""
+    pdf = report_jobs.get_pdf(job)
+    if pdf is None:
+        raise HTTPException(status_code=410, detail="Rendered report expired from the cache, submit it again")
+    return Response(
+        content=pdf,
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": "attachment; filename=riskcast_report.pdf",
+            "Content-Type": "application/pdf"
+        }
+    )
 
 
 @router.post("/risk/v2/report/pdf")
@@ -438,47 +548,184 @@ async def generate_pdf_report(request: PDFReportRequest):
     """
     Generate enterprise PDF report
     
+    Renders in the report worker pool (the event loop is not blocked) and
+    waits for the result; identical requests are served from the PDF cache.
+    Use /risk/v2/report/jobs to submit and poll instead of waiting.
+    
     Input:
     - Risk assessment data
     - Chart images as base64 strings
+    - Optional language (en, vi, zh) and layout (letter, a4)
     
     Returns:
     - PDF file as downloadable response
     """
+    job = _submit_report_job(request)
+    await report_jobs.wait(job)
+    
+    if job.status != "done":
+        raise HTTPException(status_code=500, detail=f"PDF generation failed: {job.error}")
+    return _pdf_response(job)
+
+
+@router.post("/risk/v2/report/jobs", status_code=202)
+async def submit_report_job(request: PDFReportRequest, http_request: Request):
+    """
+    Submit a PDF report job
+    
+    Returns immediately with a job id; poll status_url until status is
+    "done", then fetch download_url.
+    """
+    job = _submit_report_job(request)
+    status_url = f"{http_request.url.path.rstrip('/')}/{job.job_id}"
+    return {
+        **job.to_dict(),
+        "status_url": status_url,
+        "download_url": f"{status_url}/pdf",
+    }
+
+
+@router.get("/risk/v2/report/jobs/{job_id}")
+async def get_report_job(job_id: str):
+    """Report job status"""
+    job = report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Report job '{job_id}' not found")
+    return job.to_dict()
+
+
+@router.get("/risk/v2/report/jobs/{job_id}/pdf")
+async def download_report_job(job_id: str):
+    """
+    Download a finished report
+    
+    Returns 409 while the job is pending, 500 if rendering failed and 410
+    once the rendered PDF has expired from the report cache.
+    """
+    job = report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Report job '{job_id}' not found")
+    if job.status == "pending":
+        raise HTTPException(status_code=409, detail="Report is still rendering", headers={"Retry-After": "2"})
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=f"PDF generation failed: {job.error}")
+    return _pdf_response(job)
+
+
+# ============================
+# BATCH SCORING
+# ============================
+
+def _batch_shipment_model():
+    """Option A Shipment schema (app/api.py) used to validate batch rows"""
+    from app.legacy_api import load_legacy_api
+    return load_legacy_api().Shipment
+
+
+def _get_batch_job(job_id: str) -> BatchJob:
+    job = batch_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Batch job '{job_id}' not found")
+    return job
+
+
+def _ndjson_response(job: BatchJob, offset: int = 0,
+                     prelude: Optional[Dict[str, Any]] = None,
+                     headers: Optional[Dict[str, str]] = None) -> StreamingResponse:
+    """Stream a job's records from ``offset`` as NDJSON until the job ends"""
+    async def body():
+        if prelude is not None:
+            yield json.dumps(prelude, default=str) + "\n"
+        async for record in batch_jobs.follow(job, offset):
+            yield json.dumps(record, default=str) + "\n"
+
+    return StreamingResponse(body(), media_type="application/x-ndjson", headers=headers)
+
+
+@router.post("/risk/batch")
+async def submit_batch(
+    http_request: Request,
+    fmt: Optional[str] = Query(None, alias="format"),
+    stream: bool = True
+):
+    """
+    Score a portfolio of shipments from a CSV or NDJSON file
+    
+    The file is sent as the request body or as the "file" field of a
+    multipart upload; the format comes from ?format=csv|ndjson, else the
+    content type / file name. Every row is validated with the Shipment
+    model; valid rows are scored with bounded parallelism.
+    
+    Returns (stream=true, default):
+    - NDJSON stream: a "job" record, then one "result" or "error" record per
+      row as it completes, then a "summary" record (risk level distribution,
+      total expected loss, worst shipments)
+    
+    Returns (stream=false):
+    - 202 with the job id, status_url and results_url
+    
+    Scoring continues if the client disconnects; GET results_url?offset=N
+    resumes the stream from record seq N.
+    """
+    content_type = http_request.headers.get("content-type", "")
+    filename = None
+    if content_type.startswith("multipart/form-data"):
+        form = await http_request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Multipart upload needs a 'file' field")
+        data = await upload.read()
+        filename = upload.filename
+        content_type = upload.content_type or ""
+    else:
+        data = await http_request.body()
+    
     try:
-        # Initialize PDF builder
-        pdf_builder = PDFReportBuilder()
-        
-        # Prepare report data
-        report_data = {
-            "risk_score": request.risk_score,
-            "risk_level": request.risk_level,
-            "confidence": request.confidence,
-            "profile": request.profile,
-            "matrix": request.matrix,
-            "factors": request.factors,
-            "drivers": request.drivers or [],
-            "recommendations": request.recommendations or [],
-            "timeline": request.timeline or [],
-            "network": request.network or {},
-            "scenario_comparisons": request.scenario_comparisons or [],
-            "charts": request.charts or {},
-            "route": request.route or "Unknown Route",
-        }
-        
-        # Generate PDF
-        pdf_buffer = pdf_builder.generate_report(report_data)
-        
-        # Create response
-        return StreamingResponse(
-            pdf_buffer,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": "attachment; filename=riskcast_report.pdf",
-                "Content-Type": "application/pdf"
-            }
+        job = batch_jobs.submit(
+            data,
+            (fmt or detect_format(content_type, filename)).lower(),
+            _batch_shipment_model(),
+            source=filename or "upload"
         )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"PDF generation failed: {str(e)}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except BatchBusyError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    
+    status_url = f"{http_request.url.path.rstrip('/')}/{job.job_id}"
+    links = {"status_url": status_url, "results_url": f"{status_url}/results"}
+    if not stream:
+        return JSONResponse(status_code=202, content={**job.to_dict(), **links})
+    return _ndjson_response(
+        job,
+        prelude={"type": "job", **job.to_dict(), **links},
+        headers={"X-Batch-Job-Id": job.job_id, "Location": status_url}
+    )
+
+
+@router.get("/risk/batch/{job_id}")
+async def get_batch_job(job_id: str):
+    """Batch job progress (and the summary once finished)"""
+    job = _get_batch_job(job_id)
+    status = job.to_dict()
+    if job.finished_at is not None:
+        status["summary"] = job.lines[-1]
+    return status
+
+
+@router.get("/risk/batch/{job_id}/results")
+async def stream_batch_results(job_id: str, offset: int = 0):
+    """
+    Stream a batch job's records as NDJSON, starting at record seq ``offset``
+    
+    Follows a running job until its summary record is sent.
+    """
+    return _ndjson_response(_get_batch_job(job_id), offset)
+
 
+@router.delete("/risk/batch/{job_id}")
+async def cancel_batch_job(job_id: str):
+    """Stop a running batch job; rows already scored stay available"""
+    job = _get_batch_job(job_id)
+    batch_jobs.cancel(job)
+    return job.to_dict()
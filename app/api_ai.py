@@ -3,15 +3,16 @@ RISKCAST Enterprise AI - AI API Endpoints
 6 Core AI endpoints with Claude 3.5 Sonnet integration
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from anthropic import Anthropic
 from dotenv import load_dotenv
+import asyncio
 import os
 import json
-from typing import Dict, Optional, AsyncGenerator, Any
+from typing import Dict, Optional, AsyncGenerator, AsyncIterator, Any
 
+from app.core.services.llm_gateway import llm_gateway, LLMTimeoutError, LLMUnavailableError
 from app.risk_engine import (
     compute_overall_risk,
     compute_route_risk,
@@ -22,8 +23,11 @@ from app.risk_engine import (
 )
 from app.memory import memory_system
 from app.core.utils.validators import sanitize_input, validate_shipment_data, build_ai_prompt
+from app.core.utils.logger import get_logger
 from pathlib import Path
 
+logger = get_logger("ai")
+
 # ===============================
 # ENV LOADER - Load .env file
 # ===============================
@@ -39,7 +43,7 @@ if env_file.exists():
     # Force reload to ensure we get the latest values
     load_dotenv(env_file, override=True)
     env_loaded = True
-    print(f"[API_AI] Checking .env at: {env_file}")
+    logger.debug("Checking .env at: %s", env_file)
     
     # Validate .env file content and manually load if needed
     try:
@@ -58,16 +62,16 @@ if env_file.exists():
                 continue
         
         if not env_content:
-            print(f"[API_AI] [ERROR] Could not read .env file with any encoding!")
+            logger.error("Could not read .env file with any encoding")
             raise Exception("Failed to read .env file")
         
         if used_encoding != 'utf-8':
-            print(f"[API_AI] [INFO] Read .env file with encoding: {used_encoding}")
+            logger.info("Read .env file with encoding: %s", used_encoding)
         
         has_key_line = 'ANTHROPIC_API_KEY' in env_content
         if not has_key_line:
-            print(f"[API_AI] [ERROR] File .env exists but does not contain 'ANTHROPIC_API_KEY' line!")
-            print(f"[API_AI] [ERROR] Please add this line to .env file: ANTHROPIC_API_KEY=your_key_here")
+            logger.error("File .env exists but does not contain an ANTHROPIC_API_KEY line; "
+                         "add ANTHROPIC_API_KEY=your_key_here")
         else:
             # Check if key has a value (not just the variable name)
             lines = env_content.split('\n')
@@ -83,35 +87,31 @@ if env_file.exists():
             
             if key_line:
                 if '=' not in key_line:
-                    print(f"[API_AI] [ERROR] ANTHROPIC_API_KEY line exists but has no '=' sign!")
-                    print(f"[API_AI] [ERROR] Current line: {key_line[:50]}...")
-                    print(f"[API_AI] [ERROR] Format should be: ANTHROPIC_API_KEY=your_actual_key")
+                    logger.error("ANTHROPIC_API_KEY line in .env has no '=' sign; "
+                                 "format should be ANTHROPIC_API_KEY=your_actual_key")
                 else:
                     parts = key_line.split('=', 1)
                     key_value = parts[1].strip() if len(parts) > 1 else ''
                     if not key_value:
-                        print(f"[API_AI] [ERROR] ANTHROPIC_API_KEY line exists but has no value!")
-                        print(f"[API_AI] [ERROR] Current line: {key_line[:50]}...")
-                        print(f"[API_AI] [ERROR] Format should be: ANTHROPIC_API_KEY=your_actual_key")
+                        logger.error("ANTHROPIC_API_KEY line in .env has no value; "
+                                     "format should be ANTHROPIC_API_KEY=your_actual_key")
                     else:
                         # Always manually set to ensure it's loaded (fallback if dotenv fails)
                         os.environ["ANTHROPIC_API_KEY"] = key_value
-                        print(f"[API_AI] [INFO] Loaded ANTHROPIC_API_KEY from .env file (length: {len(key_value)})")
+                        logger.info("Loaded ANTHROPIC_API_KEY from .env file")
     except Exception as e:
-        print(f"[API_AI] [WARNING] Could not validate/load .env file content: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.warning("Could not validate/load .env file content: %s", e, exc_info=True)
 else:
     # Try loading from current directory
     current_env = Path(".env")
     if current_env.exists():
         load_dotenv(".env", override=True)
         env_loaded = True
-        print(f"[API_AI] Checking .env at current directory: {current_env.absolute()}")
+        logger.debug("Loaded .env from current directory: %s", current_env.absolute())
     else:
         # Fallback: try to load from any location
         load_dotenv(override=False)
-        print(f"[API_AI] .env file not found at expected locations. Using existing environment variables.")
+        logger.debug(".env file not found at expected locations; using existing environment variables")
 
 router = APIRouter()
 
@@ -122,37 +122,56 @@ api_key_after_load = ANTHROPIC_API_KEY
 
 if not ANTHROPIC_API_KEY:
     ANTHROPIC_API_KEY = "dummy"
-    print(f"[API_AI] [WARNING] ANTHROPIC_API_KEY not found in environment variables")
-    print(f"[API_AI] [DEBUG] Key before load: {bool(api_key_before_load)}, after load: {bool(api_key_after_load)}")
-    print(f"[API_AI] [DEBUG] env_file.exists(): {env_file.exists() if env_file else False}")
-    print(f"[API_AI] [DEBUG] Current working directory: {os.getcwd()}")
+    logger.warning("ANTHROPIC_API_KEY not found in environment variables")
+    logger.debug("Key before load: %s, after load: %s, .env exists: %s, cwd: %s",
+                 bool(api_key_before_load), bool(api_key_after_load), env_file.exists(), os.getcwd())
     if env_file.exists():
-        print(f"[API_AI] [ACTION REQUIRED] Please check your .env file and ensure it contains:")
-        print(f"[API_AI] [ACTION REQUIRED] ANTHROPIC_API_KEY=sk-ant-REDACTED")
-        print(f"[API_AI] [ACTION REQUIRED] Get key from: https://console.anthropic.com/")
+        logger.warning("Check that .env contains ANTHROPIC_API_KEY=sk-ant-REDACTED "
+                       "(get a key from https://console.anthropic.com/)")
 else:
-    print(f"[API_AI] [INFO] ANTHROPIC_API_KEY found (length: {len(ANTHROPIC_API_KEY)})")
+    logger.debug("ANTHROPIC_API_KEY found")
 
-# Validate and initialize client
-if (ANTHROPIC_API_KEY and 
+# Validate key (the Anthropic SDK is imported on first use in get_client(), not at startup;
+# requests go through llm_gateway, which imports it lazily as well)
+API_KEY_CONFIGURED = bool(
+    ANTHROPIC_API_KEY and 
     ANTHROPIC_API_KEY != "your_anthropic_api_key_here" and 
     ANTHROPIC_API_KEY != "dummy" and 
-    len(ANTHROPIC_API_KEY) > 20):
-    try:
-        client = Anthropic(api_key=ANTHROPIC_API_KEY)
-        print(f"[INFO] Anthropic client initialized (API key configured, length: {len(ANTHROPIC_API_KEY)})")
-    except Exception as e:
-        client = None
-        print(f"[ERROR] Failed to initialize Anthropic client: {str(e)}")
-        print("[WARNING] AI features will not work.")
-else:
-    client = None
+    len(ANTHROPIC_API_KEY) > 20
+)
+if not API_KEY_CONFIGURED:
     if ANTHROPIC_API_KEY != "dummy":
-        print(f"[WARNING] ANTHROPIC_API_KEY not configured properly. Current value: '{ANTHROPIC_API_KEY[:20] if len(ANTHROPIC_API_KEY) > 20 else ANTHROPIC_API_KEY}...'")
-        print("[WARNING] Please set ANTHROPIC_API_KEY in .env file with a valid key (length > 20)")
+        logger.warning("ANTHROPIC_API_KEY is not configured properly; "
+                       "set a valid key (length > 20) in .env")
     else:
-        print("[WARNING] ANTHROPIC_API_KEY not set. AI features will not work.")
-        print("[WARNING] Please set ANTHROPIC_API_KEY in .env file")
+        logger.warning("ANTHROPIC_API_KEY not set; AI features will not work until it is set in .env")
+
+_client = None
+
+
+def get_client():
+    """
+    Synchronous Anthropic client, created on first use
+    
+    Returns:
+        anthropic.Anthropic, or None if the key is missing/invalid or the SDK fails to load
+    """
+    global _client
+    if _client is None and API_KEY_CONFIGURED:
+        try:
+            from anthropic import Anthropic
+            _client = Anthropic(api_key=ANTHROPIC_API_KEY)
+            logger.info("Anthropic client initialized")
+        except Exception as e:
+            logger.error("Failed to initialize Anthropic client, AI features will not work: %s", e)
+    return _client
+
+
+def __getattr__(name: str):
+    # `api_ai.client` used to be created at import time
+    if name == "client":
+        return get_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # ==================== PROMPT TEMPLATES ====================
@@ -286,7 +305,7 @@ Format as comparative analysis."""
 
 def _check_api_key_configured():
     """Check if API key is properly configured and return error message if not"""
-    if not client:
+    if not llm_gateway.available:
         error_msg = "ANTHROPIC_API_KEY not configured. Please set ANTHROPIC_API_KEY in your .env file at the project root."
         if not ANTHROPIC_API_KEY or ANTHROPIC_API_KEY == "dummy":
             error_msg += " The API key was not found in environment variables."
@@ -298,13 +317,23 @@ def _check_api_key_configured():
     return True, None
 
 
+async def _llm_complete(prompt: str, system: str) -> str:
+    """Await a completion from the shared LLM gateway, mapping gateway errors to HTTP"""
+    try:
+        return await llm_gateway.complete(prompt, system=system, max_tokens=4096)
+    except LLMTimeoutError as e:
+        raise HTTPException(status_code=504, detail=f"Claude API timeout: {str(e)}")
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=f"AI service is not available: {str(e)}")
+
+
 async def _call_claude(
     prompt: str,
     stream: bool = False,
     user_question: Optional[str] = None
 ) -> Any:
     """Call Claude API with question-focused system prompt"""
-    if not client:
+    if not llm_gateway.available:
         raise HTTPException(
             status_code=500,
             detail="AI service is not available. Please contact support."
@@ -342,22 +371,12 @@ IMPORTANT: Always respond in Vietnamese (Tiếng Việt). All your responses mus
     try:
         from anthropic import APIError
         if stream:
-            # For streaming, we'll handle it differently
-            response = client.messages.stream(
-                model="claude-3-haiku-20240307",
-                max_tokens=4096,
-                system=system_instruction,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            return response
+            # Async chunk iterator; relay with _stream_response()
+            return llm_gateway.stream(prompt, system=system_instruction, max_tokens=4096)
         else:
-            response = client.messages.create(
-                model="claude-3-haiku-20240307",
-                max_tokens=4096,
-                system=system_instruction,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            return response.content[0].text
+            return await _llm_complete(prompt, system_instruction)
+    except HTTPException:
+        raise
     except APIError as e:
         raise HTTPException(
             status_code=e.status_code if hasattr(e, 'status_code') else 500,
@@ -370,106 +389,134 @@ IMPORTANT: Always respond in Vietnamese (Tiếng Việt). All your responses mus
         )
 
 
-async def _stream_response(stream_manager) -> AsyncGenerator[str, None]:
-    """Stream Claude response using MessageStreamManager"""
-    import traceback
-    import asyncio
-    from queue import Queue, Empty
+# Concurrent SSE streams allowed per client (extra requests get 429)
+MAX_STREAMS_PER_CLIENT = int(os.getenv("AI_STREAMS_PER_CLIENT", "3"))
+# Seconds of upstream silence before a heartbeat comment is sent
+STREAM_HEARTBEAT_INTERVAL = float(os.getenv("AI_STREAM_HEARTBEAT", "15"))
+
+INVALID_API_KEY_MESSAGE = "Invalid API key. Please check your ANTHROPIC_API_KEY in .env file. Get a new key from https://console.anthropic.com/"
+
+# Active stream count per client key
+_active_streams: Dict[str, int] = {}
+
+
+def _stream_client_key(http_request: Request) -> str:
+    """Identify the client owning a stream (same rules as the rate limiter)"""
+    from app.core.utils.rate_limiter import rate_limiter
+    return rate_limiter.get_client_ip(http_request)
+
+
+def _check_stream_capacity(client_key: str) -> None:
+    """Reject a new stream early when the client already holds the maximum"""
+    if _active_streams.get(client_key, 0) >= MAX_STREAMS_PER_CLIENT:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Too many concurrent AI streams (maximum {MAX_STREAMS_PER_CLIENT} per client). Close an open stream and retry.",
+            headers={"Retry-After": "5"}
+        )
+
+
+def _stream_error_message(error: Exception) -> str:
+    """User-facing message for an upstream streaming error"""
+    from anthropic import APIError
+    error_msg = str(error)
+    if getattr(error, 'status_code', None) == 401 or "401" in error_msg or "authentication_error" in error_msg or "invalid x-api-key" in error_msg.lower():
+        return INVALID_API_KEY_MESSAGE
+    if isinstance(error, APIError):
+        return f'Anthropic API error: {error_msg}'
+    return f'Stream error: {error_msg}'
+
+
+async def _pump_chunks(chunks: AsyncIterator[str], queue: "asyncio.Queue") -> None:
+    """Feed upstream chunks into the queue; always ends with a ("done"|"error", ...) item"""
     try:
-        from anthropic import APIError
-        
-        if not stream_manager:
-            yield f"data: {json.dumps({'error': 'No response stream available'})}\n\n"
+        async for text_chunk in chunks:
+            if text_chunk:
+                await queue.put(("chunk", text_chunk))
+        await queue.put(("done", None))
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        await queue.put(("error", e))
+    finally:
+        # Close upstream in the task that iterated it (releases connection and gateway slot)
+        aclose = getattr(chunks, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+async def _stream_response(chunks: AsyncIterator[str],
+                           http_request: Optional[Request] = None,
+                           client_key: Optional[str] = None) -> AsyncGenerator[str, None]:
+    """
+    Relay an async chunk iterator as Server-Sent Events
+    
+    A single pump task reads the upstream iterator into an asyncio.Queue and
+    this generator awaits the queue directly (no polling). A heartbeat comment
+    is sent after STREAM_HEARTBEAT_INTERVAL seconds of silence, and the pump
+    is cancelled - closing the upstream stream - as soon as the client
+    disconnects.
+    
+    Args:
+        chunks: Text chunks, e.g. from llm_gateway.stream()
+        http_request: Request used to detect client disconnects
+        client_key: Client the stream counts against (None = uncapped)
+    """
+    if client_key is not None:
+        # Re-check at start: several requests may have passed the early check together
+        if _active_streams.get(client_key, 0) >= MAX_STREAMS_PER_CLIENT:
+            yield f"data: {json.dumps({'error': f'Too many concurrent AI streams (maximum {MAX_STREAMS_PER_CLIENT} per client)'})}\n\n"
             return
-        
-        # MessageStreamManager uses synchronous context manager (with, not async with)
-        # Use a queue to bridge sync iterator to async generator for real-time streaming
-        queue = Queue()
-        stream_state = {'done': False, 'error': None}
-        
-        def process_stream_sync():
-            """Process stream synchronously and put chunks in queue"""
+        _active_streams[client_key] = _active_streams.get(client_key, 0) + 1
+    
+    queue: asyncio.Queue = asyncio.Queue(maxsize=256)
+    pump = asyncio.create_task(_pump_chunks(chunks, queue))
+    try:
+        while True:
             try:
-                from anthropic import APIError
-                with stream_manager as stream:
-                    # stream.text_stream is a synchronous iterator
-                    for text_chunk in stream.text_stream:
-                        if text_chunk:
-                            queue.put(('chunk', text_chunk))
-                    queue.put(('done', None))
-                    stream_state['done'] = True
-            except APIError as api_error:
-                # Handle Anthropic API errors specifically
-                error_detail = str(api_error)
-                if hasattr(api_error, 'status_code') and api_error.status_code == 401:
-                    error_detail = "Invalid API key. Please check your ANTHROPIC_API_KEY in .env file. Get a new key from https://console.anthropic.com/"
-                elif "401" in error_detail or "authentication_error" in error_detail or "invalid x-api-key" in error_detail.lower():
-                    error_detail = "Invalid API key. Please check your ANTHROPIC_API_KEY in .env file. Get a new key from https://console.anthropic.com/"
-                stream_state['error'] = error_detail
-                queue.put(('error', error_detail))
-                stream_state['done'] = True
-            except Exception as e:
-                stream_state['error'] = str(e)
-                queue.put(('error', str(e)))
-                stream_state['done'] = True
-        
-        # Start stream processing in executor
-        loop = asyncio.get_event_loop()
-        executor_task = loop.run_in_executor(None, process_stream_sync)
-        
-        # Yield chunks as they arrive
-        try:
-            while not stream_state['done'] or not queue.empty():
-                try:
-                    # Try to get item from queue (non-blocking)
-                    item_type, item_data = queue.get_nowait()
-                    
-                    if item_type == 'chunk':
-                        yield f"data: {json.dumps({'text': item_data})}\n\n"
-                    elif item_type == 'done':
-                        yield "data: [DONE]\n\n"
-                        break
-                    elif item_type == 'error':
-                        # Parse error to provide better message
-                        error_data = item_data
-                        if "401" in error_data or "authentication_error" in error_data or "invalid x-api-key" in error_data.lower():
-                            error_data = "Invalid API key. Please check your ANTHROPIC_API_KEY in .env file. Get a new key from https://console.anthropic.com/"
-                        raise Exception(error_data)
-                        
-                except Empty:
-                    # Queue is empty, wait a bit and check again
-                    await asyncio.sleep(0.05)
-                    # Check if executor is done and queue is still empty
-                    if executor_task.done() and queue.empty():
-                        if stream_state['error']:
-                            error_msg = stream_state['error']
-                            # Improve error message for authentication errors
-                            if "401" in error_msg or "authentication_error" in error_msg or "invalid x-api-key" in error_msg.lower():
-                                error_msg = "Invalid API key. Please check your ANTHROPIC_API_KEY in .env file. Get a new key from https://console.anthropic.com/"
-                            raise Exception(error_msg)
-                        yield "data: [DONE]\n\n"
-                        break
-                    
-        except Exception as stream_error:
-            error_msg = str(stream_error)
-            # Improve error message for authentication errors
-            if "401" in error_msg or "authentication_error" in error_msg or "invalid x-api-key" in error_msg.lower() or "Invalid API key" in error_msg:
-                error_msg = "Invalid API key. Please check your ANTHROPIC_API_KEY in .env file. Get a new key from https://console.anthropic.com/"
+                item_type, item_data = await asyncio.wait_for(queue.get(), STREAM_HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                if http_request is not None and await http_request.is_disconnected():
+                    logger.info("AI stream client disconnected; closing upstream stream")
+                    return
+                yield ": heartbeat\n\n"
+                continue
+            
+            if item_type == 'chunk':
+                yield f"data: {json.dumps({'text': item_data})}\n\n"
+            elif item_type == 'done':
+                yield "data: [DONE]\n\n"
+                return
             else:
-                error_msg = f'Stream processing error: {error_msg}'
-            print(f"[ERROR] Error in stream processing: {error_msg}")
-            print(f"[ERROR] Traceback: {traceback.format_exc()}")
-            yield f"data: {json.dumps({'error': error_msg})}\n\n"
-                
-    except APIError as e:
-        error_msg = f'Anthropic API error: {str(e)}'
-        print(f"[ERROR] APIError in stream: {error_msg}")
-        yield f"data: {json.dumps({'error': error_msg})}\n\n"
-    except Exception as e:
-        error_msg = f'Stream error: {str(e)}'
-        print(f"[ERROR] Exception in stream: {error_msg}")
-        print(f"[ERROR] Traceback: {traceback.format_exc()}")
-        yield f"data: {json.dumps({'error': error_msg})}\n\n"
+                error_msg = _stream_error_message(item_data)
+                logger.error("Error in stream processing: %s", error_msg, exc_info=item_data)
+                yield f"data: {json.dumps({'error': error_msg})}\n\n"
+                return
+    finally:
+        # Runs on completion, client disconnect (CancelledError/GeneratorExit) or error
+        if not pump.done():
+            pump.cancel()
+        try:
+            await pump
+        except BaseException:
+            pass
+        if client_key is not None:
+            _active_streams[client_key] -= 1
+            if _active_streams[client_key] <= 0:
+                del _active_streams[client_key]
+
+
+def _sse_response(generator: AsyncGenerator[str, None]) -> StreamingResponse:
+    """Wrap an SSE generator in a non-buffered streaming response"""
+    return StreamingResponse(
+        generator,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
+        }
+    )
 
 
 # ==================== REQUEST MODELS ====================
@@ -493,7 +540,7 @@ async def health():
 
 
 @router.post("/stream")
-async def stream(request: StreamRequest):
+async def stream(request: StreamRequest, http_request: Request):
     """
     Streaming AI response endpoint (real-time)
     
@@ -504,23 +551,17 @@ async def stream(request: StreamRequest):
     Output:
         Streaming text response
     """
-    import traceback
-    
     try:
         if not request.prompt:
             raise HTTPException(status_code=400, detail="Prompt is required")
         
         # Check API key
-        if not client:
-            raise HTTPException(
-                status_code=500,
-                detail="ANTHROPIC_API_KEY not configured. Please set ANTHROPIC_API_KEY in your .env file."
-            )
-        if not ANTHROPIC_API_KEY or ANTHROPIC_API_KEY in ("your_anthropic_api_key_here", "dummy"):
-            raise HTTPException(
-                status_code=500,
-                detail="ANTHROPIC_API_KEY is not set or is still a placeholder. Please set a valid API key in .env file."
-            )
+        is_configured, error_msg = _check_api_key_configured()
+        if not is_configured:
+            raise HTTPException(status_code=500, detail=error_msg)
+        
+        client_key = _stream_client_key(http_request)
+        _check_stream_capacity(client_key)
         
         # Extract and emphasize the user's question
         user_question = request.prompt.strip()
@@ -549,13 +590,6 @@ INSTRUCTIONS:
         full_prompt = focused_prompt
         
         try:
-            # Verify client is initialized with valid API key
-            if not client or not hasattr(client, 'api_key') or not client.api_key or ANTHROPIC_API_KEY in ("dummy", "your_anthropic_api_key_here"):
-                raise HTTPException(
-                    status_code=500,
-                    detail="Anthropic client not properly initialized. Please check ANTHROPIC_API_KEY in .env file."
-                )
-            
             # Founder Context
             founder_context = """
 Bạn đang chạy trong hệ thống RISKCAST v12.5.
@@ -596,13 +630,8 @@ IMPORTANT: Always respond in Vietnamese (Tiếng Việt). All your responses mus
 
 If the question asks about specific data points, analysis, or recommendations, focus your entire response on that. Do not provide generic information that doesn't address the specific question."""
             
-            # Create stream manager (returns MessageStreamManager, not directly iterable)
-            stream_manager = client.messages.stream(
-                model="claude-3-haiku-20240307",
-                max_tokens=4096,
-                system=system_instruction,
-                messages=[{"role": "user", "content": full_prompt}]
-            )
+            # Async chunk iterator from the shared gateway (the upstream request starts on first read)
+            chunks = llm_gateway.stream(full_prompt, system=system_instruction, max_tokens=4096)
         except Exception as stream_error:
             from anthropic import APIError
             error_msg = str(stream_error)
@@ -625,8 +654,7 @@ If the question asks about specific data points, analysis, or recommendations, f
                 error_msg = f"Failed to create stream: {error_msg}"
             
             # Log full error for debugging
-            print(f"[ERROR] Stream creation failed: {error_msg}")
-            print(f"[ERROR] Traceback: {traceback.format_exc()}")
+            logger.error("Stream creation failed: %s", error_msg, exc_info=True)
             
             raise HTTPException(
                 status_code=status_code,
@@ -634,16 +662,7 @@ If the question asks about specific data points, analysis, or recommendations, f
             )
         
         # Return streaming response
-        # Pass stream_manager to _stream_response which will handle it with async context manager
-        return StreamingResponse(
-            _stream_response(stream_manager),
-            media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "X-Accel-Buffering": "no"
-            }
-        )
+        return _sse_response(_stream_response(chunks, http_request, client_key))
         
     except HTTPException:
         # Re-raise HTTP exceptions as-is
@@ -651,8 +670,7 @@ If the question asks about specific data points, analysis, or recommendations, f
     except Exception as e:
         # Catch any other unexpected errors
         error_msg = f"Unexpected error: {str(e)}"
-        print(f"[ERROR] Unexpected error in /stream: {error_msg}")
-        print(f"[ERROR] Traceback: {traceback.format_exc()}")
+        logger.error("Unexpected error in /stream: %s", error_msg, exc_info=True)
         
         from anthropic import APIError
         if isinstance(e, APIError):
@@ -667,6 +685,18 @@ If the question asks about specific data points, analysis, or recommendations, f
         )
 
 
+async def _enterprise_risk(shipment_data: Dict[str, Any], payload: dict) -> Dict[str, Any]:
+    """
+    v16 engine result for an AI panel request
+    
+    Runs on the engine executor (never on the event loop) behind the result
+    cache, so the panel's analyze/route/insurance/delay/ESG calls for one
+    shipment share a single engine run.
+    """
+    from app.core.services.risk_service import calculate_enterprise_risk_cached
+    return await calculate_enterprise_risk_cached(shipment_data, seed=payload.get("seed"))
+
+
 @router.post("/analyze")
 async def analyze(payload: dict):
     """
@@ -686,8 +716,7 @@ async def analyze(payload: dict):
         raise HTTPException(status_code=400, detail=error)
     
     # Calculate risk
-    from app.core.engine.risk_engine_v16 import calculate_enterprise_risk
-    risk_result = calculate_enterprise_risk(shipment_data)
+    risk_result = await _enterprise_risk(shipment_data, payload)
     
     # Build prompt
     prompt = ANALYZE_PROMPT.format(
@@ -740,7 +769,7 @@ async def route_recommendation(payload: dict):
     shipment_data = sanitize_input(payload.get("shipment_data", {}))
     
     # Calculate route risk
-    route_risk = compute_route_risk(shipment_data)
+    route_risk = compute_route_risk(shipment_data, result=await _enterprise_risk(shipment_data, payload))
     
     # Build prompt
     prompt = ROUTE_PROMPT.format(
@@ -778,7 +807,7 @@ async def insurance_optimizer(payload: dict):
     shipment_data = sanitize_input(payload.get("shipment_data", {}))
     
     # Calculate overall risk
-    overall_risk = compute_overall_risk(shipment_data)
+    overall_risk = compute_overall_risk(shipment_data, result=await _enterprise_risk(shipment_data, payload))
     
     # Map to insurance
     insurance_mapping = map_risk_to_insurance(shipment_data, overall_risk)
@@ -818,7 +847,7 @@ async def delay_prediction(payload: dict):
     shipment_data = sanitize_input(payload.get("shipment_data", {}))
     
     # Calculate delay probability
-    delay_analysis = compute_delay_probability(shipment_data)
+    delay_analysis = compute_delay_probability(shipment_data, result=await _enterprise_risk(shipment_data, payload))
     
     # Build prompt
     prompt = DELAY_PROMPT.format(
@@ -854,7 +883,7 @@ async def esg_advisory(payload: dict):
     shipment_data = sanitize_input(payload.get("shipment_data", {}))
     
     # Calculate ESG score
-    esg_analysis = compute_esg_score(shipment_data)
+    esg_analysis = compute_esg_score(shipment_data, result=await _enterprise_risk(shipment_data, payload))
     
     # Build prompt
     prompt = ESG_PROMPT.format(
@@ -933,16 +962,18 @@ class PromptData(BaseModel):
 class ChatRequest(BaseModel):
     message: str
     context: Optional[Dict] = None
+    stream: bool = False  # Reply as Server-Sent Events
 
 
 @router.post("/chat")
-async def ai_chat(request: ChatRequest):
+async def ai_chat(request: ChatRequest, http_request: Request):
     """
     AI Chat endpoint - General chat with Founder context
     
     Input:
         message: User message
         context: Optional context data
+        stream: Stream the reply as Server-Sent Events
     
     Output:
         AI response with Founder context awareness
@@ -993,15 +1024,16 @@ IMPORTANT: Always respond in Vietnamese (Tiếng Việt). All your responses mus
             context_str = json.dumps(request.context, indent=2, ensure_ascii=False)
             user_message = f"{user_message}\n\nCONTEXT:\n{context_str}"
         
-        response = client.messages.create(
-            model="claude-3-haiku-20240307",
-            max_tokens=4096,
-            system=system_prompt,
-            messages=[{"role": "user", "content": user_message}]
-        )
+        if request.stream:
+            client_key = _stream_client_key(http_request)
+            _check_stream_capacity(client_key)
+            chunks = llm_gateway.stream(user_message, system=system_prompt, max_tokens=4096)
+            return _sse_response(_stream_response(chunks, http_request, client_key))
         
-        reply = response.content[0].text
+        reply = await _llm_complete(user_message, system_prompt)
         return {"reply": reply}
+    except HTTPException:
+        raise
     except APIError as e:
         raise HTTPException(
             status_code=e.status_code if hasattr(e, 'status_code') else 500,
@@ -1064,15 +1096,10 @@ You are RISKCAST Enterprise AI. Answer the user's question directly and specific
 
 IMPORTANT: Always respond in Vietnamese (Tiếng Việt). All your responses must be in Vietnamese language."""
         
-        response = client.messages.create(
-            model="claude-3-haiku-20240307",
-            max_tokens=4096,
-            system=system_instruction,
-            messages=[{"role": "user", "content": focused_prompt}]
-        )
-        
-        reply = response.content[0].text
+        reply = await _llm_complete(focused_prompt, system_instruction)
         return {"reply": reply}
+    except HTTPException:
+        raise
     except APIError as e:
         raise HTTPException(
             status_code=e.status_code if hasattr(e, 'status_code') else 500,
@@ -7,6 +7,10 @@ import json
 from pathlib import Path
 from typing import Dict, Optional
 
+from app.core.utils.logger import get_logger
+
+logger = get_logger("http", "build")
+
 # Load version data
 VERSION_FILE = Path(__file__).parent.parent.parent / "dist" / "version.json"
 VERSION_DATA: Optional[Dict] = None
@@ -23,7 +27,7 @@ def load_version_data():
                 if VERSION_DATA is not None:
                     CDN_URL = VERSION_DATA.get('cdn_url', '/dist')
         except Exception as e:
-            print(f"⚠️  Could not load version.json: {e}")
+            logger.warning("Could not load version.json: %s", e)
             VERSION_DATA = {}
     return VERSION_DATA or {}
 
@@ -6,12 +6,14 @@ Contains all risk calculation engines
 from .risk_engine_v16 import (
     EnterpriseRiskEngine,
     calculate_enterprise_risk,
+    calculate_enterprise_risk_batch,
     compute_partner_risk
 )
 
 __all__ = [
     "EnterpriseRiskEngine",
     "calculate_enterprise_risk",
+    "calculate_enterprise_risk_batch",
     "compute_partner_risk"
 ]
 
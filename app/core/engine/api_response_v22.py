@@ -24,6 +24,8 @@ try:
     from .global_freight_index_v22 import GlobalFreightIndexV22
     from .shock_scenario_engine_v22 import ShockScenarioEngineV22
     from .ai_explanation_ultra_v22 import AIExplanationUltraV22
+    from .dag_executor import DAGExecutor, DAGNode
+    from ..utils.metrics import ENGINE_STAGE_SECONDS
 except ImportError:
     # When run directly
     from riskcast_validator import RiskCastV21Validator, ValidationSeverity
@@ -36,124 +38,75 @@ except ImportError:
     from global_freight_index_v22 import GlobalFreightIndexV22
     from shock_scenario_engine_v22 import ShockScenarioEngineV22
     from ai_explanation_ultra_v22 import AIExplanationUltraV22
+    from dag_executor import DAGExecutor, DAGNode
+    ENGINE_STAGE_SECONDS = None  # No metrics registry outside the app package
 
 
-def generate_risk_assessment_v22(input_data: Dict) -> Dict:
-    """
-    V22 Complete API Response Generator
-    
-    This function orchestrates all V22 modules to produce comprehensive
-    risk assessment with support for modular features.
-    
-    V22 Architecture:
-    - Validator: Input validation (60+ rules)
-    - Risk Scoring Engine: 16-layer risk calculation
-    - Enhanced Features: Predictive analytics & optimization
-    
-    V22 Future Modules (placeholders below):
-    - AI Explanation Engine
-    - Risk Driver Tree
-    - ESG Scoring
-    - Monte Carlo Simulation
-    - Stress Testing
-    """
-    
-    # ========================================================================
-    # STEP 1: VALIDATION
-    # ========================================================================
-    
-    validator = RiskCastV21Validator()
-    is_valid, validation_results = validator.validate_full_input(input_data)
-    
-    if not is_valid:
-        return {
-            'success': False,
-            'version': 'RiskCast V22.0',
-            'timestamp': datetime.now().isoformat(),
-            'validation_errors': [
-                {
-                    'field': r.field,
-                    'severity': r.severity.value,
-                    'message': r.message,
-                    'suggestion': r.suggestion
-                }
-                for r in validation_results if r.severity == ValidationSeverity.ERROR
-            ],
-            'validation_warnings': [
-                {
-                    'field': r.field,
-                    'message': r.message,
-                    'suggestion': r.suggestion
-                }
-                for r in validation_results if r.severity == ValidationSeverity.WARNING
-            ]
-        }
-    
-    # ========================================================================
-    # STEP 2: CORE RISK SCORING
-    # ========================================================================
-    
-    scorer = RiskScoringEngineV21()
-    risk_assessment = scorer.calculate_comprehensive_risk(
-        input_data,
-        input_data.get('modules', {})
-    )
-    
-    # ========================================================================
-    # STEP 3: ENHANCED ALGORITHMIC FEATURES
-    # ========================================================================
-    
-    enhancer = EnhancedAlgorithmicFeaturesV21()
-    
-    delay_prediction = enhancer.predictive_delay_model(
+# ============================================================================
+# V22 MODULE GRAPH
+# ============================================================================
+# Each node reads named values and produces named values; independent
+# modules (ESG, GFI, driver tree, Monte Carlo, explanations) run concurrently.
+#
+# Engines hold no per-request state, so one instance of each serves every
+# request (and every DAG worker thread).
+
+_validator = RiskCastV21Validator()
+_scorer = RiskScoringEngineV21()
+_features = EnhancedAlgorithmicFeaturesV21()
+_explainer = AIExplanationEngineV22()
+_driver_engine = RiskDriverTreeEngineV22()
+_esg_engine = ESGEngineV22()
+_gfi_engine = GlobalFreightIndexV22()
+_mc_engine = MonteCarloEngineV22(n_runs=10000)
+_shock_engine = ShockScenarioEngineV22()
+_ultra_explainer = AIExplanationUltraV22()
+
+def _run_risk_scoring(input_data: Dict, modules: Dict) -> Dict:
+    return _scorer.calculate_comprehensive_risk(input_data, modules)
+
+
+def _run_delay_prediction(input_data: Dict, risk_assessment: Dict) -> Dict:
+    return _features.predictive_delay_model(
         input_data.get('transport', {}),
         risk_assessment['layer_scores']
     )
-    
-    route_alternatives = enhancer.route_optimization_suggestions(
+
+
+def _run_route_alternatives(input_data: Dict, risk_assessment: Dict):
+    return _features.route_optimization_suggestions(
         input_data.get('transport', {}),
         risk_assessment['layer_scores']
     )
-    
-    insurance_rec = enhancer.insurance_optimization(
+
+
+def _run_insurance_optimization(input_data: Dict, risk_assessment: Dict) -> Dict:
+    return _features.insurance_optimization(
         input_data.get('cargo', {}),
         risk_assessment['layer_scores'],
         risk_assessment['overall_score']
     )
-    
-    # ========================================================================
-    # STEP 4: AI EXPLANATION ENGINE (V22 Module #1 - ACTIVE)
-    # ========================================================================
-    
+
+
+def _run_ai_explanation(risk_assessment: Dict) -> Dict:
     # Generate human-readable explanations for risk scores
-    explainer = AIExplanationEngineV22()
-    ai_explanation = explainer.generate_explanation(
+    return _explainer.generate_explanation(
         risk_assessment['layer_scores'],
         risk_assessment['category_scores'],
         risk_assessment['overall_score'],
         risk_assessment['risk_level']
     )
-    
-    # ========================================================================
-    # STEP 5: RISK DRIVER TREE ENGINE (V22 Module #2 - ACTIVE)
-    # ========================================================================
-    
+
+
+def _run_risk_driver_tree(risk_assessment: Dict):
     # Build hierarchical risk factor tree showing contribution analysis
-    driver_engine = RiskDriverTreeEngineV22()
-    risk_driver_tree = driver_engine.build_driver_tree(
-        risk_assessment['layer_scores']
-    )
-    
-    # Generate tree summary statistics
-    tree_summary = driver_engine.get_tree_summary(risk_driver_tree)
-    
-    # ========================================================================
-    # STEP 6: ESG RISK ENGINE (V22 Module #3 - ACTIVE)
-    # ========================================================================
-    
+    risk_driver_tree = _driver_engine.build_driver_tree(risk_assessment['layer_scores'])
+    return risk_driver_tree, _driver_engine.get_tree_summary(risk_driver_tree)
+
+
+def _run_esg(input_data: Dict) -> Dict:
     # Assess Environmental, Social, and Governance factors
-    esg_engine = ESGEngineV22()
-    esg_assessment = esg_engine.assess_esg(
+    return _esg_engine.assess_esg(
         input_data.get('seller', {}),
         input_data.get('buyer', {}),
         {
@@ -161,62 +114,132 @@ def generate_risk_assessment_v22(input_data: Dict) -> Dict:
             **input_data.get('transport', {})  # Merge transport data for mode, priority, etc.
         }
     )
-    
-    # ========================================================================
-    # STEP 7: GLOBAL FREIGHT INDEX (V22 Phase 2.5 - ACTIVE)
-    # ========================================================================
-    
+
+
+def _run_global_freight_index(input_data: Dict, risk_assessment: Dict) -> Dict:
     # Compute Global Freight Index for trade lane market intelligence
-    gfi_engine = GlobalFreightIndexV22()
-    gfi_result = gfi_engine.compute_index(
+    return _gfi_engine.compute_index(
         input_data.get('transport', {}),
         risk_assessment['layer_scores'].get('market_volatility', 40)
     )
-    
-    # ========================================================================
-    # V22 FUTURE MODULES - INTEGRATION HOOKS
-    # ========================================================================
-    
-    modules = input_data.get('modules', {})
-    
-    # Monte Carlo Simulation (V22 Module #4 - ACTIVE when enabled)
+
+
+def _run_monte_carlo(input_data: Dict, risk_assessment: Dict) -> Dict:
     # Run 10,000-scenario probabilistic simulation
-    monte_carlo_results = None
-    if modules.get('monte_carlo'):
-        mc_engine = MonteCarloEngineV22(n_runs=10000)
-        monte_carlo_results = mc_engine.run_simulation(
-            input_data.get('transport', {}),
-            input_data.get('cargo', {}),
-            risk_assessment['layer_scores']
-        )
-    
-    # Shock Scenario Engine (V22 Phase 2.6 - ACTIVE)
+    return _mc_engine.run_simulation(
+        input_data.get('transport', {}),
+        input_data.get('cargo', {}),
+        risk_assessment['layer_scores']
+    )
+
+
+def _run_shock_scenarios(input_data: Dict, risk_assessment: Dict, gfi_result: Dict,
+                         monte_carlo_results=None) -> Dict:
     # Run macro and disruption stress tests
-    shock_engine = ShockScenarioEngineV22()
-    shock_scenarios = shock_engine.run_scenarios(
+    return _shock_engine.run_scenarios(
         input_data,
         risk_assessment,
         gfi_result=gfi_result,
         monte_carlo_result=monte_carlo_results
     )
-    
-    # ========================================================================
-    # STEP 8: AI EXPLANATION ULTRA LAYER (V22 Phase 2.7 - ACTIVE)
-    # ========================================================================
-    
+
+
+def _run_ai_explanation_ultra(input_data: Dict, risk_assessment: Dict, risk_driver_tree: Dict,
+                              gfi_result: Dict, shock_scenarios: Dict, validation: Dict,
+                              esg_assessment=None, monte_carlo_results=None) -> Dict:
     # Generate comprehensive multi-perspective explanation
-    ultra_engine = AIExplanationUltraV22()
-    ai_explanation_ultra = ultra_engine.generate_explanation({
+    bundle = {
         'input_data': input_data,
         'core': risk_assessment,
         'driver_tree': risk_driver_tree,
-        'esg': esg_assessment,
         'monte_carlo': monte_carlo_results,
         'gfi': gfi_result,
         'shock': shock_scenarios,
-        'validation': {
-            'is_valid': is_valid,
-            'warnings': [
+        'validation': validation
+    }
+    if esg_assessment is not None:
+        bundle['esg'] = esg_assessment
+    return _ultra_explainer.generate_explanation(bundle)
+
+
+V22_MODULE_GRAPH = DAGExecutor([
+    DAGNode('risk_scoring', _run_risk_scoring,
+            inputs=('input_data', 'modules'), outputs=('risk_assessment',)),
+    DAGNode('delay_prediction', _run_delay_prediction,
+            inputs=('input_data', 'risk_assessment'), outputs=('delay_prediction',)),
+    DAGNode('route_alternatives', _run_route_alternatives,
+            inputs=('input_data', 'risk_assessment'), outputs=('route_alternatives',)),
+    DAGNode('insurance_optimization', _run_insurance_optimization,
+            inputs=('input_data', 'risk_assessment'), outputs=('insurance_rec',),
+            module='insurance_optimization'),
+    DAGNode('ai_explanation', _run_ai_explanation,
+            inputs=('risk_assessment',), outputs=('ai_explanation',)),
+    DAGNode('risk_driver_tree', _run_risk_driver_tree,
+            inputs=('risk_assessment',), outputs=('risk_driver_tree', 'tree_summary')),
+    DAGNode('esg', _run_esg,
+            inputs=('input_data',), outputs=('esg_assessment',),
+            module='esg'),
+    DAGNode('global_freight_index', _run_global_freight_index,
+            inputs=('input_data', 'risk_assessment'), outputs=('gfi_result',)),
+    DAGNode('monte_carlo', _run_monte_carlo,
+            inputs=('input_data', 'risk_assessment'), outputs=('monte_carlo_results',),
+            module='monte_carlo', module_default=False),
+    DAGNode('shock_scenarios', _run_shock_scenarios,
+            inputs=('input_data', 'risk_assessment', 'gfi_result'), outputs=('shock_scenarios',),
+            optional_inputs=('monte_carlo_results',)),
+    DAGNode('ai_explanation_ultra', _run_ai_explanation_ultra,
+            inputs=('input_data', 'risk_assessment', 'risk_driver_tree', 'gfi_result',
+                    'shock_scenarios', 'validation'),
+            outputs=('ai_explanation_ultra',),
+            optional_inputs=('esg_assessment', 'monte_carlo_results')),
+])
+
+
+def generate_risk_assessment_v22(input_data: Dict) -> Dict:
+    """
+    V22 Complete API Response Generator
+    
+    This function orchestrates all V22 modules to produce comprehensive
+    risk assessment with support for modular features.
+    
+    V22 Architecture:
+    - Validator: Input validation (60+ rules)
+    - Risk Scoring Engine: 16-layer risk calculation
+    - Enhanced Features: Predictive analytics & optimization
+    
+    V22 Modules (run as a dependency graph, see V22_MODULE_GRAPH):
+    - AI Explanation Engine
+    - Risk Driver Tree
+    - ESG Scoring (modules.esg, default on)
+    - Global Freight Index
+    - Monte Carlo Simulation (modules.monte_carlo, default off)
+    - Shock Scenarios / Stress Testing
+    - AI Explanation Ultra
+    
+    Per-module wall time is reported in response['metadata']['execution'].
+    """
+    
+    # ========================================================================
+    # STEP 1: VALIDATION
+    # ========================================================================
+    
+    is_valid, validation_results = _validator.validate_full_input(input_data)
+    
+    if not is_valid:
+        return {
+            'success': False,
+            'version': 'RiskCast V22.0',
+            'timestamp': datetime.now().isoformat(),
+            'validation_errors': [
+                {
+                    'field': r.field,
+                    'severity': r.severity.value,
+                    'message': r.message,
+                    'suggestion': r.suggestion
+                }
+                for r in validation_results if r.severity == ValidationSeverity.ERROR
+            ],
+            'validation_warnings': [
                 {
                     'field': r.field,
                     'message': r.message,
@@ -225,7 +248,45 @@ def generate_risk_assessment_v22(input_data: Dict) -> Dict:
                 for r in validation_results if r.severity == ValidationSeverity.WARNING
             ]
         }
-    })
+    
+    # ========================================================================
+    # STEPS 2-8: CORE SCORING + V22 MODULES (dependency graph)
+    # ========================================================================
+    
+    validation_summary = {
+        'is_valid': is_valid,
+        'warnings': [
+            {
+                'field': r.field,
+                'message': r.message,
+                'suggestion': r.suggestion
+            }
+            for r in validation_results if r.severity == ValidationSeverity.WARNING
+        ]
+    }
+    
+    modules = input_data.get('modules', {})
+    graph_run = V22_MODULE_GRAPH.run(
+        {'input_data': input_data, 'modules': modules, 'validation': validation_summary},
+        modules
+    )
+    outputs = graph_run.values
+    if ENGINE_STAGE_SECONDS is not None:
+        for node_name, elapsed_ms in graph_run.timings_ms.items():
+            ENGINE_STAGE_SECONDS.observe(elapsed_ms / 1000, engine="v22", stage=node_name)
+    
+    risk_assessment = outputs['risk_assessment']
+    delay_prediction = outputs['delay_prediction']
+    route_alternatives = outputs['route_alternatives']
+    insurance_rec = outputs.get('insurance_rec')
+    ai_explanation = outputs['ai_explanation']
+    risk_driver_tree = outputs['risk_driver_tree']
+    tree_summary = outputs['tree_summary']
+    esg_assessment = outputs.get('esg_assessment')
+    gfi_result = outputs['gfi_result']
+    monte_carlo_results = outputs.get('monte_carlo_results')
+    shock_scenarios = outputs['shock_scenarios']
+    ai_explanation_ultra = outputs['ai_explanation_ultra']
     
     # ========================================================================
     # STEP 9: BUILD COMPREHENSIVE RESPONSE
@@ -236,17 +297,7 @@ def generate_risk_assessment_v22(input_data: Dict) -> Dict:
         'version': 'RiskCast V22.0',
         'timestamp': datetime.now().isoformat(),
         
-        'validation': {
-            'is_valid': is_valid,
-            'warnings': [
-                {
-                    'field': r.field,
-                    'message': r.message,
-                    'suggestion': r.suggestion
-                }
-                for r in validation_results if r.severity == ValidationSeverity.WARNING
-            ]
-        },
+        'validation': validation_summary,
         
         'risk_assessment': {
             'overall_score': risk_assessment['overall_score'],
@@ -325,6 +376,10 @@ def generate_risk_assessment_v22(input_data: Dict) -> Dict:
     if monte_carlo_results:
         response['monte_carlo_simulation'] = monte_carlo_results
     
+    response['metadata'] = {
+        'execution': graph_run.metadata()
+    }
+    
     return response
 
 
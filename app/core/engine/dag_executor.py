@@ -0,0 +1,204 @@
+"""
+RiskCast V22 - Module DAG Executor
+==================================
+Runs engine modules as a dependency graph instead of a fixed sequence
+
+Each DAGNode declares the named values it reads (``inputs``) and the named
+values it produces (``outputs``). Nodes whose inputs are available run
+concurrently in a shared thread pool; a node gated by a ``modules.*`` flag
+that is switched off is pruned, together with every node that requires one
+of its outputs. Optional inputs of a pruned producer resolve to None.
+
+Configuration (environment):
+    V22_DAG_WORKERS    Threads for independent modules (default: min(4, CPU count); 1 = inline)
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class DAGNode:
+    """One module in the graph"""
+    name: str
+    fn: Callable[..., Any]                # Called with one keyword argument per input
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()         # Several outputs: fn returns a tuple in this order
+    optional_inputs: Tuple[str, ...] = ()  # Passed as None when their producer is pruned
+    module: Optional[str] = None          # modules.* flag gating this node
+    module_default: bool = True           # Value assumed when the flag is absent
+
+
+@dataclass
+class DAGRunResult:
+    """Values produced by a run plus execution metadata"""
+    values: Dict[str, Any]
+    timings_ms: Dict[str, float]
+    pruned: List[str]
+    workers: int
+    total_ms: float
+
+    def metadata(self) -> Dict[str, Any]:
+        return {
+            'mode': 'parallel' if self.workers > 1 else 'sequential',
+            'workers': self.workers,
+            'total_ms': round(self.total_ms, 3),
+            'node_ms': {name: round(ms, 3) for name, ms in self.timings_ms.items()},
+            'pruned_modules': self.pruned,
+        }
+
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="riskcast-v22-dag")
+        return _pool
+
+
+class DAGExecutor:
+    """Dependency-graph executor for V22 modules"""
+
+    def __init__(self, nodes: List[DAGNode], max_workers: Optional[int] = None):
+        self.nodes = list(nodes)
+        self.max_workers = max_workers or int(os.getenv("V22_DAG_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+        self._producers: Dict[str, DAGNode] = {}
+        for node in self.nodes:
+            for output in node.outputs:
+                if output in self._producers:
+                    raise ValueError(f"Output '{output}' produced by both "
+                                     f"'{self._producers[output].name}' and '{node.name}'")
+                self._producers[output] = node
+        self._check_acyclic()
+
+    def _check_acyclic(self) -> None:
+        """Raise ValueError if node dependencies form a cycle"""
+        state: Dict[str, int] = {}  # 1 = visiting, 2 = done
+        by_name = {node.name: node for node in self.nodes}
+
+        def visit(node: DAGNode) -> None:
+            if state.get(node.name) == 2:
+                return
+            if state.get(node.name) == 1:
+                raise ValueError(f"Dependency cycle through module '{node.name}'")
+            state[node.name] = 1
+            for value in node.inputs + node.optional_inputs:
+                producer = self._producers.get(value)
+                if producer is not None:
+                    visit(by_name[producer.name])
+            state[node.name] = 2
+
+        for node in self.nodes:
+            visit(node)
+
+    def plan(self, available: List[str], modules: Optional[Dict] = None) -> Tuple[List[DAGNode], List[str]]:
+        """
+        Prune the graph for a run
+
+        Args:
+            available: Names of the initial values
+            modules: modules.* flags from the request
+
+        Returns:
+            (active nodes in declaration order, names of pruned nodes)
+        """
+        modules = modules or {}
+        active = [node for node in self.nodes
+                  if node.module is None or modules.get(node.module, node.module_default)]
+
+        # Drop nodes whose required inputs can no longer be produced, until stable
+        while True:
+            produced = set(available)
+            for node in active:
+                produced.update(node.outputs)
+            kept = [node for node in active if all(value in produced for value in node.inputs)]
+            if len(kept) == len(active):
+                break
+            active = kept
+
+        active_names = {node.name for node in active}
+        pruned = [node.name for node in self.nodes if node.name not in active_names]
+        return active, pruned
+
+    def run(self, initial: Dict[str, Any], modules: Optional[Dict] = None) -> DAGRunResult:
+        """
+        Execute the graph
+
+        Args:
+            initial: Initial named values (e.g. input_data)
+            modules: modules.* flags controlling gated nodes
+
+        Returns:
+            DAGRunResult with every produced value and per-node wall time
+
+        Raises:
+            Exception: The first exception raised by a node (remaining nodes are cancelled)
+        """
+        start = time.perf_counter()
+        active, pruned = self.plan(list(initial), modules)
+        values = dict(initial)
+        timings: Dict[str, float] = {}
+
+        pending_outputs = set()
+        for node in active:
+            pending_outputs.update(node.outputs)
+
+        def ready(node: DAGNode) -> bool:
+            return all(value in values for value in node.inputs) and \
+                all(value in values or value not in pending_outputs for value in node.optional_inputs)
+
+        def arguments(node: DAGNode) -> Dict[str, Any]:
+            # Built on the calling thread; workers never touch `values`
+            kwargs = {value: values[value] for value in node.inputs}
+            kwargs.update({value: values.get(value) for value in node.optional_inputs})
+            return kwargs
+
+        def call(node: DAGNode, kwargs: Dict[str, Any]) -> Tuple[Any, float]:
+            node_start = time.perf_counter()
+            result = node.fn(**kwargs)
+            return result, (time.perf_counter() - node_start) * 1000
+
+        def store(node: DAGNode, result: Any, elapsed_ms: float) -> None:
+            timings[node.name] = elapsed_ms
+            outputs = (result,) if len(node.outputs) == 1 else tuple(result)
+            for name, value in zip(node.outputs, outputs):
+                values[name] = value
+                pending_outputs.discard(name)
+
+        waiting = list(active)
+        if self.max_workers <= 1:
+            while waiting:
+                node = next(node for node in waiting if ready(node))
+                waiting.remove(node)
+                store(node, *call(node, arguments(node)))
+        else:
+            pool = _get_pool(self.max_workers)
+            running = {}
+            try:
+                while waiting or running:
+                    for node in [node for node in waiting if ready(node)]:
+                        waiting.remove(node)
+                        running[pool.submit(call, node, arguments(node))] = node
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        store(running.pop(future), *future.result())
+            finally:
+                for future in running:
+                    future.cancel()
+
+        return DAGRunResult(
+            values=values,
+            timings_ms=timings,
+            pruned=pruned,
+            workers=self.max_workers,
+            total_ms=(time.perf_counter() - start) * 1000,
+        )
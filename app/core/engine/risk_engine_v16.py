@@ -31,16 +31,17 @@ Author: Kai × Hoàng | v16.0 Production Release
 """
 
 import numpy as np
-from scipy import stats
+from scipy import special, stats
 from scipy.optimize import minimize
-from scipy.stats import t as student_t
 from dataclasses import dataclass, field
 from typing import Dict, List, Tuple, Optional, Any
 from enum import Enum
 import warnings
 from functools import lru_cache
+import threading
 import time
 import json
+from app.core.engine.risk_metrics import compute_risk_metrics, StreamingRiskMetrics
 from app.core.legacy.riskcast_v14_5_climate_upgrade import (
     ClimateVariables,
     ClimateRiskLayerExtensions,
@@ -48,9 +49,13 @@ from app.core.legacy.riskcast_v14_5_climate_upgrade import (
     ESGClimateResilience,
     ClimateAIAnalysis
 )
+from app.core.utils.logger import get_logger
+from app.core.utils.metrics import timed_stage
 
 warnings.filterwarnings('ignore')
 
+logger = get_logger("engine", "v16")
+
 # ===============================================================
 # ENHANCED CONFIGURATION (v16.0)
 # ===============================================================
@@ -63,7 +68,25 @@ class RiskConfig:
     MC_ITERATIONS_MIN = 10000
     MC_ITERATIONS_MAX = 100000
     ANTITHETIC_SAMPLING = True
-    USE_SOBOL = False
+    USE_SOBOL = True  # Scrambled Sobol QMC with adaptive stopping (single-shipment path,
+                      # below MC_CHUNKED_MIN_ITERATIONS)
+    MC_BATCH_SIZE = 16  # Shipments per batched (N × iterations × layers) draw
+    SCENARIO_COMMON_RANDOM_NUMBERS = True  # Share one set of draws across scenarios
+    
+    # Chunked (memory-bounded) Monte Carlo
+    # Sampler selection in calculate_risk: iterations >= MC_CHUNKED_MIN_ITERATIONS
+    # always use the chunked pseudo-random path (memory bound wins over QMC);
+    # smaller runs use Sobol QMC when USE_SOBOL, else the in-memory sampler.
+    MC_CHUNKED_MIN_ITERATIONS = 80000  # Runs at/above this size are generated in blocks
+    MC_CHUNK_SIZE = 8192               # Iterations per block
+    MC_CHUNK_DTYPE = np.float32        # Sample precision inside a block
+    MC_RETAINED_SAMPLES = 1000         # Samples kept for financial_distribution['distribution']
+    
+    # Quasi-Monte Carlo (USE_SOBOL)
+    QMC_REPLICATES = 8           # Independent scrambles (standard error from their spread)
+    QMC_MIN_POINTS_LOG2 = 8      # First block: 2^8 points per replicate
+    QMC_TOLERANCE_MEAN = 0.003   # Stop when SE(mean risk) <= tolerance (risk units, 0-10)
+    QMC_TOLERANCE_VAR95 = 0.025  # ... and SE(VaR95) <= tolerance (~ 50k pseudo-random draws)
     
     # Fat-tailed distribution
     STUDENT_T_DF = 5
@@ -718,6 +741,20 @@ class FuzzyAHP:
         
         return weights
     
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _pairwise_ahp_solution(cls) -> Tuple[np.ndarray, bool, float]:
+        """
+        AHP weights and consistency check for PAIRWISE_MATRIX
+        
+        The matrix is a class constant, so the eigen-solve runs once per
+        process instead of once per request. The returned array is read-only.
+        """
+        ahp_weights = cls.calculate_ahp_weights(cls.PAIRWISE_MATRIX)
+        ahp_weights.setflags(write=False)
+        is_consistent, cr = cls.pairwise_consistency_check(cls.PAIRWISE_MATRIX)
+        return ahp_weights, is_consistent, cr
+    
     @classmethod
     def calculate_combined_weights(cls, 
                                    entropy_weights: np.ndarray,
@@ -735,11 +772,8 @@ class FuzzyAHP:
         Returns:
             (combined_weights, metadata)
         """
-        # Calculate AHP weights from pairwise matrix
-        ahp_weights = cls.calculate_ahp_weights(cls.PAIRWISE_MATRIX)
-        
-        # Check consistency
-        is_consistent, cr = cls.pairwise_consistency_check(cls.PAIRWISE_MATRIX)
+        # AHP weights and consistency of the (constant) pairwise matrix
+        ahp_weights, is_consistent, cr = cls._pairwise_ahp_solution()
         
         # Combine weights (50% AHP, 30% Entropy, 20% Base)
         combined = 0.5 * ahp_weights + 0.3 * entropy_weights + 0.2 * base_weights
@@ -886,6 +920,43 @@ class InteractionEngine:
 # ADVANCED MONTE CARLO WITH FAT TAILS
 # ===============================================================
 
+def spawn_rng_streams(seed: Optional[int], n_streams: int) -> List[np.random.Generator]:
+    """
+    Create independent random streams for one calculation
+    
+    SeedSequence(seed).spawn() yields statistically independent child
+    streams; the same seed always reproduces the same streams, and
+    seed=None draws fresh OS entropy.
+    
+    Args:
+        seed: Optional integer seed
+        n_streams: Number of Generators to return
+    
+    Returns:
+        List of numpy Generators (PCG64)
+    """
+    return [np.random.default_rng(child)
+            for child in np.random.SeedSequence(seed).spawn(n_streams)]
+
+
+@dataclass
+class ChunkedRiskDistribution:
+    """
+    Reduced result of a chunked Monte Carlo run
+    
+    Holds mergeable accumulators instead of the full sample array, so memory
+    does not grow with the iteration count.
+    """
+    risk: StreamingRiskMetrics          # Risk scores [0-10]
+    loss_pct: StreamingRiskMetrics      # Loss fraction of shipment value
+    delay_days: StreamingRiskMetrics    # Delay in days
+    retained: np.ndarray                # First MC_RETAINED_SAMPLES risk scores
+    
+    @property
+    def n(self) -> int:
+        return self.risk.n
+
+
 class MonteCarloEngine:
     """
     Advanced Monte Carlo simulation with:
@@ -896,16 +967,21 @@ class MonteCarloEngine:
     - Left-skewed loss distribution
     """
     
-    def __init__(self, iterations: int = RiskConfig.MC_ITERATIONS_DEFAULT):
+    def __init__(self,
+                 iterations: int = RiskConfig.MC_ITERATIONS_DEFAULT,
+                 rng: Optional[np.random.Generator] = None):
         self.iterations = min(max(iterations, RiskConfig.MC_ITERATIONS_MIN), 
                             RiskConfig.MC_ITERATIONS_MAX)
         self.use_sobol = RiskConfig.USE_SOBOL
+        # Fallback stream; per-request callers pass their own Generator
+        self.rng = rng if rng is not None else np.random.default_rng()
     
     def generate_correlated_samples(self, 
                                    means: np.ndarray, 
                                    volatilities: np.ndarray,
                                    correlation_matrix: np.ndarray,
-                                   scenario_volatility: float = 1.0) -> np.ndarray:
+                                   scenario_volatility: float = 1.0,
+                                   rng: Optional[np.random.Generator] = None) -> np.ndarray:
         """
         Generate correlated samples with fat-tailed distribution
         
@@ -920,10 +996,12 @@ class MonteCarloEngine:
             volatilities: Volatility for each layer
             correlation_matrix: Correlation between layers
             scenario_volatility: Scenario-driven volatility multiplier
+            rng: Random generator (defaults to the engine's stream)
         
         Returns:
             Correlated samples (iterations × n_layers)
         """
+        rng = rng if rng is not None else self.rng
         n_vars = len(means)
         
         # Adjust volatilities by scenario
@@ -940,20 +1018,7 @@ class MonteCarloEngine:
             L = self._nearest_pd_cholesky(cov_matrix)
         
         # Generate base samples with fat tails (Student-t)
-        if RiskConfig.ANTITHETIC_SAMPLING:
-            half_iterations = self.iterations // 2
-            
-            # Student-t for heavy tails
-            z1 = student_t.rvs(df=RiskConfig.STUDENT_T_DF, 
-                              size=(half_iterations, n_vars))
-            z2 = -z1  # Antithetic variates
-            z = np.vstack([z1, z2])
-        else:
-            z = student_t.rvs(df=RiskConfig.STUDENT_T_DF, 
-                            size=(self.iterations, n_vars))
-        
-        # Normalize Student-t to standard normal scale
-        z = z / np.sqrt(RiskConfig.STUDENT_T_DF / (RiskConfig.STUDENT_T_DF - 2))
+        z = self._draw_student_t(rng, n_vars)
         
         # Apply correlation structure
         correlated = z @ L.T
@@ -962,8 +1027,8 @@ class MonteCarloEngine:
         samples = means + correlated
         
         # Add extreme event shocks (tail events)
-        shock_mask = np.random.random(self.iterations) < RiskConfig.TAIL_SHOCK_PROBABILITY
-        shock_size = np.random.gamma(2, 1.5, size=self.iterations)
+        shock_mask = rng.random(self.iterations) < RiskConfig.TAIL_SHOCK_PROBABILITY
+        shock_size = rng.gamma(2, 1.5, size=self.iterations)
         samples[shock_mask] += shock_size[shock_mask][:, np.newaxis]
         
         # Clip to valid range
@@ -971,6 +1036,58 @@ class MonteCarloEngine:
         
         return samples
     
+    def _draw_student_t(self,
+                        rng: np.random.Generator,
+                        n_vars: int,
+                        leading_shape: Tuple[int, ...] = ()) -> np.ndarray:
+        """
+        Draw unit-variance Student-t base samples (leading_shape × iterations × n_vars)
+        
+        With antithetic sampling the second half of the iterations axis
+        mirrors the first.
+        """
+        if RiskConfig.ANTITHETIC_SAMPLING:
+            half_iterations = self.iterations // 2
+            
+            # Student-t for heavy tails
+            z1 = rng.standard_t(RiskConfig.STUDENT_T_DF,
+                                size=leading_shape + (half_iterations, n_vars))
+            z = np.concatenate([z1, -z1], axis=-2)  # Antithetic variates
+        else:
+            z = rng.standard_t(RiskConfig.STUDENT_T_DF,
+                               size=leading_shape + (self.iterations, n_vars))
+        
+        # Normalize Student-t to standard normal scale
+        return z / np.sqrt(RiskConfig.STUDENT_T_DF / (RiskConfig.STUDENT_T_DF - 2))
+    
+    # Normal-score grid for the tabulated Student-t inverse CDF (covers u in [1e-12, 1 - 1e-12])
+    _T_PPF_GRID_MIN = -7.1
+    _T_PPF_GRID_STEP = 14.2 / 4096
+    
+    @staticmethod
+    @lru_cache(maxsize=4)
+    def _student_t_ppf_table(df: int) -> np.ndarray:
+        """Student-t quantiles at the normal scores of the uniform grid"""
+        grid = MonteCarloEngine._T_PPF_GRID_MIN + MonteCarloEngine._T_PPF_GRID_STEP * np.arange(4097)
+        return stats.t.ppf(special.ndtr(grid), df)
+    
+    @staticmethod
+    def _student_t_ppf(u: np.ndarray) -> np.ndarray:
+        """
+        Fast Student-t inverse CDF (STUDENT_T_DF) for quasi-random points
+        
+        Linear interpolation of tabulated t quantiles over the normal score
+        ndtri(u), where they are smooth (relative error ~1e-6). The grid is
+        uniform, so the cell index is computed directly instead of searched.
+        """
+        quantiles = MonteCarloEngine._student_t_ppf_table(RiskConfig.STUDENT_T_DF)
+        position = (special.ndtri(u) - MonteCarloEngine._T_PPF_GRID_MIN) / MonteCarloEngine._T_PPF_GRID_STEP
+        position = np.clip(position, 0, len(quantiles) - 1.000001)
+        index = position.astype(np.intp)
+        frac = position - index
+        lower = quantiles[index]
+        return lower + frac * (quantiles[index + 1] - lower)
+    
     @staticmethod
     def _nearest_pd_cholesky(matrix: np.ndarray) -> np.ndarray:
         """
@@ -987,11 +1104,14 @@ class MonteCarloEngine:
         
         return np.linalg.cholesky(pd_matrix)
     
+    @timed_stage("mc_sampling")
     def simulate_risk_distribution(self, 
                                   layers: Dict[str, RiskLayer],
                                   weights: np.ndarray,
                                   context: Dict,
-                                  climate_vars: Optional[ClimateVariables] = None) -> np.ndarray:
+                                  climate_vars: Optional[ClimateVariables] = None,
+                                  rng: Optional[np.random.Generator] = None,
+                                  climate_rng: Optional[np.random.Generator] = None) -> np.ndarray:
         """
         Run full Monte Carlo simulation with scenario context
         
@@ -1000,6 +1120,8 @@ class MonteCarloEngine:
             weights: Layer importance weights
             context: Scenario-driven context variables
             climate_vars: Optional climate variables for tail shocks (v14.5)
+            rng: Random generator for layer samples (defaults to the engine's stream)
+            climate_rng: Random generator for climate tail shocks (defaults to rng)
         
         Returns:
             Risk distribution (iterations,)
@@ -1026,8 +1148,11 @@ class MonteCarloEngine:
             correlation = self._build_correlation_matrix(tuple(layer_names_list))
         
         # Generate samples
+        rng = rng if rng is not None else self.rng
+        climate_rng = climate_rng if climate_rng is not None else rng
+        
         samples = self.generate_correlated_samples(
-            means, volatilities, correlation, scenario_vol
+            means, volatilities, correlation, scenario_vol, rng=rng
         )
         
         # Calculate weighted risk for each simulation
@@ -1042,23 +1167,456 @@ class MonteCarloEngine:
             climate_shocks = ClimateMonteCarloExtension.generate_climate_tail_shocks(
                 n_samples=self.iterations,
                 climate_vars=climate_vars,
-                base_tail_prob=RiskConfig.TAIL_SHOCK_PROBABILITY
+                base_tail_prob=RiskConfig.TAIL_SHOCK_PROBABILITY,
+                rng=climate_rng
             )
             # Scale theo mức độ ảnh hưởng khí hậu (balanced)
             risk_distribution += climate_shocks * RiskConfig.CLIMATE_TAIL_STRENGTH
         
         # Final clipping
         risk_distribution = np.clip(risk_distribution, RiskConfig.RISK_MIN, RiskConfig.RISK_MAX)
-        
+
         return risk_distribution
+
+    @timed_stage("mc_sampling")
+    def simulate_risk_distribution_qmc(self,
+                                       layers: Dict[str, RiskLayer],
+                                       weights: np.ndarray,
+                                       context: Dict,
+                                       climate_vars: Optional[ClimateVariables] = None,
+                                       rng: Optional[np.random.Generator] = None,
+                                       tolerance_mean: float = RiskConfig.QMC_TOLERANCE_MEAN,
+                                       tolerance_var95: float = RiskConfig.QMC_TOLERANCE_VAR95
+                                       ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Randomized quasi-Monte Carlo simulation with adaptive stopping
+        
+        QMC_REPLICATES independently scrambled Sobol sequences drive every
+        random input by inversion: Student-t layer draws (then the Cholesky
+        factor), the tail shock and the climate tail shock. Each replicate
+        grows in power-of-two blocks until the standard error of the mean
+        risk and of VaR95 - estimated from the spread of the replicate
+        estimates - is within tolerance, or the iteration budget is reached.
+        
+        Args:
+            layers: Risk layers with volatility
+            weights: Layer importance weights
+            context: Scenario-driven context variables
+            climate_vars: Optional climate variables for tail shocks (v14.5)
+            rng: Random generator for the Sobol scrambles (defaults to the engine's stream)
+            tolerance_mean: Standard error target for the mean risk score
+            tolerance_var95: Standard error target for VaR95
+        
+        Returns:
+            (risk distribution, convergence diagnostics)
+        """
+        rng = rng if rng is not None else self.rng
+        layer_names = list(layers.keys())
+        n_layers = len(layer_names)
+        
+        means = np.array([layer.calculate_dynamic_score(context) for layer in layers.values()])
+        volatilities = np.array([layer.volatility for layer in layers.values()])
+        std_devs = volatilities * context.get('volatility_mult', 1.0) * means
+        
+        if climate_vars is not None:
+            correlation = ClimateMonteCarloExtension.build_climate_correlation_matrix(layer_names, climate_vars)
+        else:
+            correlation = self._build_correlation_matrix(tuple(layer_names))
+        cov_matrix = np.outer(std_devs, std_devs) * correlation
+        try:
+            L = np.linalg.cholesky(cov_matrix)
+        except np.linalg.LinAlgError:
+            L = self._nearest_pd_cholesky(cov_matrix)
+        
+        df = RiskConfig.STUDENT_T_DF
+        df_scale = np.sqrt(df / (df - 2))
+        # Dimensions: layers, tail shock (event, size), climate shock (event, size)
+        dim = n_layers + 4
+        
+        def risk_from_points(u: np.ndarray) -> np.ndarray:
+            u = np.clip(u, 1e-12, 1 - 1e-12)
+            z = self._student_t_ppf(u[:, :n_layers]) / df_scale
+            samples = means + z @ L.T
+            
+            shock_mask = u[:, n_layers] < RiskConfig.TAIL_SHOCK_PROBABILITY
+            # Gamma(2, 1.5) shock size by inversion
+            samples[shock_mask] += 1.5 * special.gammaincinv(2, u[shock_mask, n_layers + 1])[:, np.newaxis]
+            samples = np.clip(samples, RiskConfig.RISK_MIN, RiskConfig.RISK_MAX)
+            
+            risk = samples @ weights + self._calculate_interaction_boost_vectorized(samples, layer_names)
+            if climate_vars is not None:
+                climate_shocks = ClimateMonteCarloExtension.generate_climate_tail_shocks(
+                    n_samples=len(u),
+                    climate_vars=climate_vars,
+                    base_tail_prob=RiskConfig.TAIL_SHOCK_PROBABILITY,
+                    uniforms=u[:, n_layers + 2:]
+                )
+                risk += climate_shocks * RiskConfig.CLIMATE_TAIL_STRENGTH
+            return np.clip(risk, RiskConfig.RISK_MIN, RiskConfig.RISK_MAX)
+        
+        n_replicates = RiskConfig.QMC_REPLICATES
+        sequences = [stats.qmc.Sobol(dim, scramble=True, seed=rng) for _ in range(n_replicates)]
+        replicates: List[List[np.ndarray]] = [[] for _ in range(n_replicates)]
+        
+        # Largest power of two per replicate within the iteration budget
+        max_points = 2 ** max(int(np.log2(self.iterations / n_replicates)), RiskConfig.QMC_MIN_POINTS_LOG2)
+        points = 0
+        while True:
+            # First block 2^m points, then double (keeps every prefix a balanced 2^k)
+            block = 2 ** RiskConfig.QMC_MIN_POINTS_LOG2 if points == 0 else points
+            for sequence, blocks in zip(sequences, replicates):
+                blocks.append(risk_from_points(sequence.random(block)))
+            points += block
+            
+            estimates = [np.concatenate(blocks) for blocks in replicates]
+            se_mean = float(np.std([np.mean(x) for x in estimates], ddof=1) / np.sqrt(n_replicates))
+            se_var95 = float(np.std([np.percentile(x, 95) for x in estimates], ddof=1) / np.sqrt(n_replicates))
+            converged = se_mean <= tolerance_mean and se_var95 <= tolerance_var95
+            if converged or points * 2 > max_points:
+                break
+        
+        diagnostics = {
+            'method': 'sobol_rqmc',
+            'replicates': n_replicates,
+            'points': points * n_replicates,
+            'se_mean': se_mean,
+            'se_var95': se_var95,
+            'converged': converged
+        }
+        return np.concatenate(estimates), diagnostics
+
+    def iter_risk_chunks(self,
+                         layers: Dict[str, RiskLayer],
+                         weights: np.ndarray,
+                         context: Dict,
+                         climate_vars: Optional[ClimateVariables] = None,
+                         rng: Optional[np.random.Generator] = None,
+                         climate_rng: Optional[np.random.Generator] = None,
+                         chunk_size: int = RiskConfig.MC_CHUNK_SIZE,
+                         dtype: type = RiskConfig.MC_CHUNK_DTYPE):
+        """
+        Generate the risk distribution block by block
+        
+        Same model as simulate_risk_distribution(), but only one
+        (chunk_size × n_layers) block is alive at a time. Antithetic pairs
+        are formed inside each block.
+        
+        Yields:
+            Risk distribution blocks (≤ chunk_size,) of the given dtype
+        """
+        rng = rng if rng is not None else self.rng
+        climate_rng = climate_rng if climate_rng is not None else rng
+        
+        layer_names = list(layers.keys())
+        means = np.array([layer.calculate_dynamic_score(context) for layer in layers.values()])
+        volatilities = np.array([layer.volatility for layer in layers.values()])
+        std_devs = volatilities * context.get('volatility_mult', 1.0) * means
+        
+        if climate_vars is not None:
+            correlation = ClimateMonteCarloExtension.build_climate_correlation_matrix(layer_names, climate_vars)
+            try:
+                L = np.linalg.cholesky(correlation)
+            except np.linalg.LinAlgError:
+                L = self._nearest_pd_cholesky(correlation)
+        else:
+            L = self._correlation_cholesky(tuple(layer_names))
+        
+        # chol(D·C·D) = D·chol(C): scale the correlated draws per layer
+        L_scaled = (L * std_devs[:, np.newaxis]).T.astype(dtype)
+        means = means.astype(dtype)
+        weights = np.asarray(weights, dtype=dtype)
+        df_scale = np.sqrt(RiskConfig.STUDENT_T_DF / (RiskConfig.STUDENT_T_DF - 2))
+        
+        chunk_size = max(2, int(chunk_size) // 2 * 2)
+        remaining = self.iterations
+        while remaining > 0:
+            n = min(chunk_size, remaining)
+            half = (n + 1) // 2
+            
+            z1 = (rng.standard_t(RiskConfig.STUDENT_T_DF, size=(half, len(layer_names))) / df_scale).astype(dtype)
+            z = np.concatenate([z1, -z1])[:n] if RiskConfig.ANTITHETIC_SAMPLING else \
+                (rng.standard_t(RiskConfig.STUDENT_T_DF, size=(n, len(layer_names))) / df_scale).astype(dtype)
+            
+            samples = z @ L_scaled
+            samples += means
+            shock_mask = rng.random(n) < RiskConfig.TAIL_SHOCK_PROBABILITY
+            shock_size = rng.gamma(2, 1.5, size=n).astype(dtype)
+            samples[shock_mask] += shock_size[shock_mask][:, np.newaxis]
+            np.clip(samples, RiskConfig.RISK_MIN, RiskConfig.RISK_MAX, out=samples)
+            
+            risk = samples @ weights
+            risk += self._calculate_interaction_boost_vectorized(samples, layer_names)
+            if climate_vars is not None:
+                climate_shocks = ClimateMonteCarloExtension.generate_climate_tail_shocks(
+                    n_samples=n,
+                    climate_vars=climate_vars,
+                    base_tail_prob=RiskConfig.TAIL_SHOCK_PROBABILITY,
+                    rng=climate_rng
+                )
+                risk += climate_shocks * RiskConfig.CLIMATE_TAIL_STRENGTH
+            np.clip(risk, RiskConfig.RISK_MIN, RiskConfig.RISK_MAX, out=risk)
+            
+            yield risk
+            remaining -= n
+
+    @timed_stage("mc_sampling")
+    def simulate_risk_distribution_chunked(self,
+                                           layers: Dict[str, RiskLayer],
+                                           weights: np.ndarray,
+                                           context: Dict,
+                                           climate_vars: Optional[ClimateVariables] = None,
+                                           rng: Optional[np.random.Generator] = None,
+                                           climate_rng: Optional[np.random.Generator] = None,
+                                           chunk_size: int = RiskConfig.MC_CHUNK_SIZE) -> ChunkedRiskDistribution:
+        """
+        Memory-bounded Monte Carlo simulation
+        
+        Streams blocks from iter_risk_chunks() into mergeable accumulators
+        for the risk score, the loss fraction and the delay days; peak memory
+        is set by chunk_size, not by the iteration count.
+        
+        Returns:
+            ChunkedRiskDistribution
+        """
+        rng = rng if rng is not None else self.rng
+        sketch_rng = np.random.default_rng(rng.integers(2 ** 63))
+        
+        result = ChunkedRiskDistribution(
+            risk=StreamingRiskMetrics(rng=sketch_rng),
+            loss_pct=StreamingRiskMetrics(rng=sketch_rng),
+            delay_days=StreamingRiskMetrics(rng=sketch_rng),
+            retained=np.empty(0)
+        )
+        
+        retained = []
+        n_retained = 0
+        for chunk in self.iter_risk_chunks(layers, weights, context, climate_vars,
+                                           rng=rng, climate_rng=climate_rng, chunk_size=chunk_size):
+            result.risk.update(chunk)
+            result.loss_pct.update(FinancialRiskCalculator.risk_to_loss_percentage(chunk))
+            result.delay_days.update(DelayEstimator.estimate_delay_days_vectorized(chunk))
+            if n_retained < RiskConfig.MC_RETAINED_SAMPLES:
+                keep = chunk[:RiskConfig.MC_RETAINED_SAMPLES - n_retained].astype(np.float64)
+                retained.append(keep)
+                n_retained += keep.size
+        
+        result.retained = np.concatenate(retained) if retained else np.empty(0)
+        return result
+
+    def generate_correlated_samples_batch(self,
+                                          means: np.ndarray,
+                                          volatilities: np.ndarray,
+                                          correlation_matrices: List[np.ndarray],
+                                          scenario_volatility: np.ndarray,
+                                          rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """
+        Generate correlated fat-tailed samples for N shipments in one draw
+
+        Mathematical approach:
+        cov_n = D_n · C_n · D_n with D_n = diag(std_devs_n), so
+        chol(cov_n) = D_n · chol(C_n). The Cholesky factor of each distinct
+        correlation matrix is computed once and shared by every shipment
+        that uses it; the per-shipment scaling is a broadcast multiply.
+
+        Args:
+            means: Expected values (N × n_layers)
+            volatilities: Volatilities (N × n_layers)
+            correlation_matrices: One correlation matrix per shipment
+            scenario_volatility: Scenario volatility multiplier per shipment (N,)
+            rng: Random generator (defaults to the engine's stream)
+
+        Returns:
+            Correlated samples (N × iterations × n_layers)
+        """
+        rng = rng if rng is not None else self.rng
+        n_shipments, n_vars = means.shape
+
+        std_devs = volatilities * np.asarray(scenario_volatility)[:, np.newaxis] * means
+
+        # Group shipments by identical correlation matrix
+        groups: Dict[bytes, List[int]] = {}
+        for i, corr in enumerate(correlation_matrices):
+            groups.setdefault(np.ascontiguousarray(corr).tobytes(), []).append(i)
+
+        # One Student-t tensor for the whole batch
+        z = self._draw_student_t(rng, n_vars, leading_shape=(n_shipments,))
+        n_draws = z.shape[1]
+
+        # Apply correlation structure (one matmul per distinct Cholesky factor)
+        correlated = np.empty_like(z)
+        for indices in groups.values():
+            corr = correlation_matrices[indices[0]]
+            try:
+                L = np.linalg.cholesky(corr)
+            except np.linalg.LinAlgError:
+                L = self._nearest_pd_cholesky(corr)
+            correlated[indices] = z[indices] @ L.T
+        correlated *= std_devs[:, np.newaxis, :]
+
+        samples = means[:, np.newaxis, :] + correlated
+
+        # Extreme event shocks (tail events)
+        shock_mask = rng.random((n_shipments, n_draws)) < RiskConfig.TAIL_SHOCK_PROBABILITY
+        shock_size = rng.gamma(2, 1.5, size=(n_shipments, n_draws))
+        samples += np.where(shock_mask, shock_size, 0.0)[:, :, np.newaxis]
+
+        return np.clip(samples, RiskConfig.RISK_MIN, RiskConfig.RISK_MAX)
+
+    @timed_stage("mc_sampling")
+    def simulate_risk_distribution_batch(self,
+                                         layers_batch: List[Dict[str, RiskLayer]],
+                                         weights_batch: List[np.ndarray],
+                                         contexts: List[Dict],
+                                         climate_vars_batch: Optional[List[Optional[ClimateVariables]]] = None,
+                                         rng: Optional[np.random.Generator] = None,
+                                         climate_rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """
+        Run the Monte Carlo simulation for N shipments in one vectorized pass
+
+        Batched counterpart of simulate_risk_distribution(). All shipments
+        must share the same layer structure (always true for v16).
+
+        Args:
+            layers_batch: Risk layers per shipment
+            weights_batch: Layer weights per shipment
+            contexts: Scenario context per shipment
+            climate_vars_batch: Optional climate variables per shipment
+            rng: Random generator for layer samples (defaults to the engine's stream)
+            climate_rng: Random generator for climate tail shocks (defaults to rng)
+
+        Returns:
+            Risk distributions (N × iterations)
+        """
+        rng = rng if rng is not None else self.rng
+        climate_rng = climate_rng if climate_rng is not None else rng
+
+        n_shipments = len(layers_batch)
+        if climate_vars_batch is None:
+            climate_vars_batch = [None] * n_shipments
+        if not (len(weights_batch) == len(contexts) == len(climate_vars_batch) == n_shipments):
+            raise ValueError("Batch inputs must have the same length")
+
+        layer_names = list(layers_batch[0].keys())
+        if any(list(layers.keys()) != layer_names for layers in layers_batch):
+            raise ValueError("All shipments in a batch must share the same risk layers")
+
+        means = np.array([
+            [layer.calculate_dynamic_score(context) for layer in layers.values()]
+            for layers, context in zip(layers_batch, contexts)
+        ])
+        volatilities = np.array([
+            [layer.volatility for layer in layers.values()]
+            for layers in layers_batch
+        ])
+        scenario_vol = np.array([context.get('volatility_mult', 1.0) for context in contexts])
+
+        correlation_matrices = [
+            ClimateMonteCarloExtension.build_climate_correlation_matrix(layer_names, climate_vars)
+            if climate_vars is not None
+            else self._build_correlation_matrix(tuple(layer_names))
+            for climate_vars in climate_vars_batch
+        ]
+
+        samples = self.generate_correlated_samples_batch(
+            means, volatilities, correlation_matrices, scenario_vol, rng=rng
+        )
+
+        # Weighted risk per shipment and simulation
+        weights = np.asarray(weights_batch, dtype=float)
+        risk_distribution = np.einsum('nik,nk->ni', samples, weights)
+
+        risk_distribution += self._calculate_interaction_boost_vectorized(samples, layer_names)
+
+        if any(climate_vars is not None for climate_vars in climate_vars_batch):
+            climate_shocks = ClimateMonteCarloExtension.generate_climate_tail_shocks_batch(
+                n_samples=samples.shape[1],
+                climate_vars_batch=climate_vars_batch,
+                base_tail_prob=RiskConfig.TAIL_SHOCK_PROBABILITY,
+                rng=climate_rng
+            )
+            risk_distribution += climate_shocks * RiskConfig.CLIMATE_TAIL_STRENGTH
+
+        return np.clip(risk_distribution, RiskConfig.RISK_MIN, RiskConfig.RISK_MAX)
+
+    @timed_stage("mc_sampling_crn")
+    def simulate_scenarios_common_random_numbers(self,
+                                                 scenario_layers: Dict[str, Dict[str, RiskLayer]],
+                                                 weights: np.ndarray,
+                                                 scenario_contexts: Dict[str, Dict],
+                                                 rng: Optional[np.random.Generator] = None) -> Dict[str, np.ndarray]:
+        """
+        Simulate several scenarios from one shared set of random draws
+        
+        Common random numbers: the Student-t base matrix and tail shocks are
+        drawn once. Since chol(D·C·D) = D·chol(C) and scenarios share the
+        layer correlation C, every scenario is an affine transform of the
+        same correlated draws:
+        
+            samples_s = means_s + (z @ chol(C).T) * std_devs_s + shocks
+        
+        Scenario deltas are therefore driven by the scenario parameters,
+        not by sampling noise.
+        
+        Args:
+            scenario_layers: Scenario-adjusted layers per scenario key
+            weights: Layer importance weights
+            scenario_contexts: Scenario context per scenario key
+            rng: Random generator (defaults to the engine's stream)
+        
+        Returns:
+            Risk distribution (iterations,) per scenario key
+        """
+        rng = rng if rng is not None else self.rng
+        
+        layer_names = list(next(iter(scenario_layers.values())).keys())
+        L = self._correlation_cholesky(tuple(layer_names))
+        
+        # Shared draws
+        correlated_base = self._draw_student_t(rng, len(layer_names)) @ L.T
+        n_draws = correlated_base.shape[0]
+        shock_mask = rng.random(n_draws) < RiskConfig.TAIL_SHOCK_PROBABILITY
+        shock_size = rng.gamma(2, 1.5, size=n_draws)
+        shocks = np.where(shock_mask, shock_size, 0.0)[:, np.newaxis]
+        
+        distributions = {}
+        for key, layers in scenario_layers.items():
+            context = scenario_contexts[key]
+            means = np.array([layer.calculate_dynamic_score(context) for layer in layers.values()])
+            volatilities = np.array([layer.volatility for layer in layers.values()])
+            std_devs = volatilities * context.get('volatility_mult', 1.0) * means
+            
+            samples = np.clip(means + correlated_base * std_devs + shocks,
+                              RiskConfig.RISK_MIN, RiskConfig.RISK_MAX)
+            
+            risk_distribution = samples @ weights
+            risk_distribution += self._calculate_interaction_boost_vectorized(samples, layer_names)
+            distributions[key] = np.clip(risk_distribution, RiskConfig.RISK_MIN, RiskConfig.RISK_MAX)
+        
+        return distributions
+    
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _correlation_cholesky(layer_names: tuple) -> np.ndarray:
+        """
+        Cholesky factor of the domain correlation matrix
+        
+        Cached per layer set (read-only, shared by every request and thread)
+        """
+        correlation = MonteCarloEngine._build_correlation_matrix(layer_names)
+        try:
+            L = np.linalg.cholesky(correlation)
+        except np.linalg.LinAlgError:
+            L = MonteCarloEngine._nearest_pd_cholesky(correlation)
+        L.setflags(write=False)
+        return L
     
     @staticmethod
-    @lru_cache(maxsize=1)
+    @lru_cache(maxsize=8)
     def _build_correlation_matrix(layer_names: tuple) -> np.ndarray:
         """
         Build correlation matrix based on domain knowledge
         
-        Cached for performance
+        Cached for performance (read-only, shared by every request and thread)
         """
         n = len(layer_names)
         corr = np.eye(n)
@@ -1087,6 +1645,7 @@ class MonteCarloEngine:
                     elif rev_key in correlations:
                         corr[i, j] = corr[j, i] = correlations[rev_key]
         
+        corr.setflags(write=False)
         return corr
     
     @staticmethod
@@ -1096,9 +1655,11 @@ class MonteCarloEngine:
         Calculate interaction boost for all simulations (vectorized)
         
         Significantly faster than loop-based approach
+        
+        Works on (iterations × layers) as well as batched
+        (shipments × iterations × layers) sample arrays.
         """
-        n_samples = samples.shape[0]
-        boost = np.zeros(n_samples)
+        boost = np.zeros(samples.shape[:-1], dtype=samples.dtype)
         
         # Create layer index map
         layer_idx = {name: i for i, name in enumerate(layer_names)}
@@ -1107,19 +1668,19 @@ class MonteCarloEngine:
         if 'packaging_quality' in layer_idx and 'cargo_sensitivity' in layer_idx:
             idx_pack = layer_idx['packaging_quality']
             idx_cargo = layer_idx['cargo_sensitivity']
-            mask = (samples[:, idx_cargo] > 7) & (samples[:, idx_pack] < 4)
+            mask = (samples[..., idx_cargo] > 7) & (samples[..., idx_pack] < 4)
             boost[mask] += 0.6
         
         if 'route_complexity' in layer_idx and 'weather_exposure' in layer_idx:
             idx_route = layer_idx['route_complexity']
             idx_weather = layer_idx['weather_exposure']
-            mask = (samples[:, idx_route] > 7) & (samples[:, idx_weather] > 7)
+            mask = (samples[..., idx_route] > 7) & (samples[..., idx_weather] > 7)
             boost[mask] += 0.55
         
         if 'transport_reliability' in layer_idx and 'priority_level' in layer_idx:
             idx_trans = layer_idx['transport_reliability']
             idx_prior = layer_idx['priority_level']
-            mask = (samples[:, idx_trans] < 4) & (samples[:, idx_prior] > 7)
+            mask = (samples[..., idx_trans] < 4) & (samples[..., idx_prior] > 7)
             boost[mask] += 0.65
         
         return boost
@@ -1168,25 +1729,41 @@ class FinancialRiskCalculator:
         # Calculate USD losses
         usd_losses = loss_pct * shipment_value
         
-        # Calculate metrics
-        var_95_usd = np.percentile(usd_losses, 95)
-        var_99_usd = np.percentile(usd_losses, 99)
+        # Calculate metrics (single-partition kernel)
+        metrics = compute_risk_metrics(usd_losses)
         
-        tail_95 = usd_losses[usd_losses >= var_95_usd]
-        tail_99 = usd_losses[usd_losses >= var_99_usd]
+        return {
+            'expected_loss_usd': metrics['mean'],
+            'var_95_usd': metrics['var_95'],
+            'var_99_usd': metrics['var_99'],
+            'cvar_95_usd': metrics['cvar_95'],
+            'cvar_99_usd': metrics['cvar_99'],
+            'max_loss_usd': metrics['max'],
+            'loss_std_usd': metrics['std'],
+            'distribution': usd_losses.tolist()[:1000]  # Sample for visualization
+        }
+    
+    @staticmethod
+    def calculate_financial_distribution_chunked(chunked: 'ChunkedRiskDistribution',
+                                                 shipment_value: float) -> Dict[str, Any]:
+        """
+        calculate_financial_distribution() for a chunked Monte Carlo run
         
-        cvar_95_usd = np.mean(tail_95) if len(tail_95) > 0 else var_95_usd
-        cvar_99_usd = np.mean(tail_99) if len(tail_99) > 0 else var_99_usd
+        USD loss = loss fraction × shipment value, so every metric scales
+        linearly from the loss-fraction accumulator.
+        """
+        loss = chunked.loss_pct.result()
+        retained_losses = FinancialRiskCalculator.risk_to_loss_percentage(chunked.retained) * shipment_value
         
         return {
-            'expected_loss_usd': float(np.mean(usd_losses)),
-            'var_95_usd': float(var_95_usd),
-            'var_99_usd': float(var_99_usd),
-            'cvar_95_usd': float(cvar_95_usd),
-            'cvar_99_usd': float(cvar_99_usd),
-            'max_loss_usd': float(np.max(usd_losses)),
-            'loss_std_usd': float(np.std(usd_losses)),
-            'distribution': usd_losses.tolist()[:1000]  # Sample for visualization
+            'expected_loss_usd': loss['mean'] * shipment_value,
+            'var_95_usd': loss['var_95'] * shipment_value,
+            'var_99_usd': loss['var_99'] * shipment_value,
+            'cvar_95_usd': loss['cvar_95'] * shipment_value,
+            'cvar_99_usd': loss['cvar_99'] * shipment_value,
+            'max_loss_usd': loss['max'] * shipment_value,
+            'loss_std_usd': loss['std'] * shipment_value,
+            'distribution': retained_losses.tolist()
         }
     
     @staticmethod
@@ -1208,22 +1785,77 @@ class FinancialRiskCalculator:
         return np.std(downside) if len(downside) > 0 else 0.0
     
     @staticmethod
+    @timed_stage("financial_metrics")
     def calculate_all_metrics(distribution: np.ndarray) -> Dict[str, float]:
-        """Calculate comprehensive risk metrics"""
-        return {
-            'var_95': FinancialRiskCalculator.calculate_var(distribution, RiskConfig.VAR_CONFIDENCE_95),
-            'var_99': FinancialRiskCalculator.calculate_var(distribution, RiskConfig.VAR_CONFIDENCE_99),
-            'cvar_95': FinancialRiskCalculator.calculate_cvar(distribution, RiskConfig.VAR_CONFIDENCE_95),
-            'cvar_99': FinancialRiskCalculator.calculate_cvar(distribution, RiskConfig.VAR_CONFIDENCE_99),
-            'downside_deviation': FinancialRiskCalculator.calculate_downside_deviation(distribution),
-            'mean': np.mean(distribution),
-            'std': np.std(distribution),
-            'skewness': stats.skew(distribution),
-            'kurtosis': stats.kurtosis(distribution),
-            'min': np.min(distribution),
-            'max': np.max(distribution),
-            'median': np.median(distribution)
-        }
+        """
+        Calculate comprehensive risk metrics
+        
+        One partition for VaR/CVaR/median/min/max and one pass for the
+        moments (see risk_metrics.compute_risk_metrics). For chunked or
+        streamed simulations use risk_metrics.StreamingRiskMetrics.
+        """
+        return compute_risk_metrics(distribution)
+
+    @staticmethod
+    @timed_stage("financial_metrics")
+    def calculate_all_metrics_batch(distributions: np.ndarray) -> List[Dict[str, float]]:
+        """
+        Calculate comprehensive risk metrics for N distributions at once
+
+        Vectorized along axis 1 of an (N × iterations) array; returns one
+        dict per row with the same keys as calculate_all_metrics().
+        """
+        distributions = np.atleast_2d(distributions)
+
+        percentiles = np.percentile(
+            distributions,
+            [RiskConfig.VAR_CONFIDENCE_95 * 100, RiskConfig.VAR_CONFIDENCE_99 * 100, 50],
+            axis=1
+        )
+        var_95, var_99, median = percentiles
+
+        def masked_mean(mask: np.ndarray, fallback: np.ndarray) -> np.ndarray:
+            counts = mask.sum(axis=1)
+            sums = np.where(mask, distributions, 0.0).sum(axis=1)
+            return np.where(counts > 0, sums / np.maximum(counts, 1), fallback)
+
+        cvar_95 = masked_mean(distributions >= var_95[:, np.newaxis], var_95)
+        cvar_99 = masked_mean(distributions >= var_99[:, np.newaxis], var_99)
+
+        # Downside deviation above target (5.0), matching calculate_downside_deviation()
+        downside_mask = distributions > 5.0
+        downside_counts = downside_mask.sum(axis=1)
+        downside = np.where(downside_mask, distributions - 5.0, 0.0)
+        downside_mean = downside.sum(axis=1) / np.maximum(downside_counts, 1)
+        downside_var = np.where(
+            downside_mask, (distributions - 5.0 - downside_mean[:, np.newaxis]) ** 2, 0.0
+        ).sum(axis=1) / np.maximum(downside_counts, 1)
+        downside_dev = np.where(downside_counts > 0, np.sqrt(downside_var), 0.0)
+
+        means = np.mean(distributions, axis=1)
+        stds = np.std(distributions, axis=1)
+        skewness = stats.skew(distributions, axis=1)
+        kurtosis = stats.kurtosis(distributions, axis=1)
+        mins = np.min(distributions, axis=1)
+        maxs = np.max(distributions, axis=1)
+
+        return [
+            {
+                'var_95': var_95[i],
+                'var_99': var_99[i],
+                'cvar_95': cvar_95[i],
+                'cvar_99': cvar_99[i],
+                'downside_deviation': downside_dev[i],
+                'mean': means[i],
+                'std': stds[i],
+                'skewness': skewness[i],
+                'kurtosis': kurtosis[i],
+                'min': mins[i],
+                'max': maxs[i],
+                'median': median[i]
+            }
+            for i in range(distributions.shape[0])
+        ]
 
 
 # ===============================================================
@@ -1273,20 +1905,88 @@ class DelayEstimator:
         return np.clip(probability, 0.01, 0.99)
     
     @staticmethod
-    def estimate_delay_distribution(risk_distribution: np.ndarray) -> Dict[str, Any]:
+    def estimate_delay_days_vectorized(risk_scores: np.ndarray) -> np.ndarray:
+        """
+        Array version of estimate_delay_days()
+        
+        Evaluates the piecewise linear/exponential curve over the whole
+        array with np.where; element-wise identical to the scalar function
+        and keeps the input dtype (float32 stays float32).
+        
+        Args:
+            risk_scores: Risk scores [0-10], any shape
+        
+        Returns:
+            Delay in days, same shape as the input
+        """
+        risk_scores = np.asarray(risk_scores)
+        if not np.issubdtype(risk_scores.dtype, np.floating):
+            risk_scores = risk_scores.astype(np.float64)
+        
+        threshold = RiskConfig.BASE_DELAY_THRESHOLD
+        k = 0.4  # Growth rate
+        
+        low_delay = (risk_scores / threshold) * 1.5
+        # Clamp excess at 0 so the unused branch cannot overflow exp()
+        excess_risk = np.maximum(risk_scores - threshold, 0)
+        high_delay = RiskConfig.MAX_DELAY_DAYS * (1 - np.exp(-k * excess_risk))
+        
+        return np.where(risk_scores < threshold, low_delay, high_delay)
+    
+    @staticmethod
+    def estimate_delay_distribution(risk_distribution: np.ndarray,
+                                    include_histogram: bool = False,
+                                    histogram_bins: int = 24) -> Dict[str, Any]:
         """
         Calculate delay distribution across all simulations
+        
+        Args:
+            risk_distribution: Monte Carlo risk samples
+            include_histogram: Also return delay-day histogram counts/edges
+            histogram_bins: Number of histogram bins
         """
-        delay_days = np.array([DelayEstimator.estimate_delay_days(r) for r in risk_distribution])
+        delay_days = DelayEstimator.estimate_delay_days_vectorized(risk_distribution)
         
-        return {
+        # Separate scalar-q percentile calls: a q-array promotes float32 input
+        # to float64 and would change the reported values
+        p95 = np.percentile(delay_days, 95)
+        p99 = np.percentile(delay_days, 99)
+        
+        result = {
             'mean_delay_days': float(np.mean(delay_days)),
             'median_delay_days': float(np.median(delay_days)),
-            'p95_delay_days': float(np.percentile(delay_days, 95)),
-            'p99_delay_days': float(np.percentile(delay_days, 99)),
+            'p95_delay_days': float(p95),
+            'p99_delay_days': float(p99),
             'max_delay_days': float(np.max(delay_days)),
             'std_delay_days': float(np.std(delay_days))
         }
+        
+        if include_histogram:
+            counts, edges = np.histogram(
+                delay_days, bins=histogram_bins, range=(0.0, RiskConfig.MAX_DELAY_DAYS)
+            )
+            result['histogram'] = {
+                'counts': counts.tolist(),
+                'bin_edges': edges.tolist()
+            }
+        
+        return result
+    
+    @staticmethod
+    def estimate_delay_distribution_chunked(chunked: 'ChunkedRiskDistribution') -> Dict[str, Any]:
+        """
+        estimate_delay_distribution() for a chunked Monte Carlo run
+        """
+        delay = chunked.delay_days.result()
+        
+        return {
+            'mean_delay_days': delay['mean'],
+            'median_delay_days': delay['median'],
+            'p95_delay_days': delay['var_95'],
+            'p99_delay_days': delay['var_99'],
+            'max_delay_days': delay['max'],
+            'std_delay_days': delay['std']
+        }
 
 
 # ===============================================================
@@ -1414,6 +2114,7 @@ class AIAnalysisGenerator:
             return "EXTREME", "mission-critical threat requiring immediate intervention", "🔴🔴"
     
     @staticmethod
+    @timed_stage("ai_summary")
     def generate_summary(metrics: Dict, 
                         layers: Dict[str, float],
                         scenarios: Dict,
@@ -2733,7 +3434,7 @@ class EnterpriseRiskEngine:
         # nếu Hoàng muốn chính xác hơn có thể đọc từ shipment_data.
         return 'sea'
     
-    def calculate_risk(self, shipment_data: Dict) -> RiskMetrics:
+    def calculate_risk(self, shipment_data: Dict, seed: Optional[int] = None) -> RiskMetrics:
         """
         Main risk calculation pipeline
         
@@ -2750,10 +3451,13 @@ class EnterpriseRiskEngine:
         
         Args:
             shipment_data: Dictionary containing shipment parameters
+            seed: Optional seed for reproducible simulations
             
         Returns:
             RiskMetrics object with comprehensive analysis
         """
+        mc_rng, climate_rng, scenario_rng, forecast_rng = spawn_rng_streams(seed, 4)
+        
         climate_vars = self._build_climate_variables(shipment_data)
         chi = climate_vars.calculate_CHI()
         
@@ -2781,7 +3485,8 @@ class EnterpriseRiskEngine:
             chi    # dùng CHI thực tế
         )
         risk_distribution = self.mc_engine.simulate_risk_distribution(
-            layers, weights, base_context, climate_vars=climate_vars
+            layers, weights, base_context, climate_vars=climate_vars,
+            rng=mc_rng, climate_rng=climate_rng
         )
         
         # 6. Calculate risk metrics
@@ -2791,7 +3496,7 @@ class EnterpriseRiskEngine:
         )
         
         # 7. Run scenario analysis (all scenarios)
-        scenario_results = self._run_scenario_analysis(layers, weights, chi)
+        scenario_results = self._run_scenario_analysis(layers, weights, chi, rng=scenario_rng)
         
         # 8. Calculate financial distribution
         shipment_value = shipment_data.get('shipment_value', 100000)
@@ -2809,7 +3514,7 @@ class EnterpriseRiskEngine:
         expected_loss = shipment_value * expected_loss_pct
         
         # 11. Generate forecast
-        forecast = self._generate_forecast(risk_distribution)
+        forecast = self._generate_forecast(risk_distribution, rng=forecast_rng)
         
         # 12. Classify risk level
         risk_level, _, _ = self.ai_generator.classify_risk_level(overall_risk)
@@ -3066,6 +3771,7 @@ class EnterpriseRiskEngine:
         
         return EnterpriseRiskEngine._normalize_score(final_risk)
     
+    @timed_stage("fahp_enterprise")
     def _calculate_optimal_weights(self, layers: Dict[str, RiskLayer], data: Dict) -> Tuple[np.ndarray, Dict]:
         """
         Calculate optimal weights using Fuzzy AHP + Entropy + Base
@@ -3109,12 +3815,21 @@ class EnterpriseRiskEngine:
         
         return combined_weights, metadata
     
+    @timed_stage("scenarios")
     def _run_scenario_analysis(self, layers: Dict[str, RiskLayer], 
                                weights: np.ndarray,
-                               climate_index: float = 5.0) -> Dict:
+                               climate_index: float = 5.0,
+                               rng: Optional[np.random.Generator] = None) -> Dict:
         """
         Run all scenario simulations with full layer influence
+        
+        With RiskConfig.SCENARIO_COMMON_RANDOM_NUMBERS the scenarios share one
+        set of Monte Carlo draws (1 sample + 5 affine transforms) instead of
+        five independent simulations.
         """
+        if RiskConfig.SCENARIO_COMMON_RANDOM_NUMBERS:
+            return self._run_scenario_analysis_crn(layers, weights, climate_index, rng=rng)
+        
         results = {}
         
         for scenario_key, scenario in self.scenario_engine.SCENARIOS.items():
@@ -3128,7 +3843,7 @@ class EnterpriseRiskEngine:
             
             # Run Monte Carlo with scenario context
             distribution = self.mc_engine.simulate_risk_distribution(
-                adjusted_layers, weights, context
+                adjusted_layers, weights, context, rng=rng
             )
             
             # Calculate metrics
@@ -3148,8 +3863,51 @@ class EnterpriseRiskEngine:
         
         return results
     
+    def _run_scenario_analysis_crn(self, layers: Dict[str, RiskLayer],
+                                   weights: np.ndarray,
+                                   climate_index: float = 5.0,
+                                   rng: Optional[np.random.Generator] = None) -> Dict:
+        """
+        Common-random-numbers variant of _run_scenario_analysis
+        """
+        scenarios = self.scenario_engine.SCENARIOS
+        scenario_layers = {
+            key: self.scenario_engine.adjust_layers_for_scenario(layers, scenario)
+            for key, scenario in scenarios.items()
+        }
+        scenario_contexts = {
+            key: self.scenario_engine.build_scenario_context(scenario, climate_index)
+            for key, scenario in scenarios.items()
+        }
+        
+        distributions = self.mc_engine.simulate_scenarios_common_random_numbers(
+            scenario_layers, weights, scenario_contexts, rng=rng
+        )
+        
+        keys = list(distributions.keys())
+        metrics_batch = self.financial_calculator.calculate_all_metrics_batch(
+            np.stack([distributions[key] for key in keys])
+        )
+        
+        return {
+            key: {
+                'name': scenarios[key].name,
+                'risk': metrics['mean'],
+                'var_95': metrics['var_95'],
+                'var_99': metrics['var_99'],
+                'cvar_95': metrics['cvar_95'],
+                'cvar_99': metrics['cvar_99'],
+                'std': metrics['std'],
+                'min': metrics['min'],
+                'max': metrics['max']
+            }
+            for key, metrics in zip(keys, metrics_batch)
+        }
+    
     @staticmethod
-    def _generate_forecast(distribution: np.ndarray, days: int = 30) -> Dict:
+    @timed_stage("forecast")
+    def _generate_forecast(distribution: np.ndarray, days: int = 30,
+                           rng: Optional[np.random.Generator] = None) -> Dict:
         """
         Generate risk forecast over time with mean reversion
         
@@ -3161,6 +3919,9 @@ class EnterpriseRiskEngine:
         σ: volatility
         """
         
+        if rng is None:
+            rng = np.random.default_rng()
+        
         base_risk = np.mean(distribution)
         volatility = np.std(distribution)
         
@@ -3177,7 +3938,7 @@ class EnterpriseRiskEngine:
             
             # Random shock with decreasing intensity
             decay = np.exp(-0.02 * day)
-            shock = np.random.normal(0, volatility * 0.3 * decay)
+            shock = rng.normal(0, volatility * 0.3 * decay)
             
             # Update
             current = current + drift + shock
@@ -3258,12 +4019,14 @@ class EnterpriseRiskEngineV16:
     - Enhanced AI narratives
     """
     
-    def __init__(self):
+    def __init__(self, mc_iterations: int = RiskConfig.MC_ITERATIONS_DEFAULT):
         # Existing components (import from current module)
         self.fuzzy_ahp = FuzzyAHP()
-        self.mc_engine = MonteCarloEngine()
+        self.mc_engine = MonteCarloEngine(mc_iterations)
         self.financial_calculator = FinancialRiskCalculator()
         self.delay_estimator = DelayEstimator()
+        self.scenario_engine = ScenarioEngine()
+        self.ai_generator = AIAnalysisGenerator()
         
         # V16.0 NEW components
         self.carrier_intelligence = CarrierIntelligenceEngine()
@@ -3272,7 +4035,7 @@ class EnterpriseRiskEngineV16:
         self.partner_scorer = PartnerCredibilityScorer()
         self.priority_optimizer = PriorityWeightOptimizer()
     
-    def calculate_risk(self, shipment_data: Dict) -> Dict[str, Any]:
+    def calculate_risk(self, shipment_data: Dict, seed: Optional[int] = None) -> Dict[str, Any]:
         """
         V16.0 MAIN RISK CALCULATION PIPELINE
         
@@ -3283,27 +4046,121 @@ class EnterpriseRiskEngineV16:
         4. Run Monte Carlo with climate integration
         5. Generate comprehensive insights
         6. Create executive briefing
+        
+        Args:
+            shipment_data: Raw shipment payload
+            seed: Optional seed; the same seed and input give identical results
+        """
+        
+        logger.debug("Enterprise risk calculation started (seed=%s)", seed)
+        
+        prepared = self._prepare_risk_inputs(shipment_data)
+        mc_rng, climate_rng = spawn_rng_streams(seed, 2)
+        
+        # === STEP 5: RUN MONTE CARLO ======================================
+        simulation_info = None
+        if self.mc_engine.iterations >= RiskConfig.MC_CHUNKED_MIN_ITERATIONS:
+            # Memory-bounded mode (whatever the sampler setting): accumulators
+            # instead of the full sample array
+            logger.debug("[5/8] Running chunked Monte Carlo simulation (%d iterations)",
+                         self.mc_engine.iterations)
+            risk_distribution = self.mc_engine.simulate_risk_distribution_chunked(
+                prepared['layers'],
+                prepared['adjusted_weights'],
+                prepared['base_context'],
+                climate_vars=prepared['climate_vars'],
+                rng=mc_rng,
+                climate_rng=climate_rng
+            )
+        elif self.mc_engine.use_sobol:
+            logger.debug("[5/8] Running quasi-Monte Carlo simulation (adaptive, up to %d points)",
+                         self.mc_engine.iterations)
+            risk_distribution, simulation_info = self.mc_engine.simulate_risk_distribution_qmc(
+                prepared['layers'],
+                prepared['adjusted_weights'],
+                prepared['base_context'],
+                climate_vars=prepared['climate_vars'],
+                rng=mc_rng
+            )
+            logger.debug("[5/8] Converged: %s after %d points",
+                         simulation_info['converged'], simulation_info['points'])
+        else:
+            logger.debug("[5/8] Running Monte Carlo simulation (%d iterations)", self.mc_engine.iterations)
+            risk_distribution = self.mc_engine.simulate_risk_distribution(
+                prepared['layers'],
+                prepared['adjusted_weights'],
+                prepared['base_context'],
+                climate_vars=prepared['climate_vars'],
+                rng=mc_rng,
+                climate_rng=climate_rng
+            )
+        
+        return self._assemble_risk_result(prepared, risk_distribution, simulation_info=simulation_info)
+    
+    def calculate_risk_batch(self,
+                             shipments: List[Dict],
+                             batch_size: int = RiskConfig.MC_BATCH_SIZE,
+                             seed: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Score several shipments with batched Monte Carlo
+        
+        Stages 1-4 and 6-8 run per shipment exactly as in calculate_risk();
+        stage 5 and the distribution metrics run as one vectorized
+        (shipments × iterations × layers) pass per chunk of batch_size.
+        
+        Args:
+            shipments: Raw shipment payloads
+            batch_size: Shipments per batched draw (bounds peak memory)
+            seed: Optional seed for the whole batch (reproducible for a fixed batch_size)
+            
+        Returns:
+            One result dict per shipment, in input order
         """
+        batch_size = max(1, int(batch_size))
+        mc_rng, climate_rng = spawn_rng_streams(seed, 2)
+        results: List[Dict[str, Any]] = []
+        
+        logger.debug("Batch risk calculation started: %d shipment(s), batch_size=%d", len(shipments), batch_size)
         
-        print("\n" + "="*80)
-        print("🚀 RISKCAST v16.0 - ENTERPRISE RISK CALCULATION")
-        print("="*80)
+        for offset in range(0, len(shipments), batch_size):
+            chunk = shipments[offset:offset + batch_size]
+            prepared_batch = [self._prepare_risk_inputs(s) for s in chunk]
+            
+            distributions = self.mc_engine.simulate_risk_distribution_batch(
+                [p['layers'] for p in prepared_batch],
+                [p['adjusted_weights'] for p in prepared_batch],
+                [p['base_context'] for p in prepared_batch],
+                climate_vars_batch=[p['climate_vars'] for p in prepared_batch],
+                rng=mc_rng,
+                climate_rng=climate_rng
+            )
+            metrics_batch = self.financial_calculator.calculate_all_metrics_batch(distributions)
+            
+            for prepared, distribution, metrics in zip(prepared_batch, distributions, metrics_batch):
+                results.append(self._assemble_risk_result(prepared, distribution, risk_metrics=metrics))
         
+        return results
+    
+    def _prepare_risk_inputs(self, shipment_data: Dict) -> Dict[str, Any]:
+        """
+        Pipeline stages 1-4: parse input, build climate variables, risk
+        layers and priority-adjusted weights, plus the base scenario context
+        """
         # === STEP 1: PARSE ENHANCED DATA ===================================
-        print("\n[1/8] Parsing enhanced shipment data...")
+        logger.debug("[1/8] Parsing enhanced shipment data")
         enhanced_data = self._parse_enhanced_data(shipment_data)
         
         # === STEP 2: BUILD CLIMATE VARIABLES ==============================
-        print("[2/8] Building climate variables...")
+        logger.debug("[2/8] Building climate variables")
         climate_vars = self._build_climate_variables(enhanced_data)
         chi = climate_vars.calculate_CHI()
         
         # === STEP 3: BUILD 13 RISK LAYERS =================================
-        print("[3/8] Building 13 enhanced risk layers...")
+        logger.debug("[3/8] Building 13 enhanced risk layers")
         layers = self._build_risk_layers_v16(enhanced_data, climate_vars)
         
         # === STEP 4: CALCULATE PRIORITY-AWARE WEIGHTS =====================
-        print("[4/8] Calculating priority-aware weights...")
+        logger.debug("[4/8] Calculating priority-aware weights")
         priority_profile = PriorityProfile(
             profile=enhanced_data.priority_profile,
             speed_weight=enhanced_data.priority_speed_weight,
@@ -3318,40 +4175,73 @@ class EnterpriseRiskEngineV16:
             priority_profile
         )
         
-        # === STEP 5: RUN MONTE CARLO ======================================
-        print("[5/8] Running Monte Carlo simulation (50,000 iterations)...")
-        scenario_engine = ScenarioEngine()
-        
-        base_context = scenario_engine.build_scenario_context(
-            scenario_engine.SCENARIOS['base'],
+        base_context = self.scenario_engine.build_scenario_context(
+            self.scenario_engine.SCENARIOS['base'],
             chi
         )
         
-        risk_distribution = self.mc_engine.simulate_risk_distribution(
-            layers, adjusted_weights, base_context, climate_vars=climate_vars
-        )
+        return {
+            'enhanced_data': enhanced_data,
+            'climate_vars': climate_vars,
+            'chi': chi,
+            'layers': layers,
+            'priority_profile': priority_profile,
+            'base_weights': base_weights,
+            'weights_meta': weights_meta,
+            'adjusted_weights': adjusted_weights,
+            'base_context': base_context
+        }
+    
+    def _assemble_risk_result(self,
+                              prepared: Dict[str, Any],
+                              risk_distribution,
+                              risk_metrics: Optional[Dict[str, float]] = None,
+                              simulation_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Pipeline stages 6-8: metrics, component insights and executive
+        briefing for a simulated risk distribution
+        """
+        enhanced_data = prepared['enhanced_data']
+        chi = prepared['chi']
+        layers = prepared['layers']
+        priority_profile = prepared['priority_profile']
+        base_weights = prepared['base_weights']
+        adjusted_weights = prepared['adjusted_weights']
         
         # === STEP 6: CALCULATE METRICS ====================================
-        print("[6/8] Calculating financial & operational metrics...")
-        risk_metrics = self.financial_calculator.calculate_all_metrics(risk_distribution)
-        
-        # Climate-VaR
-        c_var_metrics = ClimateMonteCarloExtension.calculate_climate_var(risk_distribution)
-        
-        # Financial distribution
-        financial_dist = self.financial_calculator.calculate_financial_distribution(
-            risk_distribution,
-            enhanced_data.shipment_value
-        )
+        logger.debug("[6/8] Calculating financial & operational metrics")
+        if isinstance(risk_distribution, ChunkedRiskDistribution):
+            # Chunked run: metrics come from the streaming accumulators
+            if risk_metrics is None:
+                risk_metrics = risk_distribution.risk.result()
+            c_var_metrics = ClimateMonteCarloExtension.calculate_climate_var_streaming(risk_distribution.risk)
+            financial_dist = self.financial_calculator.calculate_financial_distribution_chunked(
+                risk_distribution,
+                enhanced_data.shipment_value
+            )
+            delay_dist = self.delay_estimator.estimate_delay_distribution_chunked(risk_distribution)
+        else:
+            if risk_metrics is None:
+                risk_metrics = self.financial_calculator.calculate_all_metrics(risk_distribution)
+            
+            # Climate-VaR
+            c_var_metrics = ClimateMonteCarloExtension.calculate_climate_var(risk_distribution)
+            
+            # Financial distribution
+            financial_dist = self.financial_calculator.calculate_financial_distribution(
+                risk_distribution,
+                enhanced_data.shipment_value
+            )
+            
+            delay_dist = self.delay_estimator.estimate_delay_distribution(risk_distribution)
         
         # Delay estimation
         overall_risk = risk_metrics['mean']
         delay_prob = self.delay_estimator.estimate_delay_probability(overall_risk)
         delay_days = self.delay_estimator.estimate_delay_days(overall_risk)
-        delay_dist = self.delay_estimator.estimate_delay_distribution(risk_distribution)
         
         # === STEP 7: GENERATE COMPONENT INSIGHTS ===========================
-        print("[7/8] Generating component insights...")
+        logger.debug("[7/8] Generating component insights")
         
         # Carrier analysis
         carrier_perf = CarrierPerformance(
@@ -3361,12 +4251,13 @@ class EnterpriseRiskEngineV16:
             price_level=enhanced_data.carrier_price_level,
             votes=enhanced_data.carrier_votes
         )
-        carrier_insights = self.carrier_intelligence.analyze_carrier_performance(carrier_perf)
-        carrier_alternatives = self.carrier_intelligence.suggest_alternatives(
-            carrier_perf,
-            enhanced_data.route,
-            enhanced_data.priority_profile
-        )
+        with timed_stage("carrier"):
+            carrier_insights = self.carrier_intelligence.analyze_carrier_performance(carrier_perf)
+            carrier_alternatives = self.carrier_intelligence.suggest_alternatives(
+                carrier_perf,
+                enhanced_data.route,
+                enhanced_data.priority_profile
+            )
         
         # Port analysis
         climate_data_dict = {
@@ -3427,9 +4318,9 @@ class EnterpriseRiskEngineV16:
         )
         
         # === STEP 8: GENERATE EXECUTIVE BRIEFING ==========================
-        print("[8/8] Generating executive briefing & recommendations...")
+        logger.debug("[8/8] Generating executive briefing & recommendations")
         
-        ai_generator = AIAnalysisGenerator()
+        ai_generator = self.ai_generator
         
         risk_level, _, _ = ai_generator.classify_risk_level(overall_risk)
         
@@ -3465,8 +4356,7 @@ class EnterpriseRiskEngineV16:
             priority_profile=priority_profile
         )
         
-        print("\n✅ Risk calculation complete!")
-        print("="*80 + "\n")
+        logger.debug("Risk calculation complete")
         
         # === RETURN COMPREHENSIVE RESULTS =================================
         return {
@@ -3514,7 +4404,8 @@ class EnterpriseRiskEngineV16:
                 'kurtosis': float(risk_metrics['kurtosis']),
                 'delay_distribution': delay_dist,
                 'climate_hazard_index': float(chi),
-                'climate_var_metrics': c_var_metrics
+                'climate_var_metrics': c_var_metrics,
+                **({'simulation': simulation_info} if simulation_info is not None else {})
             },
             
             # === V16.0 NEW INSIGHTS ========================================
@@ -3938,6 +4829,7 @@ class EnterpriseRiskEngineV16:
         
         return np.clip(base, 0, 10)
     
+    @timed_stage("fahp")
     def _calculate_optimal_weights(self,
                                    layers: Dict[str, RiskLayer],
                                    data: EnhancedShipmentData) -> Tuple[np.ndarray, Dict]:
@@ -3985,6 +4877,7 @@ class EnterpriseRiskEngineV16:
         
         return combined, metadata
     
+    @timed_stage("ai_narrative")
     def _generate_executive_briefing_v16(self, **kwargs) -> str:
         """Generate comprehensive executive briefing for v16.0"""
         
@@ -4235,7 +5128,32 @@ Phân phối hiện tại so với mục tiêu:
         }
 
 
-def calculate_enterprise_risk(shipment_data: Dict, buyer: Optional[Dict] = None, seller: Optional[Dict] = None) -> Dict:
+# Process-wide engine (stateless between calls; per-request RNG streams are passed explicitly)
+_shared_engine: Optional['EnterpriseRiskEngineV16'] = None
+_shared_engine_lock = threading.Lock()
+
+
+def get_shared_engine() -> 'EnterpriseRiskEngineV16':
+    """
+    Return the process-wide EnterpriseRiskEngineV16, creating it on first use
+    
+    The engine keeps no per-request state, so one instance serves every
+    request and thread; its precomputed AHP weights and correlation Cholesky
+    factors are cached on first use.
+    """
+    global _shared_engine
+    if _shared_engine is None:
+        with _shared_engine_lock:
+            if _shared_engine is None:
+                _shared_engine = EnterpriseRiskEngineV16()
+    return _shared_engine
+
+
+def calculate_enterprise_risk(shipment_data: Dict,
+                              buyer: Optional[Dict] = None,
+                              seller: Optional[Dict] = None,
+                              engine: Optional['EnterpriseRiskEngineV16'] = None,
+                              seed: Optional[int] = None) -> Dict:
     """
     V16.0: Main API endpoint (backward compatible with v14)
     
@@ -4243,6 +5161,8 @@ def calculate_enterprise_risk(shipment_data: Dict, buyer: Optional[Dict] = None,
         shipment_data: Enhanced shipment parameters (v16.0 compatible)
         buyer: Optional buyer information
         seller: Optional seller information
+        engine: Optional pre-built engine instance (e.g. a warm worker engine)
+        seed: Optional seed for reproducible Monte Carlo results
     
     Returns:
         Comprehensive risk analysis with v16.0 enhancements
@@ -4254,16 +5174,35 @@ def calculate_enterprise_risk(shipment_data: Dict, buyer: Optional[Dict] = None,
     if buyer:
         shipment_data['buyer'] = buyer
     
-    # Initialize v16 engine
-    engine = EnterpriseRiskEngineV16()
+    # Shared v16 engine unless the caller supplies one
+    if engine is None:
+        engine = get_shared_engine()
     
     # Calculate risk (returns dict directly in v16.0)
-    result = engine.calculate_risk(shipment_data)
+    result = engine.calculate_risk(shipment_data, seed=seed)
     
     # Return v16.0 comprehensive results (backward compatible)
     return result
 
 
+def calculate_enterprise_risk_batch(shipments: List[Dict],
+                                    batch_size: int = RiskConfig.MC_BATCH_SIZE,
+                                    seed: Optional[int] = None) -> List[Dict]:
+    """
+    V16.0: Score many shipments with one batched Monte Carlo pass per chunk
+    
+    Args:
+        shipments: Shipment payloads (same format as calculate_enterprise_risk)
+        batch_size: Shipments per batched (N × iterations × layers) draw
+        seed: Optional seed for reproducible results
+    
+    Returns:
+        One v16.0 result dict per shipment, in input order
+    """
+    engine = get_shared_engine()
+    return engine.calculate_risk_batch(shipments, batch_size=batch_size, seed=seed)
+
+
 # ===============================================================
 # PERFORMANCE BENCHMARKING
 # ===============================================================
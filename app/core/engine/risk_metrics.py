@@ -0,0 +1,324 @@
+"""
+RISKCAST Risk Metrics Kernel
+============================
+Single-pass VaR/CVaR/moment computation for Monte Carlo distributions
+
+- compute_risk_metrics(): one np.partition for every quantile, one centered
+  pass for the moments, CVaR from the (small) upper partitions only
+- StreamingRiskMetrics: mergeable accumulator (exact moments + KLL quantile
+  sketch) for chunked or streamed simulations that are never materialized
+  as one array
+"""
+
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# ===============================================================
+# EXACT KERNEL
+# ===============================================================
+
+def _lerp(a: np.ndarray, b: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Linear interpolation, same formulation as np.percentile (method='linear')"""
+    diff = b - a
+    return np.where(t >= 0.5, b - diff * (1 - t), a + diff * t)
+
+
+def quantile_tail_stats(distribution: np.ndarray,
+                        quantiles: Sequence[float],
+                        extra_kth: Sequence[int] = ()) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Quantiles plus tail statistics from a single partition
+
+    For each q returns the linear-interpolated quantile v_q (as
+    np.percentile) and the count and mean of the tail {x >= v_q}, the
+    same set a boolean mask `x[x >= v_q]` would select.
+
+    Args:
+        distribution: 1-D sample array (not modified)
+        quantiles: Quantiles in [0, 1]
+        extra_kth: Additional order statistics the caller needs from the partition
+
+    Returns:
+        (partitioned copy, quantile values, tail counts, tail means)
+    """
+    a = np.asarray(distribution).ravel()
+    n = a.size
+    q = np.asarray(quantiles, dtype=float)
+
+    positions = q * (n - 1)
+    lo = np.floor(positions).astype(np.intp)
+    hi = np.minimum(lo + 1, n - 1)
+    t = positions - lo
+
+    kth = np.unique(np.concatenate([lo, hi, [0, n - 1], np.asarray(extra_kth, dtype=np.intp)]))
+    part = np.partition(a, kth)
+
+    values = _lerp(part[lo], part[hi], t)
+
+    counts = np.empty(len(q), dtype=np.int64)
+    means = np.empty(len(q))
+    for i, (v, start) in enumerate(zip(values, lo)):
+        # Everything left of `start` is <= part[start] <= v
+        upper = part[start:]
+        tail = upper[upper >= v]
+        count = tail.size
+        total = float(tail.sum())
+        if start > 0 and part[start] == v:
+            # Ties with v can also sit left of the partition point
+            ties = int(np.count_nonzero(part[:start] == v))
+            count += ties
+            total += ties * float(v)
+        counts[i] = count
+        means[i] = total / count if count else v
+
+    return part, values, counts, means
+
+
+def compute_risk_metrics(distribution: np.ndarray, downside_target: float = 5.0) -> Dict[str, float]:
+    """
+    Comprehensive risk metrics in one partition + one moment pass
+
+    Returns the same keys as FinancialRiskCalculator.calculate_all_metrics:
+    var_95/99, cvar_95/99, downside_deviation, mean, std, skewness,
+    kurtosis, min, max, median.
+    """
+    a = np.asarray(distribution, dtype=float).ravel()
+    n = a.size
+    mid = n // 2
+
+    part, (var_95, var_99), _, (cvar_95, cvar_99) = quantile_tail_stats(
+        a, (0.95, 0.99), extra_kth=(max(mid - 1, 0), mid)
+    )
+
+    # Median exactly as np.median (mean of the two middle elements)
+    median = part[mid] if n % 2 else (part[mid - 1] + part[mid]) / 2.0
+
+    # Central moments (population, as np.std / scipy.stats defaults)
+    mean = float(np.mean(a))
+    centered = a - mean
+    squared = centered * centered
+    m2 = float(np.mean(squared))
+    m3 = float(np.dot(squared, centered)) / n
+    m4 = float(np.dot(squared, squared)) / n
+
+    return {
+        'var_95': float(var_95),
+        'var_99': float(var_99),
+        'cvar_95': float(cvar_95),
+        'cvar_99': float(cvar_99),
+        'downside_deviation': _downside_deviation(*_downside_sums(a, downside_target)),
+        'mean': mean,
+        'std': float(np.sqrt(m2)),
+        # Undefined for a constant sample (nan, like scipy.stats)
+        'skewness': m3 / m2 ** 1.5 if m2 > 0 else float('nan'),
+        'kurtosis': m4 / m2 ** 2 - 3.0 if m2 > 0 else float('nan'),
+        'min': float(part[0]),
+        'max': float(part[-1]),
+        'median': float(median)
+    }
+
+
+def _downside_sums(a: np.ndarray, target: float) -> Tuple[int, float, float]:
+    """Count, sum and sum of squares of (x - target) over x > target"""
+    excess = np.maximum(a - target, 0.0)
+    return int(np.count_nonzero(excess)), float(excess.sum()), float(np.dot(excess, excess))
+
+
+def _downside_deviation(count: int, s1: float, s2: float) -> float:
+    """Population std of the downside excess from its running sums"""
+    if count == 0:
+        return 0.0
+    mean = s1 / count
+    return float(np.sqrt(max(s2 / count - mean * mean, 0.0)))
+
+
+# ===============================================================
+# MERGEABLE SKETCH
+# ===============================================================
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang, Liberty 2016)
+
+    Level h holds items of weight 2^h; a full level is sorted and every
+    other item (random offset) is promoted. Rank error is O(1/k) with
+    O(k) memory, and two sketches merge by concatenating levels.
+    """
+
+    def __init__(self, k: int = 1024, rng: Optional[np.random.Generator] = None):
+        """
+        Args:
+            k: Accuracy parameter (top-level capacity)
+            rng: Generator for compaction offsets
+        """
+        self.k = k
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(8, int(np.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if items.size > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # Odd item out stays at this level
+                keep = items[-1:] if items.size % 2 else items[:0]
+                promoted = items[:items.size - keep.size][self.rng.integers(2)::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values: np.ndarray) -> None:
+        """Add a chunk of values"""
+        values = np.asarray(values, dtype=float).ravel()
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.n += values.size
+        self._compress()
+
+    def merge(self, other: 'KLLSketch') -> None:
+        """Merge another sketch into this one"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+
+    def _weighted_items(self) -> Tuple[np.ndarray, np.ndarray]:
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(items.size, 2.0 ** h) for h, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        return values[order], weights[order]
+
+    def quantiles(self, quantiles: Sequence[float]) -> np.ndarray:
+        """Approximate quantiles (linear interpolation on weighted ranks)"""
+        values, weights = self._weighted_items()
+        # Rank of an item = centre of its weight span, matching (n - 1) * q indexing
+        ranks = np.cumsum(weights) - weights / 2.0 - 0.5
+        return np.interp(np.asarray(quantiles, dtype=float) * (self.n - 1), ranks, values)
+
+    def tail_mean(self, threshold: float) -> Tuple[float, float]:
+        """Approximate (weight, mean) of the items >= threshold"""
+        values, weights = self._weighted_items()
+        mask = values >= threshold
+        weight = float(weights[mask].sum())
+        if weight == 0:
+            return 0.0, float(threshold)
+        return weight, float(np.dot(values[mask], weights[mask]) / weight)
+
+
+class StreamingRiskMetrics:
+    """
+    Mergeable risk metrics accumulator for chunked / streamed simulations
+
+    Moments, min/max and downside deviation are exact (Pébay's pairwise
+    update formulas); quantiles, VaR and CVaR come from a KLL sketch.
+    result() returns the same keys as compute_risk_metrics().
+    """
+
+    def __init__(self,
+                 downside_target: float = 5.0,
+                 sketch_k: int = 2048,
+                 rng: Optional[np.random.Generator] = None):
+        self.downside_target = downside_target
+        self.sketch = KLLSketch(k=sketch_k, rng=rng)
+
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.down_count = 0
+        self.down_s1 = 0.0
+        self.down_s2 = 0.0
+
+    def _combine_moments(self, n_b: int, mean_b: float, m2_b: float, m3_b: float, m4_b: float) -> None:
+        n_a = self.n
+        if n_b == 0:
+            return
+        if n_a == 0:
+            self.n, self.mean, self.m2, self.m3, self.m4 = n_b, mean_b, m2_b, m3_b, m4_b
+            return
+
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        delta_n = delta / n
+        m2_a, m3_a, m4_a = self.m2, self.m3, self.m4
+
+        self.m4 = (m4_a + m4_b
+                   + delta * delta_n ** 3 * n_a * n_b * (n_a * n_a - n_a * n_b + n_b * n_b)
+                   + 6.0 * delta_n ** 2 * (n_a * n_a * m2_b + n_b * n_b * m2_a)
+                   + 4.0 * delta_n * (n_a * m3_b - n_b * m3_a))
+        self.m3 = (m3_a + m3_b
+                   + delta * delta_n ** 2 * n_a * n_b * (n_a - n_b)
+                   + 3.0 * delta_n * (n_a * m2_b - n_b * m2_a))
+        self.m2 = m2_a + m2_b + delta * delta_n * n_a * n_b
+        self.mean = self.mean + delta_n * n_b
+        self.n = n
+
+    def update(self, chunk: np.ndarray) -> None:
+        """Add a chunk of simulated values"""
+        chunk = np.asarray(chunk, dtype=float).ravel()
+        if chunk.size == 0:
+            return
+
+        mean = float(np.mean(chunk))
+        centered = chunk - mean
+        squared = centered * centered
+        self._combine_moments(chunk.size, mean, float(squared.sum()),
+                              float(np.dot(squared, centered)), float(np.dot(squared, squared)))
+
+        self.min = min(self.min, float(chunk.min()))
+        self.max = max(self.max, float(chunk.max()))
+
+        count, s1, s2 = _downside_sums(chunk, self.downside_target)
+        self.down_count += count
+        self.down_s1 += s1
+        self.down_s2 += s2
+
+        self.sketch.update(chunk)
+
+    def merge(self, other: 'StreamingRiskMetrics') -> None:
+        """Merge another accumulator (e.g. from a parallel worker) into this one"""
+        self._combine_moments(other.n, other.mean, other.m2, other.m3, other.m4)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.down_count += other.down_count
+        self.down_s1 += other.down_s1
+        self.down_s2 += other.down_s2
+        self.sketch.merge(other.sketch)
+
+    def result(self) -> Dict[str, float]:
+        """Current metrics (same keys as compute_risk_metrics)"""
+        if self.n == 0:
+            raise ValueError("No samples accumulated")
+
+        var_95, var_99, median = self.sketch.quantiles((0.95, 0.99, 0.5))
+        _, cvar_95 = self.sketch.tail_mean(var_95)
+        _, cvar_99 = self.sketch.tail_mean(var_99)
+
+        variance = self.m2 / self.n
+        return {
+            'var_95': float(var_95),
+            'var_99': float(var_99),
+            'cvar_95': float(cvar_95),
+            'cvar_99': float(cvar_99),
+            'downside_deviation': _downside_deviation(self.down_count, self.down_s1, self.down_s2),
+            'mean': float(self.mean),
+            'std': float(np.sqrt(variance)),
+            'skewness': (self.m3 / self.n) / variance ** 1.5 if variance > 0 else float('nan'),
+            'kurtosis': (self.m4 / self.n) / variance ** 2 - 3.0 if variance > 0 else float('nan'),
+            'min': float(self.min),
+            'max': float(self.max),
+            'median': float(median)
+        }
@@ -187,8 +187,8 @@ class RiskScoringEngineV21:
         seller = validated_data.get('seller', {})
         buyer = validated_data.get('buyer', {})
         
-        # Calculate sub-factors (V22 enhancement)
-        self.sub_factor_scores = self.calculate_sub_factors(transport, cargo, seller, buyer)
+        # Calculate sub-factors (V22 enhancement); kept local so one engine can serve concurrent requests
+        sub_factor_scores = self.calculate_sub_factors(transport, cargo, seller, buyer)
         
         layer_scores = {}
         
@@ -393,7 +393,7 @@ class RiskScoringEngineV21:
             'risk_grade': self._score_to_grade(overall_score),
             'layer_scores': {k: round(v, 2) for k, v in layer_scores.items()},
             'category_scores': category_scores,
-            'sub_factor_scores': self.sub_factor_scores,  # V22 enhancement
+            'sub_factor_scores': sub_factor_scores,  # V22 enhancement
             'recommendations': recommendations,
             'mitigation_plan': mitigation_plan,
             'financial_impact': self._estimate_financial_impact(
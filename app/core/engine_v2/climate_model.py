@@ -58,9 +58,14 @@ class ClimateRiskModel:
         }
     }
     
-    def __init__(self):
-        """Initialize climate risk model"""
-        pass
+    def __init__(self, rng: Optional[np.random.Generator] = None):
+        """
+        Initialize climate risk model
+        
+        Args:
+            rng: Optional numpy Generator for climate variability draws
+        """
+        self.rng = rng if rng is not None else np.random.default_rng()
     
     def compute_storm_probability(self, route: str, month: int, region: str = "auto") -> float:
         """
@@ -161,13 +166,15 @@ class ClimateRiskModel:
         
         return min(1.0, max(0.0, base_wind))
     
-    def compute_temperature_deviation(self, route: str, month: int) -> float:
+    def compute_temperature_deviation(self, route: str, month: int,
+                                      rng: Optional[np.random.Generator] = None) -> float:
         """
         Compute temperature deviation from normal
         
         Args:
             route: Route identifier
             month: Month number (1-12)
+            rng: Optional Generator (defaults to the model's stream)
             
         Returns:
             Temperature deviation score (0-1, higher = more extreme)
@@ -182,7 +189,8 @@ class ClimateRiskModel:
             base_deviation = 0.6
         
         # Add some randomness (simulating climate variability)
-        variation = np.random.normal(0, 0.1)
+        rng = rng if rng is not None else self.rng
+        variation = rng.normal(0, 0.1)
         deviation = base_deviation + variation
         
         return min(1.0, max(0.0, deviation))
@@ -4,9 +4,13 @@ Implements FAHP with triangular fuzzy numbers for risk factor weighting
 """
 
 import numpy as np
-from typing import Dict, List, Tuple, Optional
+from typing import Any, Dict, List, Tuple, Optional
 from dataclasses import dataclass
+from functools import lru_cache
 import math
+import threading
+
+from app.core.utils.metrics import metrics
 
 
 @dataclass
@@ -51,7 +55,13 @@ class FuzzyTriangular:
 
 
 class FAHPSolver:
-    """Fuzzy AHP solver for risk factor weighting"""
+    """
+    Fuzzy AHP solver for risk factor weighting
+    
+    Context-driven solves are memoized: the risk context is quantized to
+    CONTEXT_DECIMALS and the weights, fuzzy weights and consistency ratio
+    are cached per quantized vector (shared by all solver instances).
+    """
     
     # Linguistic scale for pairwise comparisons (Saaty scale 1-9, fuzzified)
     FUZZY_SCALE = {
@@ -66,6 +76,25 @@ class FAHPSolver:
         9: FuzzyTriangular(8, 9, 9),           # Extreme importance
     }
     
+    # Array form of FUZZY_SCALE: sorted midpoints and (l, m, u) rows
+    _SCALE_MID = np.array([fuzzy_num.m for fuzzy_num in FUZZY_SCALE.values()], dtype=float)
+    _SCALE_TFN = np.array([(f.l, f.m, f.u) for f in FUZZY_SCALE.values()], dtype=float)
+    
+    # Random Index (RI) - from Saaty's table
+    RI_TABLE = {
+        1: 0, 2: 0, 3: 0.58, 4: 0.90, 5: 1.12,
+        6: 1.24, 7: 1.32, 8: 1.41, 9: 1.45, 10: 1.49
+    }
+    
+    # Memoization of context-driven solves
+    CONTEXT_DECIMALS = 3       # Quantization of risk context values (0-1)
+    CACHE_MAX_ENTRIES = 4096
+    CONSISTENCY_THRESHOLD = 0.1
+    
+    # Consistency ratio statistics over all solve() calls
+    _stats_lock = threading.Lock()
+    _cr_stats = {"count": 0, "sum": 0.0, "max": 0.0, "last": None, "inconsistent": 0}
+    
     # Risk factors for FAHP analysis
     RISK_FACTORS = [
         "delay",
@@ -132,35 +161,22 @@ class FAHPSolver:
         Returns:
             Comparison matrix
         """
-        matrix = np.ones((self.n, self.n))
-        factor_idx = {factor: i for i, factor in enumerate(self.RISK_FACTORS)}
-        
-        # Get values for each factor (normalized to 1-9 scale)
-        factor_values = {}
-        for factor in self.RISK_FACTORS:
-            if factor in risk_context:
-                # Map risk value (0-1) to Saaty scale (1-9)
-                value = risk_context[factor]
-                factor_values[factor] = 1 + value * 8  # Scale to 1-9
-            else:
-                factor_values[factor] = 1.0
-        
-        # Build comparison matrix based on relative importance
-        for i, factor1 in enumerate(self.RISK_FACTORS):
-            for j, factor2 in enumerate(self.RISK_FACTORS):
-                if i == j:
-                    matrix[i, j] = 1.0
-                else:
-                    ratio = factor_values[factor1] / factor_values[factor2]
-                    # Clamp to Saaty scale 1-9
-                    ratio = max(1/9, min(9, ratio))
-                    matrix[i, j] = ratio
-                    if j > i:  # Set reciprocal
-                        matrix[j, i] = 1.0 / ratio
-        
+        matrix = self._context_matrix(self._context_vector(risk_context))
         self.comparison_matrix = matrix
         return matrix
     
+    def _context_vector(self, risk_context: Dict[str, float]) -> np.ndarray:
+        """Risk values (0-1) in RISK_FACTORS order; missing factors count as 0"""
+        return np.array([float(risk_context.get(factor, 0.0)) for factor in self.RISK_FACTORS])
+    
+    @staticmethod
+    def _context_matrix(context: np.ndarray) -> np.ndarray:
+        """Comparison matrix of relative importance for a context vector"""
+        # Map risk value (0-1) to Saaty scale (1-9)
+        values = 1 + context * 8
+        # Clamp ratios to Saaty scale 1-9 (diagonal is exactly 1)
+        return np.clip(values[:, np.newaxis] / values[np.newaxis, :], 1 / 9, 9)
+    
     def compute_fuzzy_weights(self) -> List[FuzzyTriangular]:
         """
         Compute fuzzy weights using geometric mean method
@@ -171,55 +187,27 @@ class FAHPSolver:
         if self.comparison_matrix is None:
             raise ValueError("Comparison matrix not set")
         
-        n = self.n
-        fuzzy_weights = []
+        fuzzy_array = self._fuzzy_weight_array(self.comparison_matrix)
+        self.fuzzy_weights = [FuzzyTriangular(*row) for row in fuzzy_array]
+        return self.fuzzy_weights
+    
+    @classmethod
+    def _fuzzy_weight_array(cls, comparison_matrix: np.ndarray) -> np.ndarray:
+        """
+        Normalized fuzzy weights (n×3 array of l, m, u) for a crisp matrix
+        """
+        n = comparison_matrix.shape[0]
         
-        # Step 1: Convert crisp comparison matrix to fuzzy
-        fuzzy_matrix = []
-        for i in range(n):
-            row = []
-            for j in range(n):
-                crisp_value = self.comparison_matrix[i, j]
-                # Find closest fuzzy scale
-                fuzzy_num = self._crisp_to_fuzzy(crisp_value)
-                row.append(fuzzy_num)
-            fuzzy_matrix.append(row)
+        # Step 1: Convert crisp comparison matrix to fuzzy (n×n×3)
+        fuzzy_matrix = cls._SCALE_TFN[cls._scale_indices(comparison_matrix)]
         
         # Step 2: Geometric mean for each row
-        geometric_means = []
-        for i in range(n):
-            gm_l = 1.0
-            gm_m = 1.0
-            gm_u = 1.0
-            
-            for j in range(n):
-                fuzzy_num = fuzzy_matrix[i][j]
-                gm_l *= fuzzy_num.l
-                gm_m *= fuzzy_num.m
-                gm_u *= fuzzy_num.u
-            
-            # nth root
-            gm_l = gm_l ** (1.0 / n)
-            gm_m = gm_m ** (1.0 / n)
-            gm_u = gm_u ** (1.0 / n)
-            
-            geometric_means.append(FuzzyTriangular(gm_l, gm_m, gm_u))
+        geometric_means = np.prod(fuzzy_matrix, axis=1) ** (1.0 / n)
         
         # Step 3: Normalize weights
-        sum_l = sum(gm.l for gm in geometric_means)
-        sum_m = sum(gm.m for gm in geometric_means)
-        sum_u = sum(gm.u for gm in geometric_means)
-        
-        for gm in geometric_means:
-            normalized = FuzzyTriangular(
-                l=gm.l / sum_u,  # Divide by max sum for lower bound
-                m=gm.m / sum_m,  # Divide by mean sum for middle
-                u=gm.u / sum_l   # Divide by min sum for upper bound
-            )
-            fuzzy_weights.append(normalized)
-        
-        self.fuzzy_weights = fuzzy_weights
-        return fuzzy_weights
+        sum_l, sum_m, sum_u = geometric_means.sum(axis=0)
+        # Lower bound / max sum, middle / mean sum, upper bound / min sum
+        return geometric_means / np.array([sum_u, sum_m, sum_l])
     
     def compute_crisp_weights(self) -> Dict[str, float]:
         """
@@ -231,21 +219,21 @@ class FAHPSolver:
         if self.fuzzy_weights is None:
             self.compute_fuzzy_weights()
         
-        crisp_weights_list = [fw.defuzzify() for fw in self.fuzzy_weights]
-        
-        # Normalize to sum to 1
-        total = sum(crisp_weights_list)
-        if total > 0:
-            crisp_weights_list = [w / total for w in crisp_weights_list]
-        
-        crisp_weights = {
-            self.RISK_FACTORS[i]: crisp_weights_list[i]
-            for i in range(self.n)
-        }
+        fuzzy_array = np.array([(fw.l, fw.m, fw.u) for fw in self.fuzzy_weights])
+        crisp_weights = dict(zip(self.RISK_FACTORS, self._crisp_weight_list(fuzzy_array)))
         
         self.crisp_weights = crisp_weights
         return crisp_weights
     
+    @staticmethod
+    def _crisp_weight_list(fuzzy_array: np.ndarray) -> List[float]:
+        """Centroid-defuzzified weights, normalized to sum to 1"""
+        crisp = (fuzzy_array[:, 0] + 2 * fuzzy_array[:, 1] + fuzzy_array[:, 2]) / 4.0
+        total = crisp.sum()
+        if total > 0:
+            crisp = crisp / total
+        return crisp.tolist()
+    
     def check_consistency(self) -> float:
         """
         Check consistency ratio (CR) - should be < 0.1
@@ -256,46 +244,118 @@ class FAHPSolver:
         if self.comparison_matrix is None:
             raise ValueError("Comparison matrix not set")
         
-        n = self.n
-        matrix = self.comparison_matrix
+        cr = self._consistency_ratio(self.comparison_matrix)
+        self.consistency_ratio = cr
+        return cr
+    
+    @classmethod
+    def _consistency_ratio(cls, matrix: np.ndarray) -> float:
+        """Saaty consistency ratio CR = CI / RI of a comparison matrix"""
+        n = matrix.shape[0]
         
-        # Compute eigenvalues
-        eigenvalues, _ = np.linalg.eig(matrix)
-        lambda_max = max(eigenvalues.real)
+        # Compute eigenvalues (eigenvectors are not needed)
+        lambda_max = float(np.max(np.linalg.eigvals(matrix).real))
         
         # Consistency Index (CI)
         ci = (lambda_max - n) / (n - 1)
         
-        # Random Index (RI) - from Saaty's table
-        ri_table = {
-            1: 0, 2: 0, 3: 0.58, 4: 0.90, 5: 1.12,
-            6: 1.24, 7: 1.32, 8: 1.41, 9: 1.45, 10: 1.49
-        }
-        ri = ri_table.get(n, 1.49)
+        ri = cls.RI_TABLE.get(n, 1.49)
         
         # Consistency Ratio
-        if ri > 0:
-            cr = ci / ri
-        else:
-            cr = 0.0
+        return ci / ri if ri > 0 else 0.0
+    
+    @classmethod
+    def _scale_indices(cls, crisp_values: np.ndarray) -> np.ndarray:
+        """
+        Index of the closest FUZZY_SCALE midpoint for each crisp value
         
-        self.consistency_ratio = cr
-        return cr
+        Ties go to the lower scale value, as in a linear scan of the scale.
+        """
+        mids = cls._SCALE_MID
+        crisp_values = np.asarray(crisp_values, dtype=float)
+        upper = np.clip(np.searchsorted(mids, crisp_values), 1, len(mids) - 1)
+        lower = upper - 1
+        closer_to_lower = crisp_values - mids[lower] <= mids[upper] - crisp_values
+        return np.where(closer_to_lower, lower, upper)
     
     def _crisp_to_fuzzy(self, crisp_value: float) -> FuzzyTriangular:
         """Convert crisp value to closest fuzzy triangular number"""
-        # Find closest scale value
-        min_diff = float('inf')
-        closest_scale = 1
-        
-        for scale, fuzzy_num in self.FUZZY_SCALE.items():
-            diff = abs(crisp_value - fuzzy_num.m)
-            if diff < min_diff:
-                min_diff = diff
-                closest_scale = scale
-        
+        closest_scale = int(self._scale_indices(crisp_value)) + 1
         return self.FUZZY_SCALE[closest_scale]
     
+    @staticmethod
+    @lru_cache(maxsize=CACHE_MAX_ENTRIES)
+    def _solve_quantized(context: Tuple[float, ...]) -> Tuple[np.ndarray, np.ndarray, Tuple[float, ...], float]:
+        """
+        Memoized solve for a quantized context vector
+        
+        Returns:
+            (comparison matrix, fuzzy weight array, crisp weights, consistency ratio)
+        """
+        matrix = FAHPSolver._context_matrix(np.array(context))
+        fuzzy_array = FAHPSolver._fuzzy_weight_array(matrix)
+        crisp = tuple(FAHPSolver._crisp_weight_list(fuzzy_array))
+        cr = FAHPSolver._consistency_ratio(matrix)
+        
+        # Cached arrays are shared; callers receive copies
+        matrix.flags.writeable = False
+        fuzzy_array.flags.writeable = False
+        return matrix, fuzzy_array, crisp, cr
+    
+    def _solve_from_context(self, risk_context: Dict[str, float]) -> Dict[str, float]:
+        """Context-driven solve through the quantized memo cache"""
+        context = np.round(self._context_vector(risk_context), self.CONTEXT_DECIMALS)
+        # + 0.0 folds -0.0 into 0.0 so both share a cache entry
+        matrix, fuzzy_array, crisp, cr = self._solve_quantized(tuple((context + 0.0).tolist()))
+        
+        self.comparison_matrix = matrix.copy()
+        self.fuzzy_weights = [FuzzyTriangular(*row) for row in fuzzy_array.tolist()]
+        self.crisp_weights = dict(zip(self.RISK_FACTORS, crisp))
+        self.consistency_ratio = cr
+        return dict(self.crisp_weights)
+    
+    @classmethod
+    def _record_consistency(cls, cr: float) -> None:
+        with cls._stats_lock:
+            stats = cls._cr_stats
+            stats["count"] += 1
+            stats["sum"] += cr
+            stats["max"] = max(stats["max"], cr)
+            stats["last"] = cr
+            if cr > cls.CONSISTENCY_THRESHOLD:
+                stats["inconsistent"] += 1
+    
+    @classmethod
+    def get_cache_stats(cls) -> Dict[str, Any]:
+        """Return memo cache hit rate and consistency ratio statistics"""
+        info = cls._solve_quantized.cache_info()
+        lookups = info.hits + info.misses
+        with cls._stats_lock:
+            stats = dict(cls._cr_stats)
+        
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_rate": info.hits / lookups if lookups else 0.0,
+            "entries": info.currsize,
+            "max_entries": info.maxsize,
+            "consistency": {
+                "solves": stats["count"],
+                "mean_ratio": stats["sum"] / stats["count"] if stats["count"] else 0.0,
+                "max_ratio": stats["max"],
+                "last_ratio": stats["last"],
+                "inconsistent_solves": stats["inconsistent"],
+                "threshold": cls.CONSISTENCY_THRESHOLD,
+            },
+        }
+    
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Clear the memo cache and reset statistics"""
+        cls._solve_quantized.cache_clear()
+        with cls._stats_lock:
+            cls._cr_stats.update({"count": 0, "sum": 0.0, "max": 0.0, "last": None, "inconsistent": 0})
+    
     def solve(self, risk_context: Optional[Dict[str, float]] = None,
               comparisons: Optional[Dict[str, Dict[str, int]]] = None) -> Dict[str, float]:
         """
@@ -309,20 +369,26 @@ class FAHPSolver:
             Dictionary of factor weights
         """
         # Build comparison matrix
+        weights = None
         if comparisons:
             self.build_comparison_matrix(comparisons)
         elif risk_context:
-            self.build_default_comparison_matrix(risk_context)
+            # Memoized on the quantized context vector
+            weights = self._solve_from_context(risk_context)
         else:
             # Use equal weights as default
             self.comparison_matrix = np.ones((self.n, self.n))
         
-        # Compute weights
-        self.compute_fuzzy_weights()
-        weights = self.compute_crisp_weights()
+        if weights is None:
+            # Compute weights
+            self.compute_fuzzy_weights()
+            weights = self.compute_crisp_weights()
+            
+            # Check consistency
+            self.check_consistency()
         
-        # Check consistency
-        cr = self.check_consistency()
+        cr = self.consistency_ratio
+        self._record_consistency(cr)
         
         if cr > 0.1:
             # Warning: consistency ratio too high
@@ -331,6 +397,21 @@ class FAHPSolver:
         return weights
 
 
+def _collect_metrics():
+    stats = FAHPSolver.get_cache_stats()
+    yield ("riskcast_fahp_cache_lookups_total", "counter", "FAHP memo cache lookups",
+           {"result": "hit"}, stats["hits"])
+    yield ("riskcast_fahp_cache_lookups_total", "counter", "FAHP memo cache lookups",
+           {"result": "miss"}, stats["misses"])
+    yield ("riskcast_fahp_cache_entries", "gauge", "FAHP memo cache entries", {}, stats["entries"])
+    yield ("riskcast_fahp_inconsistent_solves_total", "counter",
+           "FAHP solves above the consistency ratio threshold", {},
+           stats["consistency"]["inconsistent_solves"])
+
+
+metrics.register_collector(_collect_metrics)
+
+
 
 
 
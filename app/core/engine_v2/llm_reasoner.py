@@ -5,8 +5,11 @@ Generates natural language explanations and reasoning for risk assessments
 
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
+import json
 import os
+from pydantic import BaseModel, Field, ValidationError
 from app.core.i18n.translator import Translator
+from app.core.services.llm_gateway import llm_gateway
 
 
 @dataclass
@@ -17,30 +20,75 @@ class LLMReasoningResult:
     confidence_score: float  # 0-1
     suggestions: List[str]  # Mitigation suggestions
     business_justification: str  # Business-focused justification
+    source: str = "deterministic"  # "llm" or "deterministic"
+
+
+class LLMReasoningSchema(BaseModel):
+    """Schema the LLM must answer with (validated before use)"""
+    explanation: str = Field(min_length=1)
+    key_drivers: List[str] = Field(min_length=1, max_length=5)
+    confidence_score: float = Field(ge=0.0, le=1.0)
+    suggestions: List[str] = Field(min_length=1, max_length=6)
+    business_justification: str = Field(min_length=1)
+
+
+# Example object shown to the LLM (keys and types must match LLMReasoningSchema)
+LLM_RESPONSE_FORMAT = json.dumps({
+    "explanation": "2-3 sentence explanation of the risk assessment",
+    "key_drivers": ["driver 1", "driver 2", "driver 3"],
+    "confidence_score": 0.8,
+    "suggestions": ["suggestion 1", "suggestion 2", "suggestion 3"],
+    "business_justification": "executive-friendly justification",
+}, indent=2)
+
+
+def parse_llm_reasoning(response_text: str) -> Optional[LLMReasoningResult]:
+    """
+    Parse and validate a JSON reasoning response
+    
+    Tolerates Markdown code fences and text around the JSON object.
+    
+    Args:
+        response_text: Raw LLM response
+        
+    Returns:
+        LLMReasoningResult, or None if the response is not valid
+    """
+    start = response_text.find("{")
+    end = response_text.rfind("}")
+    if start < 0 or end <= start:
+        return None
+    try:
+        parsed = LLMReasoningSchema.model_validate_json(response_text[start:end + 1])
+    except ValidationError:
+        return None
+    return LLMReasoningResult(
+        explanation=parsed.explanation.strip(),
+        key_drivers=[driver.strip() for driver in parsed.key_drivers],
+        confidence_score=parsed.confidence_score,
+        suggestions=[suggestion.strip() for suggestion in parsed.suggestions],
+        business_justification=parsed.business_justification.strip(),
+        source="llm"
+    )
 
 
 class LLMReasoner:
     """LLM-based reasoner for risk explanations"""
     
-    def __init__(self, use_llm: bool = True):
+    def __init__(self, use_llm: Optional[bool] = None):
         """
         Initialize LLM reasoner
         
         Args:
-            use_llm: Whether to use actual LLM (requires API key) or deterministic logic
+            use_llm: Whether to use actual LLM (requires API key) or deterministic logic.
+                None reads LLM_REASONING_ENABLED (default: true); when disabled no
+                remote call is made at all.
         """
+        if use_llm is None:
+            use_llm = os.getenv("LLM_REASONING_ENABLED", "true").lower() in ("1", "true", "yes")
         self.use_llm = use_llm
-        self.anthropic_client = None
-        
-        # Try to initialize Anthropic client if available
-        if use_llm:
-            try:
-                from anthropic import Anthropic
-                api_key = os.getenv("ANTHROPIC_API_KEY")
-                if api_key and api_key != "your_anthropic_api_key_here":
-                    self.anthropic_client = Anthropic(api_key=api_key)
-            except:
-                self.use_llm = False
+        # Shared async gateway (pooled client, concurrency cap, response cache)
+        self.gateway = llm_gateway if use_llm else None
     
     def generate_reasoning_deterministic(self, factors: Dict[str, float],
                                         weights: Dict[str, float],
@@ -138,7 +186,7 @@ class LLMReasoner:
         Returns:
             LLMReasoningResult or None if LLM unavailable
         """
-        if not self.anthropic_client:
+        if not self.gateway or not self.gateway.available:
             return None
         
         # Build prompt (DO NOT leak internal weights or API keys)
@@ -175,21 +223,20 @@ Provide:
 4. 3-4 actionable suggestions to mitigate risk
 5. A business justification in executive-friendly language
 
-Format your response clearly and avoid technical jargon. Focus on business impact and actionable insights.
+Avoid technical jargon. Focus on business impact and actionable insights.
+
+Respond with ONLY a JSON object in exactly this format (no Markdown, no extra text):
+{LLM_RESPONSE_FORMAT}
 """
         
         try:
-            response = self.anthropic_client.messages.create(
-                model="claude-3-haiku-20240307",
-                max_tokens=1000,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            response_text = await self.gateway.complete(prompt, max_tokens=1000)
             
-            # Parse response (simplified - would need more robust parsing)
-            response_text = response.content[0].text
-            
-            # For now, return deterministic result (LLM integration can be enhanced)
-            return self.generate_reasoning_deterministic(factors, weights, score, profile)
+            result = parse_llm_reasoning(response_text)
+            if result is None:
+                # Malformed or schema-invalid output: fall back to deterministic
+                return self.generate_reasoning_deterministic(factors, weights, score, profile)
+            return result
             
         except Exception as e:
             # Fallback to deterministic
@@ -211,7 +258,7 @@ Format your response clearly and avoid technical jargon. Focus on business impac
         Returns:
             LLMReasoningResult object
         """
-        if self.use_llm and self.anthropic_client:
+        if self.use_llm and self.gateway and self.gateway.available:
             result = await self.generate_reasoning_llm(factors, weights, score, profile)
             if result:
                 return result
@@ -235,6 +282,7 @@ Format your response clearly and avoid technical jargon. Focus on business impac
             "confidence_score": reasoning.confidence_score,
             "suggestions": reasoning.suggestions,
             "business_justification": reasoning.business_justification,
+            "source": reasoning.source,
         }
     
     def generate_scenario_explanation_deterministic(self,
@@ -413,7 +461,8 @@ Format your response clearly and avoid technical jargon. Focus on business impac
             key_drivers=translated_drivers,
             confidence_score=base_result.confidence_score,
             suggestions=translated_suggestions,
-            business_justification=business_just
+            business_justification=business_just,
+            source=base_result.source
         )
     
     def _get_region_insights(self, region: str, region_config: Optional[Dict],
@@ -6,6 +6,7 @@ Main pipeline that orchestrates all risk assessment components
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
 import json
+import threading
 
 from app.core.engine_v2.fahp import FAHPSolver
 from app.core.engine_v2.topsis import TOPSISSolver
@@ -15,6 +16,7 @@ from app.core.engine_v2.scoring import UnifiedRiskScoring
 from app.core.engine_v2.risk_profile import RiskProfileBuilder
 from app.core.engine_v2.llm_reasoner import LLMReasoner
 from app.core.utils.sanitizer import sanitize_input
+from app.core.utils.metrics import timed_stage
 from app.core.regions.detector import RegionDetector
 
 
@@ -23,15 +25,31 @@ class RiskPipeline:
     
     def __init__(self):
         """Initialize risk pipeline"""
-        self.fahp_solver = FAHPSolver()
-        self.topsis_solver = TOPSISSolver()
+        # FAHP/TOPSIS keep per-solve state on the instance, so each thread gets its own pair
+        self._solvers = threading.local()
         self.climate_model = ClimateRiskModel()
         self.network_model = NetworkRiskModel()
         self.scoring = UnifiedRiskScoring()
         self.profile_builder = RiskProfileBuilder()
-        self.llm_reasoner = LLMReasoner(use_llm=True)  # Can disable for testing
+        self.llm_reasoner = LLMReasoner()  # LLM_REASONING_ENABLED=false disables the LLM call
         self.region_detector = RegionDetector()
     
+    @property
+    def fahp_solver(self) -> FAHPSolver:
+        """FAHP solver owned by the calling thread"""
+        solver = getattr(self._solvers, "fahp", None)
+        if solver is None:
+            solver = self._solvers.fahp = FAHPSolver()
+        return solver
+    
+    @property
+    def topsis_solver(self) -> TOPSISSolver:
+        """TOPSIS solver owned by the calling thread"""
+        solver = getattr(self._solvers, "topsis", None)
+        if solver is None:
+            solver = self._solvers.topsis = TOPSISSolver()
+        return solver
+    
     def parse_inputs(self, shipment_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Parse and sanitize shipment inputs
@@ -71,6 +89,11 @@ class RiskPipeline:
                 except (ValueError, TypeError):
                     parsed[key] = None
         
+        # Present-but-null ratings (e.g. Optional model fields) fall back to neutral
+        for key in ["packaging_quality", "container_match", "carrier_rating"]:
+            if parsed[key] is None:
+                parsed[key] = 0.5
+        
         return parsed
     
     def extract_risk_context(self, inputs: Dict[str, Any]) -> Dict[str, float]:
@@ -95,8 +118,8 @@ class RiskPipeline:
             context["delay"] = 0.5  # Default
         
         # Port risk (based on POL/POD - simplified)
-        pol = inputs.get("pol", "")
-        pod = inputs.get("pod", "")
+        pol = inputs.get("pol") or ""
+        pod = inputs.get("pod") or ""
         if pol or pod:
             # Assume major ports have higher congestion risk
             context["port"] = 0.6 if any(x in (pol + pod).upper() for x in ["SINGAPORE", "ROTTERDAM", "SHANGHAI"]) else 0.4
@@ -105,12 +128,16 @@ class RiskPipeline:
         context["climate"] = 0.5
         
         # Carrier risk (based on rating)
-        carrier_rating = inputs.get("carrier_rating", 0.5)
+        carrier_rating = inputs.get("carrier_rating")
+        if carrier_rating is None:
+            carrier_rating = 0.5
         context["carrier"] = 1.0 - carrier_rating  # Invert: lower rating = higher risk
         context["esg"] = 0.3
         
         # Equipment risk (based on container match)
-        container_match = inputs.get("container_match", 0.5)
+        container_match = inputs.get("container_match")
+        if container_match is None:
+            container_match = 0.5
         context["equipment"] = 1.0 - container_match  # Lower match = higher risk
         
         return context
@@ -130,9 +157,9 @@ class RiskPipeline:
         inputs = self.parse_inputs(shipment_data)
         
         # Step 1.5: Detect region and load region config
-        route = inputs.get("route", "")
-        pol = inputs.get("pol", "")
-        pod = inputs.get("pod", "")
+        route = inputs.get("route") or ""
+        pol = inputs.get("pol") or ""
+        pod = inputs.get("pod") or ""
         origin = pol or route.split('_')[0] if route else ""
         destination = pod or route.split('_')[1] if '_' in route else ""
         
@@ -142,7 +169,10 @@ class RiskPipeline:
         risk_context = self.extract_risk_context(inputs)
         
         # Step 3: Run FAHP
-        fahp_weights = self.fahp_solver.solve(risk_context=risk_context)
+        with timed_stage("fahp", engine="v2"):
+            fahp_weights = self.fahp_solver.solve(risk_context=risk_context)
+            # Read before any await: another request may reuse this thread's solver
+            fahp_consistency_ratio = self.fahp_solver.consistency_ratio
         
         # Step 4: Run TOPSIS
         # Build alternatives (single alternative for this shipment)
@@ -152,31 +182,34 @@ class RiskPipeline:
         # Determine criteria directions (all are minimization - lower is better)
         criteria_directions = {c: "minimize" for c in criteria}
         
-        topsis_result = self.topsis_solver.solve(
-            alternatives=alternatives,
-            criteria=criteria,
-            weights=fahp_weights,
-            criteria_directions=criteria_directions
-        )
+        with timed_stage("topsis", engine="v2"):
+            topsis_result = self.topsis_solver.solve(
+                alternatives=alternatives,
+                criteria=criteria,
+                weights=fahp_weights,
+                criteria_directions=criteria_directions
+            )
         
         # Step 5: Run climate model
-        climate_result = self.climate_model.compute_climate_risk(
-            route=inputs.get("route", "UNKNOWN"),
-            departure_date=inputs.get("etd"),
-            etd=inputs.get("etd"),
-            enso_state="neutral"  # Can be parameterized
-        )
+        with timed_stage("climate", engine="v2"):
+            climate_result = self.climate_model.compute_climate_risk(
+                route=route or "UNKNOWN",
+                departure_date=inputs.get("etd"),
+                etd=inputs.get("etd"),
+                enso_state="neutral"  # Can be parameterized
+            )
         
         # Update risk_context with climate
         risk_context["climate"] = climate_result.overall_risk
         
         # Step 6: Run network model
-        network_result = self.network_model.compute_network_risk(
-            pol=inputs.get("pol", ""),
-            pod=inputs.get("pod", ""),
-            carrier=inputs.get("carrier"),
-            route=inputs.get("route")
-        )
+        with timed_stage("network", engine="v2"):
+            network_result = self.network_model.compute_network_risk(
+                pol=pol,
+                pod=pod,
+                carrier=inputs.get("carrier"),
+                route=route or None
+            )
         
         # Step 7: Apply region-based adjustments
         # Adjust climate and network risks based on region weights
@@ -187,14 +220,15 @@ class RiskPipeline:
         adjusted_fahp_weights = self._apply_region_weights(fahp_weights, risk_context, region_config)
         
         # Step 8: Compute unified score with region adjustments
-        score_components = self.scoring.compute_unified_score(
-            topsis_score=topsis_result.closeness_coefficient,
-            fahp_weights=adjusted_fahp_weights,
-            climate_risk=adjusted_climate_risk,
-            network_risk=adjusted_network_risk,
-            operational_inputs=inputs,
-            critical_fields=["route", "pol", "pod", "cargo_value"]
-        )
+        with timed_stage("scoring", engine="v2"):
+            score_components = self.scoring.compute_unified_score(
+                topsis_score=topsis_result.closeness_coefficient,
+                fahp_weights=adjusted_fahp_weights,
+                climate_risk=adjusted_climate_risk,
+                network_risk=adjusted_network_risk,
+                operational_inputs=inputs,
+                critical_fields=["route", "pol", "pod", "cargo_value"]
+            )
         
         # Apply region-specific final adjustment
         region_final_score = self._apply_region_final_score(
@@ -212,24 +246,26 @@ class RiskPipeline:
             "operational": score_components.operational_risk,
         }
         
-        risk_profile = self.profile_builder.build_profile(
-            score=score_components.final_score,
-            factors=risk_context,
-            components=components_dict,
-            operational_inputs=inputs,
-            confidence=0.85  # Can be computed from data quality
-        )
+        with timed_stage("profile", engine="v2"):
+            risk_profile = self.profile_builder.build_profile(
+                score=score_components.final_score,
+                factors=risk_context,
+                components=components_dict,
+                operational_inputs=inputs,
+                confidence=0.85  # Can be computed from data quality
+            )
         
         # Step 10: Generate LLM reasoning (region-aware)
-        profile_dict = self.profile_builder.profile_to_dict(risk_profile)
-        reasoning_result = await self.llm_reasoner.generate_region_reasoning(
-            region=region_code,
-            lang=language,
-            profile=profile_dict,
-            factors=risk_context,
-            score=score_components.final_score,
-            region_config=region_config
-        )
+        with timed_stage("reasoning", engine="v2"):
+            profile_dict = self.profile_builder.profile_to_dict(risk_profile)
+            reasoning_result = await self.llm_reasoner.generate_region_reasoning(
+                region=region_code,
+                lang=language,
+                profile=profile_dict,
+                factors=risk_context,
+                score=score_components.final_score,
+                region_config=region_config
+            )
         
         # Step 11: Build final result
         result = {
@@ -254,6 +290,7 @@ class RiskPipeline:
             "reasoning": {
                 "explanation": reasoning_result.explanation,
                 "business_justification": reasoning_result.business_justification,
+                "source": reasoning_result.source,
             },
             "components": {
                 "fahp_weighted": round(score_components.fahp_weighted, 3),
@@ -274,6 +311,7 @@ class RiskPipeline:
                     "propagation_factor": round(network_result.propagation_factor, 3),
                 },
                 "fahp_weights": {k: round(v, 3) for k, v in fahp_weights.items()},
+                "fahp_consistency_ratio": round(fahp_consistency_ratio, 4),
                 "topsis_score": round(topsis_result.closeness_coefficient, 3),
             },
             "region": {
@@ -290,6 +328,131 @@ class RiskPipeline:
         
         return result
     
+    # Candidate fields read as a cost criterion when every candidate has one
+    RANKING_COST_FIELDS = ("cost", "freight_cost", "price")
+    
+    def _ranking_criteria(self, candidate: Dict[str, Any], inputs: Dict[str, Any],
+                          context: Dict[str, float]) -> Dict[str, float]:
+        """
+        TOPSIS criteria for one candidate (all minimized)
+        
+        The FAHP risk context only reacts to transit time, port names and the
+        carrier/container ratings, so candidates that differ by carrier or
+        route alone would look identical. Route and carrier enter through the
+        region weights and the (deterministic) network model; raw transit
+        time and an optional cost field are added as their own criteria.
+        """
+        route = inputs.get("route") or ""
+        pol = inputs.get("pol") or ""
+        pod = inputs.get("pod") or ""
+        parts = route.split("_")
+        origin = pol or parts[0]
+        destination = pod or (parts[1] if len(parts) > 1 else "")
+        _, region_config = self.region_detector.detect_region(origin, destination)
+        network = self.network_model.compute_network_risk(
+            pol=pol, pod=pod, carrier=inputs.get("carrier"), route=route or None
+        )
+        
+        criteria = dict(context)
+        criteria["port"] *= region_config.get("congestion_weight", 1.0)
+        criteria["climate"] *= region_config.get("climate_weight", 1.0)
+        criteria["network"] = network.overall_risk * region_config.get("network_propagation_factor", 1.0)
+        if inputs.get("transit_time") is not None:
+            criteria["transit_time"] = inputs["transit_time"]
+        for field in self.RANKING_COST_FIELDS:
+            try:
+                criteria["cost"] = float(candidate[field])
+                break
+            except (KeyError, TypeError, ValueError):
+                continue
+        return criteria
+    
+    def rank_alternatives(self, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Rank candidate shipments (carrier × route × container options)
+        
+        One FAHP solve on the mean risk context supplies the weights for a
+        single batch TOPSIS pass over all candidates. Only criteria that vary
+        across the candidates are used (criteria outside the FAHP context get
+        the mean FAHP weight). Candidates with equal closeness share a rank;
+        if no criterion varies, every candidate is tied at rank 1 with
+        closeness None.
+        
+        Args:
+            candidates: Candidate shipment data dictionaries (optional
+                "cost"/"freight_cost"/"price" is ranked when all have one)
+            
+        Returns:
+            Candidates ordered by rank, each with its closeness score and the
+            criteria values it was ranked on
+        """
+        if not candidates:
+            return []
+        
+        parsed = [self.parse_inputs(candidate) for candidate in candidates]
+        contexts = [self.extract_risk_context(inputs) for inputs in parsed]
+        rows = [self._ranking_criteria(candidate, inputs, context)
+                for candidate, inputs, context in zip(candidates, parsed, contexts)]
+        
+        # Criteria every candidate has, minus those with a single value (no information)
+        common = [c for c in rows[0] if all(c in row for row in rows)]
+        criteria = [c for c in common if max(row[c] for row in rows) - min(row[c] for row in rows) > 1e-12]
+        
+        if not criteria:
+            ranked = [
+                {
+                    "index": i,
+                    "id": candidates[i].get("id", i),
+                    "rank": 1,
+                    "tied": len(candidates) > 1,
+                    "closeness": None,
+                    "distance_to_ideal": None,
+                    "distance_to_anti_ideal": None,
+                    "criteria": {},
+                    "risk_context": {k: round(v, 3) for k, v in contexts[i].items()},
+                }
+                for i in range(len(candidates))
+            ]
+            return ranked
+        
+        # Step 1: One FAHP solve shared by every candidate
+        fahp_criteria = list(contexts[0].keys())
+        mean_context = {c: sum(ctx[c] for ctx in contexts) / len(contexts) for c in fahp_criteria}
+        fahp_weights = self.fahp_solver.solve(risk_context=mean_context)
+        default_weight = sum(fahp_weights.values()) / len(fahp_weights)
+        weights = {c: fahp_weights.get(c, default_weight) for c in criteria}
+        total = sum(weights.values())
+        weights = {c: w / total for c, w in weights.items()}
+        
+        # Step 2: Batch TOPSIS (all criteria are risks or costs - lower is better)
+        results = self.topsis_solver.solve_batch(
+            alternatives=[{c: row[c] for c in criteria} for row in rows],
+            criteria=criteria,
+            weights=weights,
+            criteria_directions={c: "minimize" for c in criteria}
+        )
+        
+        # Equal closeness -> shared rank (1, 1, 3, ...)
+        closeness = [round(result.closeness_coefficient, 9) for result in results]
+        ranks = [1 + sum(other > value for other in closeness) for value in closeness]
+        
+        ranked = [
+            {
+                "index": i,
+                "id": candidates[i].get("id", i),
+                "rank": ranks[i],
+                "tied": closeness.count(closeness[i]) > 1,
+                "closeness": round(result.closeness_coefficient, 4),
+                "distance_to_ideal": round(result.distance_to_ideal_positive, 4),
+                "distance_to_anti_ideal": round(result.distance_to_ideal_negative, 4),
+                "criteria": {c: round(rows[i][c], 3) for c in criteria},
+                "risk_context": {k: round(v, 3) for k, v in contexts[i].items()},
+            }
+            for i, result in enumerate(results)
+        ]
+        ranked.sort(key=lambda item: (item["rank"], item["index"]))
+        return ranked
+    
     def _apply_region_weights(self, fahp_weights: Dict[str, float], 
                               risk_context: Dict[str, float],
                               region_config: Dict) -> Dict[str, float]:
@@ -356,3 +519,20 @@ class RiskPipeline:
         return final_score
 
 
+_shared_pipeline: Optional[RiskPipeline] = None
+_shared_pipeline_lock = threading.Lock()
+
+
+def get_risk_pipeline() -> RiskPipeline:
+    """
+    Process-wide RiskPipeline, built on first use
+    
+    Returns:
+        Shared pipeline; safe to use from concurrent requests
+    """
+    global _shared_pipeline
+    if _shared_pipeline is None:
+        with _shared_pipeline_lock:
+            if _shared_pipeline is None:
+                _shared_pipeline = RiskPipeline()
+    return _shared_pipeline
@@ -52,14 +52,10 @@ class TOPSISSolver:
         Returns:
             Decision matrix (n alternatives × m criteria)
         """
-        n = len(alternatives)
-        m = len(criteria)
-        
-        matrix = np.zeros((n, m))
-        
-        for i, alt in enumerate(alternatives):
-            for j, criterion in enumerate(criteria):
-                matrix[i, j] = alt.get(criterion, 0.0)
+        matrix = np.array(
+            [[alt.get(criterion, 0.0) for criterion in criteria] for alt in alternatives],
+            dtype=float
+        ).reshape(len(alternatives), len(criteria))
         
         self.decision_matrix = matrix
         return matrix
@@ -110,11 +106,9 @@ class TOPSISSolver:
         Returns:
             Weighted normalized matrix
         """
-        weighted = normalized_matrix.copy()
-        
-        for j, criterion in enumerate(criteria):
-            weight = weights.get(criterion, 1.0 / len(criteria))  # Equal weight if not specified
-            weighted[:, j] *= weight
+        # Equal weight if not specified
+        weight_vector = np.array([weights.get(criterion, 1.0 / len(criteria)) for criterion in criteria])
+        weighted = normalized_matrix * weight_vector
         
         self.weighted_matrix = weighted
         return weighted
@@ -131,21 +125,14 @@ class TOPSISSolver:
         Returns:
             Tuple of (ideal_positive, ideal_negative) vectors
         """
-        n, m = weighted_matrix.shape
-        ideal_positive = np.zeros(m)
-        ideal_negative = np.zeros(m)
+        col_max = np.max(weighted_matrix, axis=0)
+        col_min = np.min(weighted_matrix, axis=0)
+        maximize = np.array([self.criteria_directions.get(criterion, "maximize") == "maximize"
+                             for criterion in criteria], dtype=bool)
         
-        for j, criterion in enumerate(criteria):
-            direction = self.criteria_directions.get(criterion, "maximize")
-            
-            if direction == "maximize":
-                # For maximization: ideal positive = max, ideal negative = min
-                ideal_positive[j] = np.max(weighted_matrix[:, j])
-                ideal_negative[j] = np.min(weighted_matrix[:, j])
-            else:  # minimize
-                # For minimization: ideal positive = min, ideal negative = max
-                ideal_positive[j] = np.min(weighted_matrix[:, j])
-                ideal_negative[j] = np.max(weighted_matrix[:, j])
+        # Maximization: ideal positive = max, ideal negative = min (reversed for minimize)
+        ideal_positive = np.where(maximize, col_max, col_min)
+        ideal_negative = np.where(maximize, col_min, col_max)
         
         self.ideal_positive = ideal_positive
         self.ideal_negative = ideal_negative
@@ -166,16 +153,10 @@ class TOPSISSolver:
         Returns:
             Tuple of (distances_to_positive, distances_to_negative)
         """
-        n = weighted_matrix.shape[0]
-        dist_positive = np.zeros(n)
-        dist_negative = np.zeros(n)
-        
-        for i in range(n):
-            # Euclidean distance
-            dist_positive[i] = np.sqrt(np.sum((weighted_matrix[i] - ideal_positive) ** 2))
-            dist_negative[i] = np.sqrt(np.sum((weighted_matrix[i] - ideal_negative) ** 2))
-        
-        return dist_positive, dist_negative
+        # Euclidean distance of every row to both ideals in one broadcast
+        ideals = np.stack([ideal_positive, ideal_negative])
+        distances = np.linalg.norm(weighted_matrix[np.newaxis, :, :] - ideals[:, np.newaxis, :], axis=2)
+        return distances[0], distances[1]
     
     def calculate_closeness(self, dist_positive: np.ndarray,
                           dist_negative: np.ndarray) -> np.ndarray:
@@ -190,7 +171,7 @@ class TOPSISSolver:
             Closeness coefficient array
         """
         total = dist_positive + dist_negative
-        total[total == 0] = 1e-10  # Avoid division by zero
+        total = np.where(total == 0, 1e-10, total)  # Avoid division by zero
         closeness = dist_negative / total
         return closeness
     
@@ -210,26 +191,8 @@ class TOPSISSolver:
         Returns:
             TOPSISResult object
         """
-        if criteria_directions:
-            self.criteria_directions = criteria_directions
-        
-        # Build decision matrix
-        matrix = self.build_decision_matrix(alternatives, criteria)
-        
-        # Normalize
-        normalized = self.normalize_matrix(method="vector")
-        
-        # Apply weights
-        weighted = self.apply_weights(normalized, criteria, weights)
-        
-        # Find ideal solutions
-        ideal_pos, ideal_neg = self.find_ideal_solutions(weighted, criteria)
-        
-        # Calculate distances
-        dist_pos, dist_neg = self.calculate_distances(weighted, ideal_pos, ideal_neg)
-        
-        # Calculate closeness coefficient
-        closeness = self.calculate_closeness(dist_pos, dist_neg)
+        weighted, dist_pos, dist_neg, closeness = self._run(alternatives, criteria, weights,
+                                                            criteria_directions)
         
         # For single alternative case, return the closeness coefficient
         if len(alternatives) == 1:
@@ -255,6 +218,74 @@ class TOPSISSolver:
             )
         
         return result
+    
+    def solve_batch(self, alternatives: List[Dict[str, float]],
+                    criteria: List[str],
+                    weights: Dict[str, float],
+                    criteria_directions: Optional[Dict[str, str]] = None) -> List[TOPSISResult]:
+        """
+        Rank all alternatives in one vectorized TOPSIS pass
+        
+        Args:
+            alternatives: List of alternative solutions
+            criteria: List of criterion names
+            weights: Weights for each criterion (one FAHP solve shared by all)
+            criteria_directions: "maximize" or "minimize" for each criterion
+            
+        Returns:
+            One TOPSISResult per alternative, in input order (ranking 1 = best)
+        """
+        if not alternatives:
+            return []
+        
+        weighted, dist_pos, dist_neg, closeness = self._run(alternatives, criteria, weights,
+                                                            criteria_directions)
+        
+        # Rank alternatives (higher closeness = better; ties keep input order)
+        order = np.argsort(-closeness, kind="stable")
+        ranks = np.empty(len(order), dtype=int)
+        ranks[order] = np.arange(1, len(order) + 1)
+        
+        weighted_rows = weighted.tolist()
+        return [
+            TOPSISResult(
+                closeness_coefficient=float(closeness[i]),
+                distance_to_ideal_positive=float(dist_pos[i]),
+                distance_to_ideal_negative=float(dist_neg[i]),
+                ranking=int(ranks[i]),
+                normalized_scores=dict(zip(criteria, weighted_rows[i]))
+            )
+            for i in range(len(alternatives))
+        ]
+    
+    def _run(self, alternatives: List[Dict[str, float]],
+             criteria: List[str],
+             weights: Dict[str, float],
+             criteria_directions: Optional[Dict[str, str]] = None
+             ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Shared TOPSIS steps: (weighted matrix, d+, d-, closeness)"""
+        if criteria_directions:
+            self.criteria_directions = criteria_directions
+        
+        # Build decision matrix
+        self.build_decision_matrix(alternatives, criteria)
+        
+        # Normalize
+        normalized = self.normalize_matrix(method="vector")
+        
+        # Apply weights
+        weighted = self.apply_weights(normalized, criteria, weights)
+        
+        # Find ideal solutions
+        ideal_pos, ideal_neg = self.find_ideal_solutions(weighted, criteria)
+        
+        # Calculate distances
+        dist_pos, dist_neg = self.calculate_distances(weighted, ideal_pos, ideal_neg)
+        
+        # Calculate closeness coefficient
+        closeness = self.calculate_closeness(dist_pos, dist_neg)
+        
+        return weighted, dist_pos, dist_neg, closeness
 
 
 
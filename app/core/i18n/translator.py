@@ -8,6 +8,10 @@ from pathlib import Path
 from typing import Dict, Optional, Any, List
 import os
 
+from app.core.utils.logger import get_logger
+
+logger = get_logger("report", "i18n")
+
 
 class Translator:
     """Multi-language translator with fallback support"""
@@ -38,7 +42,7 @@ class Translator:
                     with open(lang_file, 'r', encoding='utf-8') as f:
                         self.translations[lang] = json.load(f)
                 except Exception as e:
-                    print(f"[Translator] Error loading {lang}.json: {e}")
+                    logger.error("Error loading %s.json: %s", lang, e)
                     self.translations[lang] = {}
             else:
                 self.translations[lang] = {}
@@ -139,7 +143,7 @@ class Translator:
         if language in self.SUPPORTED_LANGUAGES:
             self.language = language
         else:
-            print(f"[Translator] Unsupported language: {language}, defaulting to {self.DEFAULT_LANGUAGE}")
+            logger.debug("Unsupported language: %s, defaulting to %s", language, self.DEFAULT_LANGUAGE)
             self.language = self.DEFAULT_LANGUAGE
     
     def translate_dict(self, data: Dict[str, Any], keys_to_translate: Optional[List[str]] = None) -> Dict[str, Any]:
@@ -17,7 +17,7 @@ Author: Kai × Hoàng | v14.5 Climate Intelligence
 import numpy as np
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Any, Tuple
-from scipy import stats
+from scipy import special, stats
 
 
 # ================================================================
@@ -227,9 +227,16 @@ class ClimateMonteCarloExtension:
     def generate_climate_tail_shocks(
         n_samples: int,
         climate_vars: ClimateVariables,
-        base_tail_prob: float = 0.05
+        base_tail_prob: float = 0.05,
+        rng: Optional[np.random.Generator] = None,
+        uniforms: Optional[np.ndarray] = None
     ) -> np.ndarray:
-        """Generate climate-driven tail shock distribution"""
+        """
+        Generate climate-driven tail shock distribution (rng: optional numpy Generator)
+        
+        uniforms: optional (n_samples × 2) points in [0, 1) - e.g. quasi-random -
+        driving the tail event and shock size by inversion instead of rng
+        """
         
         # Combined tail probability
         combined_prob = base_tail_prob + climate_vars.climate_tail_event_probability * 0.5
@@ -239,7 +246,12 @@ class ClimateMonteCarloExtension:
         shocks = np.zeros(n_samples)
         
         # Identify tail event samples
-        tail_mask = np.random.random(n_samples) < combined_prob
+        if uniforms is not None:
+            tail_mask = uniforms[:, 0] < combined_prob
+        else:
+            if rng is None:
+                rng = np.random.default_rng()
+            tail_mask = rng.random(n_samples) < combined_prob
         
         if np.any(tail_mask):
             # Calculate shock magnitude based on climate variables
@@ -251,10 +263,54 @@ class ClimateMonteCarloExtension:
             magnitude = base_magnitude * enso_mult * typhoon_mult * volatility_mult
             
             # Generate gamma-distributed shocks
-            shocks[tail_mask] = np.random.gamma(2.0, magnitude, size=np.sum(tail_mask))
+            if uniforms is not None:
+                shocks[tail_mask] = magnitude * special.gammaincinv(2.0, uniforms[tail_mask, 1])
+            else:
+                shocks[tail_mask] = rng.gamma(2.0, magnitude, size=np.sum(tail_mask))
         
         return shocks
-    
+
+    @staticmethod
+    def generate_climate_tail_shocks_batch(
+        n_samples: int,
+        climate_vars_batch: List[Optional[ClimateVariables]],
+        base_tail_prob: float = 0.05,
+        rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        """
+        Generate climate tail shocks for several shipments at once
+
+        Same model as generate_climate_tail_shocks(); rows whose climate
+        variables are None receive no shocks.
+
+        Returns: shocks (n_shipments × n_samples)
+        """
+        n_shipments = len(climate_vars_batch)
+        probs = np.zeros(n_shipments)
+        magnitudes = np.zeros(n_shipments)
+
+        for i, climate_vars in enumerate(climate_vars_batch):
+            if climate_vars is None:
+                continue
+            probs[i] = np.clip(
+                base_tail_prob + climate_vars.climate_tail_event_probability * 0.5, 0.0, 0.15
+            )
+            magnitudes[i] = (
+                2.0
+                * (1.0 + abs(climate_vars.ENSO_index) * 0.3)
+                * (1.0 + climate_vars.seasonal_typhoon_frequency * 0.5)
+                * (climate_vars.long_term_climate_volatility_index / 5.0)
+            )
+
+        if rng is None:
+            rng = np.random.default_rng()
+        tail_mask = rng.random((n_shipments, n_samples)) < probs[:, np.newaxis]
+
+        # gamma(k, θ) == θ · gamma(k, 1), so one draw serves every magnitude
+        shocks = rng.gamma(2.0, 1.0, size=(n_shipments, n_samples)) * magnitudes[:, np.newaxis]
+
+        return np.where(tail_mask, shocks, 0.0)
+
     @staticmethod
     def build_climate_correlation_matrix(
         layer_names: List[str],
@@ -330,30 +386,51 @@ class ClimateMonteCarloExtension:
                 'climate_volatility': 0.0
             }
         
-        # Standard VaR calculations
-        var_95 = np.percentile(risk_distribution, 95)
-        var_99 = np.percentile(risk_distribution, 99)
-        
-        # CVaR (Expected Shortfall)
-        tail_95 = risk_distribution[risk_distribution >= var_95]
-        tail_99 = risk_distribution[risk_distribution >= var_99]
+        # Imported here: app.core.engine imports this module
+        from app.core.engine.risk_metrics import quantile_tail_stats
         
-        cvar_95 = np.mean(tail_95) if len(tail_95) > 0 else var_95
-        cvar_99 = np.mean(tail_99) if len(tail_99) > 0 else var_99
-        
-        # Climate-specific metrics
-        climate_risk_tail = risk_distribution[risk_distribution >= np.percentile(risk_distribution, 90)]
-        climate_extreme_prob = np.mean(risk_distribution >= np.percentile(risk_distribution, 98))
+        # VaR, CVaR (Expected Shortfall) and climate tail metrics from one partition
+        _, (var_90, var_95, var_98, var_99), tail_counts, tail_means = quantile_tail_stats(
+            risk_distribution, (0.90, 0.95, 0.98, 0.99)
+        )
+        climate_tail_risk, cvar_95, _, cvar_99 = tail_means
+        climate_extreme_prob = tail_counts[2] / len(risk_distribution)
         
         return {
             'climate_var_95': float(var_95),
             'climate_var_99': float(var_99),
             'climate_cvar_95': float(cvar_95),
             'climate_cvar_99': float(cvar_99),
-            'climate_tail_risk': float(np.mean(climate_risk_tail)) if len(climate_risk_tail) > 0 else 0.0,
+            'climate_tail_risk': float(climate_tail_risk),
             'climate_extreme_probability': float(climate_extreme_prob),
             'climate_volatility': float(np.std(risk_distribution))
         }
+    
+    @staticmethod
+    def calculate_climate_var_streaming(accumulator) -> Dict[str, float]:
+        """
+        calculate_climate_var() from a StreamingRiskMetrics accumulator
+        (chunked Monte Carlo runs that never hold the full distribution)
+        """
+        if accumulator.n == 0:
+            return ClimateMonteCarloExtension.calculate_climate_var(np.empty(0))
+        
+        sketch = accumulator.sketch
+        var_90, var_95, var_98, var_99 = sketch.quantiles((0.90, 0.95, 0.98, 0.99))
+        _, climate_tail_risk = sketch.tail_mean(var_90)
+        _, cvar_95 = sketch.tail_mean(var_95)
+        extreme_weight, _ = sketch.tail_mean(var_98)
+        _, cvar_99 = sketch.tail_mean(var_99)
+        
+        return {
+            'climate_var_95': float(var_95),
+            'climate_var_99': float(var_99),
+            'climate_cvar_95': float(cvar_95),
+            'climate_cvar_99': float(cvar_99),
+            'climate_tail_risk': float(climate_tail_risk),
+            'climate_extreme_probability': float(extreme_weight / accumulator.n),
+            'climate_volatility': float(np.sqrt(accumulator.m2 / accumulator.n))
+        }
 
 
 # ================================================================
@@ -3,9 +3,15 @@ RISKCAST Report Module
 Enterprise PDF report builder with AI-powered insights
 """
 
-from .pdf_builder import PDFReportBuilder
-from .pdf_layouts import PDFLayouts
-from .image_exporter import ImageExporter
+import importlib
+
+# Loaded on first attribute access: importing ReportLab/PIL is slow and only
+# needed when a report is generated
+_LAZY_EXPORTS = {
+    "PDFReportBuilder": ".pdf_builder",
+    "PDFLayouts": ".pdf_layouts",
+    "ImageExporter": ".image_exporter",
+}
 
 __all__ = [
     "PDFReportBuilder",
@@ -14,6 +20,15 @@ __all__ = [
 ]
 
 
+def __getattr__(name: str):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
 
 
 
@@ -1,13 +1,25 @@
 """
 RISKCAST Report - Image Exporter
 Utilities for processing chart images and base64 conversion
+
+Configuration (environment):
+    REPORT_IMAGE_DPI       Resolution charts are downscaled to for their printed size (default: 150)
+    REPORT_IMAGE_QUALITY   JPEG quality of embedded charts (default: 85)
 """
 
 from typing import Optional
 import base64
 import io
+import os
 from PIL import Image
 
+from app.core.utils.logger import get_logger
+
+logger = get_logger("report", "images")
+
+PRINT_DPI = int(os.getenv("REPORT_IMAGE_DPI", "150"))
+JPEG_QUALITY = int(os.getenv("REPORT_IMAGE_QUALITY", "85"))
+
 
 class ImageExporter:
     """Image export and processing utilities"""
@@ -35,21 +47,34 @@ class ImageExporter:
             image = Image.open(io.BytesIO(image_data))
             
             # Convert to RGB if necessary (for PDF compatibility)
-            if image.mode in ('RGBA', 'LA', 'P'):
-                # Create white background
-                rgb_image = Image.new('RGB', image.size, (255, 255, 255))
-                if image.mode == 'P':
-                    image = image.convert('RGBA')
-                if image.mode in ('RGBA', 'LA'):
-                    rgb_image.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else image.split()[1])
-                image = rgb_image
-            
-            return image
+            return ImageExporter.flatten_to_rgb(image)
             
         except Exception as e:
-            print(f"[ImageExporter] Error decoding image: {e}")
+            logger.warning("Error decoding image: %s", e)
             return None
     
+    @staticmethod
+    def flatten_to_rgb(image: Image.Image) -> Image.Image:
+        """
+        Composite transparency onto white and convert to RGB
+        
+        Args:
+            image: PIL Image object (any mode)
+            
+        Returns:
+            RGB PIL Image
+        """
+        if image.mode in ('RGBA', 'LA', 'P'):
+            # Create white background
+            rgb_image = Image.new('RGB', image.size, (255, 255, 255))
+            if image.mode == 'P':
+                image = image.convert('RGBA')
+            rgb_image.paste(image, mask=image.split()[-1])
+            return rgb_image
+        if image.mode != 'RGB':
+            return image.convert('RGB')
+        return image
+    
     @staticmethod
     def resize_image(image: Image.Image, max_width: int = 800, max_height: int = 600) -> Image.Image:
         """
@@ -111,6 +136,48 @@ class ImageExporter:
         
         # Convert to bytes
         return ImageExporter.image_to_bytes(image, 'PNG')
+    
+    @staticmethod
+    def prepare_for_pdf(base64_string: str, width_in: float, height_in: float,
+                        dpi: Optional[int] = None, quality: Optional[int] = None) -> Optional[bytes]:
+        """
+        Downscale a chart to print resolution and recompress it for embedding
+        
+        The image is shrunk to its printed size at `dpi` before any colour
+        conversion (JPEG sources are decoded directly at reduced scale), then
+        saved as JPEG, which ReportLab embeds without re-encoding.
+        
+        Args:
+            base64_string: Base64 encoded chart image (with or without data URL prefix)
+            width_in: Printed width in inches
+            height_in: Printed height in inches
+            dpi: Target resolution (default: REPORT_IMAGE_DPI)
+            quality: JPEG quality (default: REPORT_IMAGE_QUALITY)
+            
+        Returns:
+            JPEG bytes ready for PDF or None if invalid
+        """
+        try:
+            if base64_string.startswith('data:image'):
+                base64_string = base64_string.split(',', 1)[1]
+            image = Image.open(io.BytesIO(base64.b64decode(base64_string)))
+            
+            dpi = dpi or PRINT_DPI
+            max_size = (max(1, int(width_in * dpi)), max(1, int(height_in * dpi)))
+            if image.format == 'JPEG':
+                image.draft('RGB', max_size)
+            # thumbnail() only ever shrinks and keeps the aspect ratio
+            image.thumbnail(max_size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+            image = ImageExporter.flatten_to_rgb(image)
+            
+            buffer = io.BytesIO()
+            # No chroma subsampling: keeps chart text and thin lines sharp
+            image.save(buffer, format='JPEG', quality=quality or JPEG_QUALITY, optimize=True, subsampling=0)
+            return buffer.getvalue()
+            
+        except Exception as e:
+            logger.warning("Error preparing chart image: %s", e)
+            return None
 
 
 
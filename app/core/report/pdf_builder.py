@@ -6,29 +6,38 @@ Enterprise-grade PDF report generator with comprehensive risk analysis
 from io import BytesIO
 from typing import Dict, List, Optional, Any
 from datetime import datetime
-from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 from reportlab.platypus import (
     SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle,
-    Image as RLImage, KeepTogether, PageBreakIfNeeded
+    Image as RLImage, KeepTogether
 )
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
 
 from .pdf_layouts import PDFLayouts
 from .image_exporter import ImageExporter
+from app.core.utils.logger import get_logger
+
+logger = get_logger("report", "pdf")
 
 
 class PDFReportBuilder:
     """Enterprise PDF report builder"""
     
-    def __init__(self):
-        """Initialize PDF builder"""
-        self.layouts = PDFLayouts()
+    def __init__(self, language: str = 'en', layout: str = 'letter'):
+        """
+        Initialize PDF builder
+        
+        Args:
+            language: Report language (en, vi, zh) - selects fonts
+            layout: Page size name (letter, a4)
+        """
+        self.layouts = PDFLayouts(language=language, layout=layout)
         self.image_exporter = ImageExporter()
         self.styles = self.layouts.styles
         self.margins = self.layouts.get_margins()
+        self.fonts = self.layouts.fonts
     
     def generate_report(self, data: Dict[str, Any]) -> BytesIO:
         """
@@ -50,7 +59,7 @@ class PDFReportBuilder:
         # Create PDF document
         doc = SimpleDocTemplate(
             buffer,
-            pagesize=letter,
+            pagesize=self.layouts.get_page_size(),
             rightMargin=self.margins['right'],
             leftMargin=self.margins['left'],
             topMargin=self.margins['top'],
@@ -193,12 +202,12 @@ class PDFReportBuilder:
             ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#111827')),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#00FFC8')),
             ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTNAME', (0, 0), (-1, 0), self.fonts['bold']),
             ('FONTSIZE', (0, 0), (-1, 0), 12),
             ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
             ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F5F7FA')),
             ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#E0E0E0')),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTNAME', (0, 1), (-1, -1), self.fonts['primary']),
             ('FONTSIZE', (0, 1), (-1, -1), 11),
             ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#FAFAFA')]),
         ]))
@@ -296,7 +305,7 @@ class PDFReportBuilder:
             ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#111827')),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
             ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTNAME', (0, 0), (-1, 0), self.fonts['bold']),
             ('FONTSIZE', (0, 0), (-1, -1), 10),
             ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#CCCCCC')),
             ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
@@ -340,7 +349,7 @@ class PDFReportBuilder:
         
         if radar_base64:
             try:
-                chart_bytes = self.image_exporter.process_chart_image(radar_base64, max_width=600, max_height=400)
+                chart_bytes = self.image_exporter.prepare_for_pdf(radar_base64, width_in=6, height_in=4)
                 if chart_bytes:
                     img_buffer = BytesIO(chart_bytes)
                     chart_img = RLImage(img_buffer, width=6*inch, height=4*inch)
@@ -353,7 +362,7 @@ class PDFReportBuilder:
                     )
                     story.append(caption)
             except Exception as e:
-                print(f"[PDF Builder] Error adding radar chart: {e}")
+                logger.warning("Error adding radar chart: %s", e)
         
         return story
     
@@ -374,14 +383,14 @@ class PDFReportBuilder:
         
         if drivers_base64:
             try:
-                chart_bytes = self.image_exporter.process_chart_image(drivers_base64, max_width=600, max_height=300)
+                chart_bytes = self.image_exporter.prepare_for_pdf(drivers_base64, width_in=6, height_in=3)
                 if chart_bytes:
                     img_buffer = BytesIO(chart_bytes)
                     chart_img = RLImage(img_buffer, width=6*inch, height=3*inch)
                     story.append(chart_img)
                     story.append(Spacer(1, 0.3*inch))
             except Exception as e:
-                print(f"[PDF Builder] Error adding drivers chart: {e}")
+                logger.warning("Error adding drivers chart: %s", e)
         
         # Drivers table
         factors = data.get('factors', {})
@@ -401,7 +410,7 @@ class PDFReportBuilder:
                 ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#111827')),
                 ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#00FFC8')),
                 ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTNAME', (0, 0), (-1, 0), self.fonts['bold']),
                 ('FONTSIZE', (0, 0), (-1, -1), 10),
                 ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#E0E0E0')),
                 ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#FAFAFA')]),
@@ -428,14 +437,14 @@ class PDFReportBuilder:
         
         if timeline_base64:
             try:
-                chart_bytes = self.image_exporter.process_chart_image(timeline_base64, max_width=600, max_height=300)
+                chart_bytes = self.image_exporter.prepare_for_pdf(timeline_base64, width_in=6, height_in=3)
                 if chart_bytes:
                     img_buffer = BytesIO(chart_bytes)
                     chart_img = RLImage(img_buffer, width=6*inch, height=3*inch)
                     story.append(chart_img)
                     story.append(Spacer(1, 0.2*inch))
             except Exception as e:
-                print(f"[PDF Builder] Error adding timeline chart: {e}")
+                logger.warning("Error adding timeline chart: %s", e)
         
         # Timeline data
         timeline = data.get('timeline', [])
@@ -469,14 +478,14 @@ class PDFReportBuilder:
         
         if network_base64:
             try:
-                chart_bytes = self.image_exporter.process_chart_image(network_base64, max_width=600, max_height=400)
+                chart_bytes = self.image_exporter.prepare_for_pdf(network_base64, width_in=6, height_in=4)
                 if chart_bytes:
                     img_buffer = BytesIO(chart_bytes)
                     chart_img = RLImage(img_buffer, width=6*inch, height=4*inch)
                     story.append(chart_img)
                     story.append(Spacer(1, 0.2*inch))
             except Exception as e:
-                print(f"[PDF Builder] Error adding network chart: {e}")
+                logger.warning("Error adding network chart: %s", e)
         
         # Network data
         network = data.get('network', {})
@@ -527,7 +536,7 @@ class PDFReportBuilder:
                 ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#111827')),
                 ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#00FFC8')),
                 ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTNAME', (0, 0), (-1, 0), self.fonts['bold']),
                 ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#E0E0E0')),
             ]))
             
@@ -652,7 +661,7 @@ class PDFReportBuilder:
         
         # Footer text
         footer_text = f"RISKCAST Enterprise AI - Page {doc.page}"
-        canvas.setFont('Helvetica', 8)
+        canvas.setFont(self.fonts['primary'], 8)
         canvas.setFillColor(colors.HexColor('#999999'))
         
         # Draw footer
@@ -1,16 +1,34 @@
 """
 RISKCAST Report - PDF Layouts
 Enterprise-style PDF layout definitions with consistent styling
+
+Fonts are registered once per process (register_fonts(), called by the
+report worker initializer); PDFLayouts instances only look them up.
+
+Configuration (environment):
+    REPORT_FONT_DIR    Directory with DejaVuSans TTF files used for Vietnamese
+                       text (default: /usr/share/fonts/truetype/dejavu;
+                       Helvetica is used when they are missing)
 """
 
+import os
+import threading
+
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.units import inch, mm
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT, TA_JUSTIFY
 from reportlab.platypus import Paragraph, Spacer, PageBreak, Image as RLImage
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+from reportlab.pdfbase.ttfonts import TTFont
 from typing import Dict, Tuple
 
+from app.core.utils.logger import get_logger
+
+logger = get_logger("report", "pdf")
+
 # Color theme
 PRIMARY_COLOR = '#00FFC8'  # Neon cyan
 SECONDARY_COLOR = '#111827'  # Dark gray
@@ -21,6 +39,10 @@ SUCCESS_COLOR = '#44FF44'  # Green for low risk
 
 # Page setup
 PAGE_SIZE = letter
+PAGE_SIZES = {
+    'letter': letter,
+    'a4': A4,
+}
 LEFT_MARGIN = 30
 RIGHT_MARGIN = 30
 TOP_MARGIN = 40
@@ -31,14 +53,110 @@ FONT_PRIMARY = 'Helvetica'
 FONT_BOLD = 'Helvetica-Bold'
 FONT_ITALIC = 'Helvetica-Oblique'
 
+# Language -> font family (primary, bold, italic); resolved by register_fonts()
+UNICODE_TTF_FILES = {
+    'RiskcastSans': 'DejaVuSans.ttf',
+    'RiskcastSans-Bold': 'DejaVuSans-Bold.ttf',
+    'RiskcastSans-Oblique': 'DejaVuSans-Oblique.ttf',
+}
+CJK_FONT = 'STSong-Light'  # Built-in Adobe CID font, no file needed
+LANGUAGES = ('en', 'vi', 'zh')
+
+_font_families: Dict[str, Tuple[str, str, str]] = {}
+_font_lock = threading.Lock()
+
+
+def register_fonts() -> Dict[str, Tuple[str, str, str]]:
+    """
+    Register report fonts with ReportLab (once per process)
+    
+    Parsing TrueType files is slow, so this runs in the report worker
+    initializer rather than per report.
+    
+    Returns:
+        Language -> (primary, bold, italic) font names
+    """
+    if _font_families:
+        return _font_families
+    with _font_lock:
+        if _font_families:
+            return _font_families
+        
+        families = {'en': (FONT_PRIMARY, FONT_BOLD, FONT_ITALIC)}
+        
+        font_dir = os.getenv("REPORT_FONT_DIR", "/usr/share/fonts/truetype/dejavu")
+        try:
+            pdfmetrics.registerFont(TTFont('RiskcastSans', os.path.join(font_dir, UNICODE_TTF_FILES['RiskcastSans'])))
+            faces = {'RiskcastSans': 'RiskcastSans'}
+            for name in ('RiskcastSans-Bold', 'RiskcastSans-Oblique'):
+                path = os.path.join(font_dir, UNICODE_TTF_FILES[name])
+                if os.path.exists(path):
+                    pdfmetrics.registerFont(TTFont(name, path))
+                    faces[name] = name
+                else:
+                    faces[name] = 'RiskcastSans'  # Missing face: fall back to the regular one
+            bold, italic = faces['RiskcastSans-Bold'], faces['RiskcastSans-Oblique']
+            pdfmetrics.registerFontFamily('RiskcastSans', normal='RiskcastSans', bold=bold,
+                                          italic=italic, boldItalic=bold)
+            families['vi'] = ('RiskcastSans', bold, italic)
+        except Exception as e:
+            logger.warning("Unicode report font not available in %s, using Helvetica for Vietnamese: %s",
+                           font_dir, e)
+            families['vi'] = families['en']
+        
+        try:
+            pdfmetrics.registerFont(UnicodeCIDFont(CJK_FONT))
+            families['zh'] = (CJK_FONT, CJK_FONT, CJK_FONT)
+        except Exception as e:
+            logger.warning("CJK report font not available, using Helvetica for Chinese: %s", e)
+            families['zh'] = families['en']
+        
+        _font_families.update(families)
+    return _font_families
+
 
 class PDFLayouts:
     """PDF layout and style definitions"""
     
-    def __init__(self):
-        """Initialize layout system"""
+    def __init__(self, language: str = 'en', layout: str = 'letter'):
+        """
+        Initialize layout system
+        
+        Args:
+            language: Report language (en, vi, zh) - selects the font family
+            layout: Page size name (letter, a4)
+        """
+        if language not in LANGUAGES:
+            raise ValueError(f"Unsupported report language: {language}")
+        if layout not in PAGE_SIZES:
+            raise ValueError(f"Unsupported report layout: {layout}")
+        
+        self.language = language
+        self.page_size = PAGE_SIZES[layout]
+        primary, bold, italic = register_fonts()[language]
+        self.fonts = {'primary': primary, 'bold': bold, 'italic': italic}
+        
         self.styles = getSampleStyleSheet()
         self._setup_custom_styles()
+        if primary != FONT_PRIMARY:
+            self._apply_font_family()
+    
+    def _apply_font_family(self):
+        """Swap the Helvetica family for the language's font in every style"""
+        mapping = {
+            FONT_PRIMARY: self.fonts['primary'],
+            FONT_BOLD: self.fonts['bold'],
+            FONT_ITALIC: self.fonts['italic'],
+            'Helvetica-BoldOblique': self.fonts['bold'],
+            'Times-Roman': self.fonts['primary'],
+            'Times-Bold': self.fonts['bold'],
+            'Times-Italic': self.fonts['italic'],
+            'Times-BoldItalic': self.fonts['bold'],
+            'Courier': self.fonts['primary'],
+        }
+        for style in self.styles.byName.values():
+            if hasattr(style, 'fontName'):  # ListStyle has no font
+                style.fontName = mapping.get(style.fontName, style.fontName)
     
     def _setup_custom_styles(self):
         """Setup custom paragraph styles"""
@@ -101,8 +219,8 @@ class PDFLayouts:
             fontName=FONT_BOLD,
         ))
         
-        # Body text
-        self.styles.add(ParagraphStyle(
+        # Body text (replaces the sample sheet's BodyText; add() rejects duplicates)
+        self.styles.byName['BodyText'] = (ParagraphStyle(
             name='BodyText',
             parent=self.styles['Normal'],
             fontSize=11,
@@ -178,7 +296,7 @@ class PDFLayouts:
     
     def get_page_size(self) -> Tuple[float, float]:
         """Get page size"""
-        return PAGE_SIZE
+        return self.page_size
     
     def get_margins(self) -> Dict[str, float]:
         """Get page margins in points"""
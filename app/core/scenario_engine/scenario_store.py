@@ -1,18 +1,69 @@
 """
 RISKCAST Scenario Engine - Scenario Storage Module
 Save, load, and manage scenario configurations
+
+Layout (storage directory):
+    items/<key>.json     One file per scenario (full body)
+    catalog.jsonl        Append-only journal of catalog entries (metadata only)
+    .lock                Inter-process write lock
+
+The catalog is held in memory as name -> metadata, so listing never opens
+scenario bodies. Writes append one journal line; the journal is compacted
+once stale lines outnumber live entries. Body and compacted catalog files
+are written to a temp file and renamed into place.
 """
 
 from typing import Dict, List, Optional, Any
 from pathlib import Path
+from contextlib import contextmanager
+import hashlib
 import json
 from datetime import datetime
 import os
+import tempfile
+import threading
+
+from app.core.utils.logger import get_logger
+
+logger = get_logger("storage", "scenarios")
+
+try:
+    import fcntl  # POSIX
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+
+# Catalog fields (everything list_scenarios() returns)
+CATALOG_FIELDS = (
+    "name", "description", "tags", "owner", "adjustments", "baseline_score",
+    "created", "updated", "last_run", "last_result",
+)
+
+
+def _atomic_write_json(path: Path, data: Any, indent: Optional[int] = 2) -> None:
+    """Write JSON to a temp file in the same directory, then rename over path"""
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=indent, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
 
 
 class ScenarioStore:
     """Scenario storage manager"""
     
+    # Compact the journal when it holds more than this many lines per live entry
+    COMPACTION_RATIO = 2
+    
     def __init__(self, storage_path: Optional[str] = None):
         """
         Initialize scenario store
@@ -27,49 +78,162 @@ class ScenarioStore:
             base_dir = Path(__file__).parent.parent.parent.parent
             self.storage_dir = base_dir / "data" / "scenarios"
         
-        # Ensure directory exists
-        self.storage_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Storage file
+        self.items_dir = self.storage_dir / "items"
+        self.catalog_file = self.storage_dir / "catalog.jsonl"
+        self.lock_file = self.storage_dir / ".lock"
+        # Pre-v2 single-file storage, imported once
         self.storage_file = self.storage_dir / "scenarios.json"
         
-        # Initialize storage if needed
-        if not self.storage_file.exists():
-            self._initialize_storage()
-    
-    def _initialize_storage(self):
-        """Initialize empty storage file"""
-        initial_data = {
-            "scenarios": {},
-            "metadata": {
-                "created": datetime.now().isoformat(),
-                "version": "1.0",
-            }
-        }
-        with open(self.storage_file, "w", encoding="utf-8") as f:
-            json.dump(initial_data, f, indent=2, ensure_ascii=False)
+        # Ensure directories exist
+        self.items_dir.mkdir(parents=True, exist_ok=True)
+        
+        self._lock = threading.RLock()
+        self._catalog: Dict[str, Dict[str, Any]] = {}
+        self._journal_lines = 0
+        self._journal_offset = 0
+        self._journal_id = None
+        
+        with self._write_lock():
+            if not self.catalog_file.exists():
+                self._migrate_legacy_storage()
+            self._refresh_catalog()
+    
+    # ===============================================================
+    # LOCKING / JOURNAL
+    # ===============================================================
+    
+    @contextmanager
+    def _write_lock(self):
+        """Exclusive lock across threads (RLock) and processes (lock file)"""
+        with self._lock:
+            with open(self.lock_file, "a+b") as handle:
+                if fcntl is not None:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+                else:
+                    handle.seek(0)
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+                    else:
+                        handle.seek(0)
+                        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+    
+    def _journal_identity(self):
+        # Compaction renames a new file into place, which changes the inode
+        stat = self.catalog_file.stat()
+        return stat.st_dev, stat.st_ino
+    
+    def _refresh_catalog(self) -> None:
+        """Apply journal lines written since the last read (other processes included)"""
+        with self._lock:
+            if not self.catalog_file.exists():
+                self._catalog, self._journal_lines, self._journal_offset = {}, 0, 0
+                self._journal_id = None
+                return
+            
+            identity = self._journal_identity()
+            size = self.catalog_file.stat().st_size
+            if identity != self._journal_id or size < self._journal_offset:
+                # Compacted or replaced: replay from the start
+                self._catalog, self._journal_lines, self._journal_offset = {}, 0, 0
+                self._journal_id = identity
+            if size == self._journal_offset:
+                return
+            
+            with open(self.catalog_file, "rb") as f:
+                f.seek(self._journal_offset)
+                chunk = f.read()
+            # Ignore a trailing partial line (writer still appending)
+            complete = chunk[:chunk.rfind(b"\n") + 1]
+            for line in complete.splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    op = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._journal_lines += 1
+                if op.get("op") == "put":
+                    self._catalog[op["meta"]["name"]] = op["meta"]
+                elif op.get("op") == "delete":
+                    self._catalog.pop(op.get("name"), None)
+            self._journal_offset += len(complete)
+    
+    def _append_journal(self, op: Dict[str, Any]) -> None:
+        """Append one catalog operation (caller holds the write lock)"""
+        line = (json.dumps(op, ensure_ascii=False) + "\n").encode("utf-8")
+        with open(self.catalog_file, "ab") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self._refresh_catalog()
+        
+        if self._journal_lines > self.COMPACTION_RATIO * max(len(self._catalog), 16):
+            self._compact_journal()
+    
+    def _compact_journal(self) -> None:
+        """Rewrite the journal as one put per live entry (caller holds the write lock)"""
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.storage_dir), prefix=".catalog.", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for meta in self._catalog.values():
+                f.write(json.dumps({"op": "put", "meta": meta}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.catalog_file)
+        self._journal_id = None
+        self._refresh_catalog()
+    
+    def _item_path(self, name: str) -> Path:
+        """Body file for a scenario (hashed: names are free-form user input)"""
+        key = hashlib.sha256(name.encode("utf-8")).hexdigest()[:32]
+        return self.items_dir / f"{key}.json"
     
-    def _load_storage(self) -> Dict[str, Any]:
-        """Load storage file"""
+    @staticmethod
+    def _catalog_entry(scenario: Dict[str, Any]) -> Dict[str, Any]:
+        return {field: scenario.get(field) for field in CATALOG_FIELDS}
+    
+    def _put(self, scenario: Dict[str, Any]) -> None:
+        """Write body then catalog entry (caller holds the write lock)"""
+        _atomic_write_json(self._item_path(scenario["name"]), scenario)
+        self._append_journal({"op": "put", "meta": self._catalog_entry(scenario)})
+    
+    def _migrate_legacy_storage(self) -> None:
+        """Import scenarios.json (single-file format) into per-scenario files"""
+        if not self.storage_file.exists():
+            return
         try:
             with open(self.storage_file, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            self._initialize_storage()
-            return self._load_storage()
+                legacy = json.load(f).get("scenarios", {})
+        except (IOError, json.JSONDecodeError, AttributeError) as e:
+            logger.error("Could not import %s: %s", self.storage_file, e)
+            return
+        
+        for name, scenario in legacy.items():
+            scenario = {**scenario, "name": name}
+            scenario.setdefault("tags", [])
+            scenario.setdefault("owner", None)
+            scenario.setdefault("updated", scenario.get("created"))
+            _atomic_write_json(self._item_path(name), scenario)
+            line = json.dumps({"op": "put", "meta": self._catalog_entry(scenario)}, ensure_ascii=False)
+            with open(self.catalog_file, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        logger.info("Imported %d scenario(s) from %s", len(legacy), self.storage_file.name)
     
-    def _save_storage(self, data: Dict[str, Any]):
-        """Save storage file"""
-        data["metadata"]["last_updated"] = datetime.now().isoformat()
-        with open(self.storage_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+    # ===============================================================
+    # PUBLIC API
+    # ===============================================================
     
-    def save_scenario(self, 
+    def save_scenario(self,
                      name: str,
                      adjustments: Dict[str, float],
                      result: Optional[Dict[str, Any]] = None,
                      baseline_score: Optional[float] = None,
-                     description: Optional[str] = None) -> bool:
+                     description: Optional[str] = None,
+                     tags: Optional[List[str]] = None,
+                     owner: Optional[str] = None) -> bool:
         """
         Save a scenario
         
@@ -79,15 +243,13 @@ class ScenarioStore:
             result: Optional simulation result
             baseline_score: Optional baseline score for reference
             description: Optional scenario description
-            
+            tags: Optional tags for filtering
+            owner: Optional owner identifier
+        
         Returns:
             True if saved successfully
         """
-        data = self._load_storage()
-        
-        # Check if name already exists
-        if name in data["scenarios"]:
-            return False  # Name conflict
+        now = datetime.now().isoformat()
         
         # Create scenario entry
         scenario_entry = {
@@ -95,7 +257,10 @@ class ScenarioStore:
             "adjustments": adjustments,
             "baseline_score": baseline_score,
             "description": description,
-            "created": datetime.now().isoformat(),
+            "tags": sorted(set(tags or [])),
+            "owner": owner,
+            "created": now,
+            "updated": now,
             "last_run": None,
         }
         
@@ -106,11 +271,14 @@ class ScenarioStore:
                 "delta_from_baseline": result.get("delta_from_baseline"),
                 "risk_level": result.get("profile", {}).get("level"),
             }
-            scenario_entry["last_run"] = datetime.now().isoformat()
+            scenario_entry["last_run"] = now
         
-        # Save
-        data["scenarios"][name] = scenario_entry
-        self._save_storage(data)
+        with self._write_lock():
+            self._refresh_catalog()
+            # Check if name already exists
+            if name in self._catalog:
+                return False  # Name conflict
+            self._put(scenario_entry)
         
         return True
     
@@ -120,39 +288,50 @@ class ScenarioStore:
         
         Args:
             name: Scenario name
-            
+        
         Returns:
             Scenario dictionary or None if not found
         """
-        data = self._load_storage()
-        return data["scenarios"].get(name)
+        self._refresh_catalog()
+        if name not in self._catalog:
+            return None
+        try:
+            with open(self._item_path(name), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
     
-    def list_scenarios(self) -> List[Dict[str, Any]]:
+    def list_scenarios(self,
+                       limit: Optional[int] = None,
+                       offset: int = 0,
+                       tag: Optional[str] = None,
+                       owner: Optional[str] = None) -> List[Dict[str, Any]]:
         """
-        List all saved scenarios
+        List saved scenarios from the catalog (bodies are not read)
+        
+        Args:
+            limit: Page size (default: all)
+            offset: Entries to skip
+            tag: Only scenarios carrying this tag
+            owner: Only scenarios of this owner
         
         Returns:
-            List of scenario summaries
+            List of scenario summaries (newest first)
         """
-        data = self._load_storage()
-        scenarios = data.get("scenarios", {})
-        
-        # Return summaries (without full results)
-        summaries = []
-        for name, scenario in scenarios.items():
-            summaries.append({
-                "name": name,
-                "description": scenario.get("description"),
-                "adjustments": scenario.get("adjustments", {}),
-                "baseline_score": scenario.get("baseline_score"),
-                "created": scenario.get("created"),
-                "last_run": scenario.get("last_run"),
-                "last_result": scenario.get("last_result"),
-            })
-        
+        summaries = self._filtered(tag, owner)
+        end = None if limit is None else offset + limit
+        return [dict(summary) for summary in summaries[offset:end]]
+    
+    def _filtered(self, tag: Optional[str], owner: Optional[str]) -> List[Dict[str, Any]]:
+        self._refresh_catalog()
+        with self._lock:
+            summaries = [
+                meta for meta in self._catalog.values()
+                if (tag is None or tag in (meta.get("tags") or []))
+                and (owner is None or meta.get("owner") == owner)
+            ]
         # Sort by creation date (newest first)
-        summaries.sort(key=lambda x: x.get("created", ""), reverse=True)
-        
+        summaries.sort(key=lambda x: x.get("created") or "", reverse=True)
         return summaries
     
     def delete_scenario(self, name: str) -> bool:
@@ -161,25 +340,29 @@ class ScenarioStore:
         
         Args:
             name: Scenario name
-            
+        
         Returns:
             True if deleted successfully
         """
-        data = self._load_storage()
-        
-        if name not in data["scenarios"]:
-            return False
-        
-        # Delete
-        del data["scenarios"][name]
-        self._save_storage(data)
+        with self._write_lock():
+            self._refresh_catalog()
+            if name not in self._catalog:
+                return False
+            
+            self._append_journal({"op": "delete", "name": name})
+            try:
+                self._item_path(name).unlink()
+            except FileNotFoundError:
+                pass
         
         return True
     
     def update_scenario(self,
                        name: str,
                        adjustments: Optional[Dict[str, float]] = None,
-                       description: Optional[str] = None) -> bool:
+                       description: Optional[str] = None,
+                       tags: Optional[List[str]] = None,
+                       owner: Optional[str] = None) -> bool:
         """
         Update an existing scenario
         
@@ -187,54 +370,46 @@ class ScenarioStore:
             name: Scenario name
             adjustments: Optional new adjustments
             description: Optional new description
-            
+            tags: Optional new tags (replaces existing)
+            owner: Optional new owner
+        
         Returns:
             True if updated successfully
         """
-        data = self._load_storage()
-        
-        if name not in data["scenarios"]:
-            return False
-        
-        # Update fields
-        if adjustments is not None:
-            data["scenarios"][name]["adjustments"] = adjustments
-        
-        if description is not None:
-            data["scenarios"][name]["description"] = description
-        
-        data["scenarios"][name]["updated"] = datetime.now().isoformat()
-        
-        self._save_storage(data)
+        with self._write_lock():
+            self._refresh_catalog()
+            if name not in self._catalog:
+                return False
+            
+            scenario = self.load_scenario(name) or dict(self._catalog[name])
+            
+            # Update fields
+            if adjustments is not None:
+                scenario["adjustments"] = adjustments
+            if description is not None:
+                scenario["description"] = description
+            if tags is not None:
+                scenario["tags"] = sorted(set(tags))
+            if owner is not None:
+                scenario["owner"] = owner
+            
+            scenario["updated"] = datetime.now().isoformat()
+            self._put(scenario)
         
         return True
     
-    def get_scenario_count(self) -> int:
+    def get_scenario_count(self, tag: Optional[str] = None, owner: Optional[str] = None) -> int:
         """
         Get total number of saved scenarios
         
+        Args:
+            tag: Only count scenarios carrying this tag
+            owner: Only count scenarios of this owner
+        
         Returns:
             Number of scenarios
         """
-        data = self._load_storage()
-        return len(data.get("scenarios", {}))
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+        if tag is None and owner is None:
+            self._refresh_catalog()
+            return len(self._catalog)
+        return len(self._filtered(tag, owner))
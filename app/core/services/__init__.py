@@ -3,10 +3,12 @@ RISKCAST Core Services Module
 Contains business logic services
 """
 
-from .risk_service import run_risk_engine_v14
+from .risk_service import calculate_enterprise_risk_cached, run_risk_engine_v14, run_risk_engine_v14_cached
 
 __all__ = [
-    "run_risk_engine_v14"
+    "calculate_enterprise_risk_cached",
+    "run_risk_engine_v14",
+    "run_risk_engine_v14_cached"
 ]
 
 
@@ -0,0 +1,482 @@
+"""
+RISKCAST Batch Jobs
+Bulk portfolio scoring: upload CSV/NDJSON -> job id -> streamed NDJSON results
+
+Scoring many shipments through N ``POST /api/analyze`` calls pays the
+per-request overhead (session writes, memory_system, response shaping)
+N times. A batch job validates every row up front, scores the valid ones
+through the engine executor with bounded parallelism and appends one
+NDJSON record per row as it completes, followed by an aggregate summary.
+
+Jobs run independently of the HTTP connection: a client that disconnects
+can poll progress and resume the result stream from the last ``seq`` it
+received.
+
+Configuration (environment):
+    BATCH_CONCURRENCY     Rows scored at once per job (default: engine workers)
+    BATCH_MAX_ROWS        Rows accepted per upload (default: 10000)
+    BATCH_MAX_RUNNING     Batch jobs running at once (default: 2)
+    BATCH_WORST_N         Shipments listed in the summary's "worst" (default: 10)
+    BATCH_BUSY_RETRIES    Retries when the engine queue is full (default: 20)
+    BATCH_JOB_HISTORY     Finished jobs kept for polling (default: 16)
+"""
+
+import asyncio
+import csv
+import io
+import json
+import os
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+
+from app.core.services.engine_executor import engine_executor
+from app.core.services.risk_service import run_risk_engine_v14_cached
+from app.core.utils.logger import get_logger
+from app.core.utils.metrics import metrics
+
+logger = get_logger("engine", "batch")
+
+FORMATS = ("csv", "ndjson")
+
+# Extra columns copied to result records to identify a shipment
+REFERENCE_FIELDS = ("shipment_id", "reference", "id")
+
+# Seconds between retries when the engine queue is full (multiplied by attempt)
+BUSY_BACKOFF_SECONDS = 0.25
+
+
+class BatchBusyError(Exception):
+    """Raised when too many batch jobs are running (maps to HTTP 429)"""
+
+
+# ===============================================================
+# PARSING
+# ===============================================================
+
+def detect_format(content_type: Optional[str], filename: Optional[str]) -> str:
+    """
+    Guess the upload format from its content type or file name
+
+    Returns:
+        "csv" or "ndjson" (NDJSON when nothing points to CSV)
+    """
+    content_type = (content_type or "").lower()
+    filename = (filename or "").lower()
+    if "csv" in content_type or filename.endswith(".csv"):
+        return "csv"
+    return "ndjson"
+
+
+def _csv_cell(value: Optional[str]) -> Any:
+    """CSV cell -> record value (blank cells are dropped, JSON objects decoded)"""
+    if value is None:
+        return None
+    value = value.strip()
+    if value.startswith("{"):
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass  # Left as text; the model reports the bad field
+    return value or None
+
+
+def parse_records(data: bytes, fmt: str) -> List[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Split an upload into raw records
+
+    CSV uses the header row as field names (blank cells fall back to model
+    defaults; buyer/seller/priority_weights cells may hold JSON objects).
+    NDJSON expects one JSON object per line; blank lines are skipped.
+
+    Args:
+        data: Uploaded file content (UTF-8)
+        fmt: "csv" or "ndjson"
+
+    Returns:
+        (row number, record or None, parse error or None) per row; rows are
+        numbered from 1 and exclude the CSV header
+
+    Raises:
+        ValueError: Unknown format, undecodable file or missing CSV header
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported batch format '{fmt}' (expected one of {', '.join(FORMATS)})")
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        raise ValueError(f"Batch file is not valid UTF-8: {e}")
+
+    rows: List[Tuple[int, Optional[Dict[str, Any]], Optional[str]]] = []
+    if fmt == "csv":
+        reader = csv.DictReader(io.StringIO(text))
+        if not reader.fieldnames:
+            raise ValueError("CSV file has no header row")
+        for row_number, row in enumerate(reader, start=1):
+            if None in row:
+                rows.append((row_number, None, "More cells than header columns"))
+                continue
+            record = {key.strip(): _csv_cell(value) for key, value in row.items() if key}
+            rows.append((row_number, {k: v for k, v in record.items() if v is not None}, None))
+        return rows
+
+    row_number = 0
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            rows.append((row_number, None, f"Invalid JSON: {e}"))
+            continue
+        if not isinstance(record, dict):
+            rows.append((row_number, None, "Expected a JSON object"))
+            continue
+        rows.append((row_number, record, None))
+    return rows
+
+
+def _validation_errors(error: ValidationError) -> List[Dict[str, str]]:
+    return [
+        {"field": ".".join(str(part) for part in e["loc"]) or "__root__", "message": e["msg"]}
+        for e in error.errors()
+    ]
+
+
+# ===============================================================
+# JOBS
+# ===============================================================
+
+@dataclass
+class BatchJob:
+    """One uploaded portfolio"""
+    job_id: str
+    source: str
+    total_rows: int
+    status: str = "running"  # running | done | cancelled | failed
+    scored: int = 0
+    failed: int = 0
+    invalid: int = 0
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    # NDJSON records in completion order; a record's "seq" is its index
+    lines: List[Dict[str, Any]] = field(default_factory=list, repr=False)
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+    # Set (and replaced) whenever a record is added or the job ends
+    changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Add a record and wake followers"""
+        self.lines.append({"seq": len(self.lines), **record})
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+    @property
+    def processed(self) -> int:
+        return self.scored + self.failed + self.invalid
+
+    def to_dict(self) -> Dict[str, Any]:
+        def iso(ts: Optional[float]) -> Optional[str]:
+            return datetime.fromtimestamp(ts, timezone.utc).isoformat() if ts else None
+
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "source": self.source,
+            "total_rows": self.total_rows,
+            "processed": self.processed,
+            "scored": self.scored,
+            "failed": self.failed,
+            "invalid": self.invalid,
+            "progress": round(self.processed / self.total_rows, 4) if self.total_rows else 1.0,
+            "records": len(self.lines),
+            "created_at": iso(self.created_at),
+            "finished_at": iso(self.finished_at),
+            "error": self.error,
+        }
+
+
+class BatchJobManager:
+    """Runs batch scoring jobs on the event loop and keeps their results for resuming"""
+
+    def __init__(self,
+                 concurrency: Optional[int] = None,
+                 max_rows: Optional[int] = None,
+                 max_running: Optional[int] = None,
+                 worst_n: Optional[int] = None,
+                 busy_retries: Optional[int] = None,
+                 history: Optional[int] = None):
+        self.concurrency = concurrency or int(os.getenv("BATCH_CONCURRENCY", "0")) or engine_executor.workers
+        self.max_rows = max_rows or int(os.getenv("BATCH_MAX_ROWS", "10000"))
+        self.max_running = max_running or int(os.getenv("BATCH_MAX_RUNNING", "2"))
+        self.worst_n = worst_n or int(os.getenv("BATCH_WORST_N", "10"))
+        self.busy_retries = busy_retries if busy_retries is not None else \
+            int(os.getenv("BATCH_BUSY_RETRIES", "20"))
+        self.history = history or int(os.getenv("BATCH_JOB_HISTORY", "16"))
+
+        self._jobs: "OrderedDict[str, BatchJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._running = 0
+
+        # Counters
+        self.submitted = 0
+        self.rejected = 0
+        self.rows_scored = 0
+        self.rows_failed = 0
+        self.rows_invalid = 0
+
+    def submit(self, data: bytes, fmt: str, model: Type[BaseModel], source: str = "upload") -> BatchJob:
+        """
+        Validate an upload and start scoring it (must be called from the event loop)
+
+        Args:
+            data: CSV or NDJSON file content
+            fmt: "csv" or "ndjson"
+            model: Pydantic model each row must satisfy (the Shipment schema)
+            source: File name shown in job status
+
+        Returns:
+            Running BatchJob; invalid rows are already recorded as errors
+
+        Raises:
+            ValueError: Unreadable file, no rows or more than max_rows rows
+            BatchBusyError: Too many batch jobs running
+        """
+        rows = parse_records(data, fmt)
+        if not rows:
+            raise ValueError("Batch file contains no rows")
+        if len(rows) > self.max_rows:
+            raise ValueError(f"Batch file has {len(rows)} rows (limit {self.max_rows})")
+
+        with self._lock:
+            if self._running >= self.max_running:
+                self.rejected += 1
+                raise BatchBusyError(f"Too many batch jobs running ({self._running}/{self.max_running})")
+            self._running += 1
+            self.submitted += 1
+            job = BatchJob(job_id=uuid.uuid4().hex, source=source, total_rows=len(rows))
+            self._remember(job)
+
+        valid: List[Tuple[int, Dict[str, Any], Optional[str]]] = []
+        for row_number, record, parse_error in rows:
+            if parse_error is not None:
+                self._record_invalid(job, row_number, [{"field": "__root__", "message": parse_error}])
+                continue
+            try:
+                payload = model.model_validate(record).model_dump()
+            except ValidationError as e:
+                self._record_invalid(job, row_number, _validation_errors(e))
+                continue
+            reference = next((str(record[k]) for k in REFERENCE_FIELDS if record.get(k) is not None), None)
+            valid.append((row_number, payload, reference))
+
+        logger.info("Batch job %s: %d rows (%d invalid) from %s",
+                    job.job_id, job.total_rows, job.invalid, source)
+        job.task = asyncio.get_running_loop().create_task(self._run(job, valid))
+        # Also covers a task cancelled before it started running
+        job.task.add_done_callback(lambda _: self._finish(job))
+        return job
+
+    def _record_invalid(self, job: BatchJob, row_number: int, errors: List[Dict[str, str]]) -> None:
+        job.invalid += 1
+        job.append({"type": "error", "row": row_number, "stage": "validation", "errors": errors})
+        with self._lock:
+            self.rows_invalid += 1
+
+    async def _run(self, job: BatchJob, rows: List[Tuple[int, Dict[str, Any], Optional[str]]]) -> None:
+        pending = iter(rows)
+
+        async def worker() -> None:
+            # Workers share one iterator: at most `concurrency` rows in the engine per job
+            for row_number, payload, reference in pending:
+                job.append(await self._score_row(job, row_number, payload, reference))
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(rows)) or 1)))
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+        except Exception as e:
+            logger.error("Batch job %s failed: %s", job.job_id, e, exc_info=True)
+            job.status, job.error = "failed", str(e) or type(e).__name__
+        else:
+            job.status = "done"
+        finally:
+            self._finish(job)
+
+    def _finish(self, job: BatchJob) -> None:
+        """Close a job: append the summary record and free its running slot (idempotent)"""
+        if job.finished_at is not None:
+            return
+        if job.status == "running":
+            job.status = "cancelled"
+        job.finished_at = time.time()
+        job.append(self.summarize(job, job.finished_at - job.created_at))
+        with self._lock:
+            self._running -= 1
+        logger.info("Batch job %s %s: %d scored, %d failed, %d invalid in %.1fs",
+                    job.job_id, job.status, job.scored, job.failed, job.invalid,
+                    job.finished_at - job.created_at)
+
+    async def _score_row(self, job: BatchJob, row_number: int, payload: Dict[str, Any],
+                         reference: Optional[str]) -> Dict[str, Any]:
+        """Score one validated row, retrying while the engine queue is full"""
+        for attempt in range(self.busy_retries + 1):
+            try:
+                result = await run_risk_engine_v14_cached(payload)
+                break
+            except HTTPException as e:
+                if e.status_code == 429 and attempt < self.busy_retries:
+                    await asyncio.sleep(BUSY_BACKOFF_SECONDS * (attempt + 1))
+                    continue
+                return self._row_failed(job, row_number, reference, str(e.detail))
+            except Exception as e:
+                logger.warning("Batch job %s row %d failed: %s", job.job_id, row_number, e)
+                return self._row_failed(job, row_number, reference, str(e) or type(e).__name__)
+
+        if "engine_error" in result:
+            return self._row_failed(job, row_number, reference, str(result["engine_error"]))
+
+        job.scored += 1
+        with self._lock:
+            self.rows_scored += 1
+        return {
+            "type": "result",
+            "row": row_number,
+            "reference": reference,
+            "route": payload.get("route"),
+            "cargo_value": payload.get("cargo_value"),
+            "risk_score": round(result.get("overall_risk", result.get("risk_score", 0.5) * 100), 2),
+            "risk_level": result.get("risk_level", "MODERATE"),
+            "expected_loss": result.get("expected_loss", 0),
+            "var": result.get("var"),
+            "cvar": result.get("cvar"),
+        }
+
+    def _row_failed(self, job: BatchJob, row_number: int, reference: Optional[str], error: str) -> Dict[str, Any]:
+        job.failed += 1
+        with self._lock:
+            self.rows_failed += 1
+        return {"type": "error", "row": row_number, "reference": reference, "stage": "engine",
+                "errors": [{"field": "__root__", "message": error}]}
+
+    def summarize(self, job: BatchJob, seconds: float) -> Dict[str, Any]:
+        """
+        Aggregate the scored rows of a job
+
+        Returns:
+            Summary record: risk level distribution, total expected loss and
+            the worst_n shipments by risk score
+        """
+        results = [line for line in job.lines if line["type"] == "result"]
+        worst = sorted(results, key=lambda r: (r["risk_score"], r["expected_loss"] or 0),
+                       reverse=True)[:self.worst_n]
+        return {
+            "type": "summary",
+            "job_id": job.job_id,
+            "status": job.status,
+            "total_rows": job.total_rows,
+            "scored": job.scored,
+            "failed": job.failed,
+            "invalid": job.invalid,
+            "risk_levels": dict(Counter(r["risk_level"] for r in results)),
+            "total_expected_loss": round(sum(r["expected_loss"] or 0 for r in results), 2),
+            "total_cargo_value": round(sum(r["cargo_value"] or 0 for r in results), 2),
+            "mean_risk_score": round(sum(r["risk_score"] for r in results) / len(results), 2) if results else None,
+            "worst": [
+                {k: r[k] for k in ("row", "reference", "route", "risk_score", "risk_level", "expected_loss")}
+                for r in worst
+            ],
+            "duration_ms": round(seconds * 1000, 1),
+        }
+
+    async def follow(self, job: BatchJob, offset: int = 0) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield a job's records from ``offset``, waiting for new ones until the job ends
+
+        Args:
+            job: Job returned by submit()
+            offset: First record (``seq``) to yield; resume with last seq + 1
+        """
+        offset = max(offset, 0)
+        while True:
+            while offset < len(job.lines):
+                yield job.lines[offset]
+                offset += 1
+            if job.finished_at is not None:
+                return
+            await job.changed.wait()
+
+    def _remember(self, job: BatchJob) -> None:
+        """Store a job, dropping the oldest finished ones beyond the history size (lock held)"""
+        self._jobs[job.job_id] = job
+        if len(self._jobs) > self.history:
+            for job_id in [jid for jid, j in self._jobs.items() if j.finished_at is not None]:
+                del self._jobs[job_id]
+                if len(self._jobs) <= self.history:
+                    break
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        """Look up a job by id"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job: BatchJob) -> bool:
+        """
+        Stop scoring a running job (rows already scored are kept)
+
+        Returns:
+            True if the job was still running
+        """
+        if job.task is None or job.task.done():
+            return False
+        job.task.cancel()
+        return True
+
+    async def shutdown(self) -> None:
+        """Cancel running jobs (call at application shutdown)"""
+        with self._lock:
+            tasks = [j.task for j in self._jobs.values() if j.task is not None and not j.task.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return job and row counters"""
+        with self._lock:
+            return {
+                "running": self._running,
+                "tracked": len(self._jobs),
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "rows_scored": self.rows_scored,
+                "rows_failed": self.rows_failed,
+                "rows_invalid": self.rows_invalid,
+            }
+
+
+# Global instance
+batch_jobs = BatchJobManager()
+
+
+def _collect_metrics():
+    stats = batch_jobs.get_stats()
+    yield ("riskcast_batch_jobs_running", "gauge", "Batch scoring jobs running", {}, stats["running"])
+    for outcome in ("submitted", "rejected"):
+        yield ("riskcast_batch_jobs_total", "counter", "Batch jobs by outcome",
+               {"outcome": outcome}, stats[outcome])
+    for outcome in ("scored", "failed", "invalid"):
+        yield ("riskcast_batch_rows_total", "counter", "Batch rows by outcome",
+               {"outcome": outcome}, stats[f"rows_{outcome}"])
+
+
+metrics.register_collector(_collect_metrics)
@@ -0,0 +1,318 @@
+"""
+RISKCAST Engine Executor
+Runs CPU-bound risk engine jobs off the event loop in a process pool
+
+The v16 engine runs a 50k-iteration Monte Carlo per analysis. Calling it
+directly from an ``async def`` route blocks the uvicorn event loop for the
+whole calculation, stalling every other request (static pages, SSE streams).
+Routes await ``engine_executor.submit(...)`` instead.
+
+Configuration (environment):
+    ENGINE_EXECUTOR       "process" (default) or "thread"
+    ENGINE_WORKERS        Worker count (default: min(4, CPU count))
+    ENGINE_QUEUE_SIZE     Jobs allowed to wait for a free worker (default: 2 × workers)
+    ENGINE_JOB_TIMEOUT    Seconds a caller waits for a job (default: 60)
+"""
+
+import asyncio
+import contextvars
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException, status
+
+from app.core.utils.logger import get_logger
+from app.core.utils.metrics import metrics
+
+logger = get_logger("engine", "executor")
+
+
+class EngineBusyError(Exception):
+    """Raised when the submission queue is full (maps to HTTP 429)"""
+
+
+class EngineTimeoutError(Exception):
+    """Raised when a job exceeds its timeout (maps to HTTP 504)"""
+
+
+# ===============================================================
+# WORKER SIDE
+# ===============================================================
+
+# Per-process engine instance, created once by _init_worker()
+_WORKER_ENGINE = None
+
+
+def _init_worker() -> None:
+    """
+    Pre-warm a worker process
+
+    Imports NumPy/SciPy, builds the shared EnterpriseRiskEngineV16 and fills
+    its precomputed tables (AHP weights, Student-t inverse CDF) so the first
+    request served by this worker does not pay the import/setup cost.
+    """
+    global _WORKER_ENGINE
+
+    import numpy  # noqa: F401
+    import scipy.stats  # noqa: F401
+    from app.core.engine.risk_engine_v16 import (
+        FuzzyAHP, MonteCarloEngine, RiskConfig, get_shared_engine
+    )
+
+    FuzzyAHP._pairwise_ahp_solution()
+    MonteCarloEngine._student_t_ppf_table(RiskConfig.STUDENT_T_DF)
+    _WORKER_ENGINE = get_shared_engine()
+
+
+def _get_worker_engine():
+    """Return this worker's engine, building it if the initializer did not run"""
+    if _WORKER_ENGINE is None:
+        _init_worker()
+    return _WORKER_ENGINE
+
+
+def _ping() -> bool:
+    """No-op job used to force worker start-up"""
+    return True
+
+
+def _run_with_metrics(fn: Callable, args: tuple, kwargs: Dict[str, Any]):
+    """Run a job and return (result, metrics recorded in this worker) for the parent to merge"""
+    result = fn(*args, **kwargs)
+    return result, metrics.drain()
+
+
+def run_risk_service_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Worker job: full Option A service pipeline (run_risk_engine_v14)"""
+    from app.core.services.risk_service import run_risk_engine_v14
+
+    return run_risk_engine_v14(payload, engine=_get_worker_engine())
+
+
+def run_enterprise_risk_job(shipment_data: Dict[str, Any],
+                            buyer: Optional[Dict] = None,
+                            seller: Optional[Dict] = None,
+                            seed: Optional[int] = None) -> Dict[str, Any]:
+    """Worker job: raw v16 engine call (calculate_enterprise_risk)"""
+    from app.core.engine.risk_engine_v16 import calculate_enterprise_risk
+
+    return calculate_enterprise_risk(shipment_data, buyer=buyer, seller=seller,
+                                     engine=_get_worker_engine(), seed=seed)
+
+
+# ===============================================================
+# EVENT LOOP SIDE
+# ===============================================================
+
+class EngineExecutor:
+    """
+    Bounded process pool for risk engine jobs
+
+    At most ``workers + queue_size`` jobs are in flight; further submissions
+    fail fast with EngineBusyError instead of piling up. A job that exceeds
+    its timeout raises EngineTimeoutError for the caller, but keeps its slot
+    until the worker actually finishes, so backpressure reflects real load.
+    """
+
+    def __init__(self,
+                 mode: Optional[str] = None,
+                 workers: Optional[int] = None,
+                 queue_size: Optional[int] = None,
+                 job_timeout: Optional[float] = None,
+                 initializer: Optional[Callable[[], None]] = _init_worker,
+                 name: str = "engine"):
+        """
+        Args:
+            mode: "process" or "thread" (default: ENGINE_EXECUTOR)
+            workers: Worker count (default: ENGINE_WORKERS)
+            queue_size: Jobs allowed to wait (default: ENGINE_QUEUE_SIZE)
+            job_timeout: Seconds a caller waits (default: ENGINE_JOB_TIMEOUT)
+            initializer: Per-worker warm-up (default: load the v16 engine)
+            name: Pool name used for worker threads and log messages
+        """
+        self.mode = (mode or os.getenv("ENGINE_EXECUTOR", "process")).lower()
+        self.workers = workers or int(os.getenv("ENGINE_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self.queue_size = queue_size if queue_size is not None else \
+            int(os.getenv("ENGINE_QUEUE_SIZE", str(self.workers * 2)))
+        self.job_timeout = job_timeout or float(os.getenv("ENGINE_JOB_TIMEOUT", "60"))
+        self.initializer = initializer
+        self.name = name
+
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+        # Counters
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.failed = 0
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of running + queued jobs"""
+        return self.workers + self.queue_size
+
+    def _create_pool(self) -> Executor:
+        if self.mode == "thread":
+            return ThreadPoolExecutor(max_workers=self.workers,
+                                      thread_name_prefix=f"riskcast-{self.name}")
+        # "spawn" avoids forking a process that already runs event-loop threads
+        return ProcessPoolExecutor(max_workers=self.workers,
+                                   mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=self.initializer)
+
+    def _get_pool(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = self._create_pool()
+            return self._pool
+
+    def start(self) -> None:
+        """Create the pool and start every worker (call at application startup)"""
+        pool = self._get_pool()
+        if self.mode == "thread" and self.initializer is not None:
+            # Threads share this process: warm up now, not on the first request
+            pool.submit(self.initializer).result()
+        futures = [pool.submit(_ping) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+        logger.info("Executor %s ready: %d %s worker(s), queue size %d, timeout %.0fs",
+                    self.name, self.workers, self.mode, self.queue_size, self.job_timeout)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop all workers (call at application shutdown)"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _release_slot(self, future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def _submit(self, fn: Callable, args: tuple, kwargs: Dict[str, Any]):
+        pool = self._get_pool()
+        if self.mode == "thread":
+            # Worker threads run in the caller's context so logs keep its request ID
+            return pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+        return pool.submit(_run_with_metrics, fn, args, kwargs)
+
+    async def submit(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run ``fn(*args, **kwargs)`` in the pool and await its result
+
+        Args:
+            fn: Picklable module-level function
+            timeout: Per-job timeout in seconds (default: ENGINE_JOB_TIMEOUT)
+
+        Raises:
+            EngineBusyError: All workers busy and the queue is full
+            EngineTimeoutError: Job did not finish within the timeout
+        """
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self.rejected += 1
+                raise EngineBusyError(
+                    f"Risk engine busy ({self._in_flight}/{self.capacity} jobs in flight)"
+                )
+            self._in_flight += 1
+            self.submitted += 1
+
+        try:
+            future = self._submit(fn, args, kwargs)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM); replace the pool and retry once
+            self.shutdown(wait=False)
+            try:
+                future = self._submit(fn, args, kwargs)
+            except Exception:
+                with self._lock:
+                    self._in_flight -= 1
+                    self.failed += 1
+                raise
+        except Exception:
+            with self._lock:
+                self._in_flight -= 1
+                self.failed += 1
+            raise
+
+        future.add_done_callback(self._release_slot)
+
+        try:
+            # shield(): a timeout must not cancel the slot-tracking future
+            result = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)),
+                                            timeout or self.job_timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timed_out += 1
+            raise EngineTimeoutError(
+                f"Risk engine job exceeded {timeout or self.job_timeout:.0f}s"
+            )
+
+        if self.mode == "thread":
+            return result
+        result, worker_metrics = result
+        metrics.merge(worker_metrics)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return executor counters"""
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "in_flight": self._in_flight,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "failed": self.failed,
+            }
+
+
+# Global executor instance
+engine_executor = EngineExecutor()
+
+
+def _collect_metrics():
+    stats = engine_executor.get_stats()
+    yield ("riskcast_engine_executor_in_flight", "gauge", "Engine jobs running or queued",
+           {"mode": stats["mode"]}, stats["in_flight"])
+    yield ("riskcast_engine_executor_capacity", "gauge", "Engine jobs allowed in flight",
+           {"mode": stats["mode"]}, stats["workers"] + stats["queue_size"])
+    for outcome in ("submitted", "completed", "rejected", "timed_out", "failed"):
+        yield ("riskcast_engine_executor_jobs_total", "counter", "Engine jobs by outcome",
+               {"outcome": outcome}, stats[outcome])
+
+
+metrics.register_collector(_collect_metrics)
+
+
+async def run_engine_job(fn: Callable, *args, **kwargs) -> Any:
+    """
+    Await an engine job on the global executor, mapping executor errors to HTTP
+
+    Raises:
+        HTTPException: 429 when the queue is full, 504 on timeout
+    """
+    try:
+        return await engine_executor.submit(fn, *args, **kwargs)
+    except EngineBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": "5"}
+        )
+    except EngineTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
@@ -0,0 +1,472 @@
+"""
+RISKCAST LLM Gateway
+Shared async access to Claude for every AI feature
+
+All LLM traffic goes through one ``LLMGateway``:
+
+- One ``AsyncAnthropic`` client with a pooled HTTP connection set, so calls
+  never block the event loop and reuse keep-alive connections.
+- A semaphore caps in-flight calls (excess callers wait their turn, within
+  their timeout), and each call has its own timeout.
+- Responses are cached by content hash of (model, system prompt, user prompt,
+  max_tokens) with a TTL, and identical concurrent calls share one request,
+  so repeated explanations of the same result cost nothing.
+- ``LLM_BACKEND=replay`` swaps the API for a local stub that replays
+  responses recorded to a JSONL file (``LLM_RECORD=true`` records them), for
+  offline development and tests.
+
+Configuration (environment):
+    LLM_BACKEND             "anthropic" (default) or "replay"
+    LLM_MODEL               Default model (default: claude-3-haiku-20240307)
+    LLM_MAX_CONCURRENCY     Calls allowed in flight (default: 8)
+    LLM_TIMEOUT             Seconds per call, including the wait for a slot (default: 60)
+    LLM_CACHE_TTL           Seconds a response stays cached; 0 disables (default: 3600)
+    LLM_CACHE_MAX_ENTRIES   Cached responses kept (default: 512)
+    LLM_REPLAY_FILE         Recorded responses (default: data/llm_replay.jsonl)
+    LLM_RECORD              Append live responses to LLM_REPLAY_FILE (default: false)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional
+
+from app.core.utils.metrics import LLM_REQUEST_SECONDS, LLM_TOKENS, metrics
+
+
+DEFAULT_MODEL = "claude-3-haiku-20240307"
+
+
+class LLMUnavailableError(Exception):
+    """Raised when no LLM backend is configured (or no recorded response exists)"""
+
+
+class LLMTimeoutError(Exception):
+    """Raised when a call (slot wait + request) exceeds its timeout"""
+
+
+def cache_key(model: str, system: str, prompt: str, max_tokens: int) -> str:
+    """Content hash identifying an LLM request"""
+    payload = json.dumps([model, system, prompt, max_tokens], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _record_usage(model: str, usage: Any) -> None:
+    """Count tokens from an API usage block (missing fields are skipped)"""
+    if usage is None:
+        return
+    for direction, field in (("input", "input_tokens"), ("output", "output_tokens")):
+        tokens = getattr(usage, field, None)
+        if tokens:
+            LLM_TOKENS.inc(tokens, model=model, direction=direction)
+
+
+def _api_key_valid(api_key: Optional[str]) -> bool:
+    return bool(api_key) and api_key not in ("dummy", "your_anthropic_api_key_here") and len(api_key) > 20
+
+
+# ===============================================================
+# BACKENDS
+# ===============================================================
+
+class LLMBackend:
+    """Backend interface: one completion, or a stream of text chunks"""
+
+    name = "base"
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    async def complete(self, model: str, system: str, prompt: str, max_tokens: int) -> str:
+        raise NotImplementedError
+
+    async def stream(self, model: str, system: str, prompt: str, max_tokens: int) -> AsyncIterator[str]:
+        # Default: a single chunk holding the full completion
+        yield await self.complete(model, system, prompt, max_tokens)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class AnthropicBackend(LLMBackend):
+    """AsyncAnthropic over a pooled HTTP client (created on first use)"""
+
+    name = "anthropic"
+
+    def __init__(self, api_key: Optional[str] = None, max_connections: int = 8, timeout: float = 60.0):
+        self._api_key = api_key
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._client = None
+
+    @property
+    def api_key(self) -> Optional[str]:
+        # Read lazily: app.api_ai loads .env after this module is imported
+        return self._api_key or os.getenv("ANTHROPIC_API_KEY")
+
+    @property
+    def available(self) -> bool:
+        return _api_key_valid(self.api_key)
+
+    def _get_client(self):
+        if self._client is None:
+            if not self.available:
+                raise LLMUnavailableError("ANTHROPIC_API_KEY not configured")
+            import httpx
+            from anthropic import AsyncAnthropic
+            try:
+                from anthropic import DefaultAsyncHttpxClient as HttpClient
+            except ImportError:  # anthropic < 0.29
+                HttpClient = httpx.AsyncClient
+            http_client = HttpClient(limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ))
+            self._client = AsyncAnthropic(api_key=self.api_key, timeout=self.timeout, http_client=http_client)
+        return self._client
+
+    async def complete(self, model: str, system: str, prompt: str, max_tokens: int) -> str:
+        kwargs = {"model": model, "max_tokens": max_tokens,
+                  "messages": [{"role": "user", "content": prompt}]}
+        if system:
+            kwargs["system"] = system
+        response = await self._get_client().messages.create(**kwargs)
+        _record_usage(model, getattr(response, "usage", None))
+        return response.content[0].text
+
+    async def stream(self, model: str, system: str, prompt: str, max_tokens: int) -> AsyncIterator[str]:
+        kwargs = {"model": model, "max_tokens": max_tokens,
+                  "messages": [{"role": "user", "content": prompt}]}
+        if system:
+            kwargs["system"] = system
+        async with self._get_client().messages.stream(**kwargs) as stream:
+            async for text in stream.text_stream:
+                if text:
+                    yield text
+            final = await stream.get_final_message()
+            _record_usage(model, getattr(final, "usage", None))
+
+    async def aclose(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            await client.close()
+
+
+class ReplayBackend(LLMBackend):
+    """
+    Offline stub replaying recorded responses
+
+    The replay file is JSONL with one ``{"key": ..., "response": ...}`` record
+    per line (``key`` from cache_key()). A record with key ``"*"`` answers any
+    request that has no exact recording.
+    """
+
+    name = "replay"
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._records: Dict[str, str] = {}
+        self._mtime = None
+
+    def _load(self) -> None:
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            self._records, self._mtime = {}, None
+            return
+        if mtime == self._mtime:
+            return
+        records = {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    record = json.loads(line)
+                    records[record["key"]] = record["response"]
+        self._records, self._mtime = records, mtime
+
+    async def complete(self, model: str, system: str, prompt: str, max_tokens: int) -> str:
+        self._load()
+        key = cache_key(model, system, prompt, max_tokens)
+        response = self._records.get(key, self._records.get("*"))
+        if response is None:
+            raise LLMUnavailableError(f"No recorded LLM response for request {key[:12]} in {self.path}")
+        return response
+
+
+def record_response(path: str, key: str, response: str) -> None:
+    """Append a live response to the replay file"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"key": key, "response": response}, ensure_ascii=False) + "\n")
+
+
+# ===============================================================
+# GATEWAY
+# ===============================================================
+
+class LLMGateway:
+    """Concurrency-capped, cached entry point for LLM calls"""
+
+    def __init__(self,
+                 backend: Optional[LLMBackend] = None,
+                 model: Optional[str] = None,
+                 max_concurrency: Optional[int] = None,
+                 timeout: Optional[float] = None,
+                 cache_ttl: Optional[float] = None,
+                 cache_max_entries: Optional[int] = None):
+        self.model = model or os.getenv("LLM_MODEL", DEFAULT_MODEL)
+        self.max_concurrency = max_concurrency or int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+        self.timeout = timeout or float(os.getenv("LLM_TIMEOUT", "60"))
+        self.cache_ttl = cache_ttl if cache_ttl is not None else float(os.getenv("LLM_CACHE_TTL", "3600"))
+        self.cache_max_entries = cache_max_entries or int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512"))
+        self.replay_file = os.getenv("LLM_REPLAY_FILE", "data/llm_replay.jsonl")
+        self.record = os.getenv("LLM_RECORD", "false").lower() in ("1", "true", "yes")
+        self.backend = backend if backend is not None else self._create_backend()
+
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+
+        # Counters
+        self.calls = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.timeouts = 0
+
+    def _create_backend(self) -> LLMBackend:
+        if os.getenv("LLM_BACKEND", "anthropic").lower() == "replay":
+            return ReplayBackend(self.replay_file)
+        return AnthropicBackend(max_connections=self.max_concurrency, timeout=self.timeout)
+
+    @property
+    def available(self) -> bool:
+        """Whether LLM calls can be made (API key configured, or replay mode)"""
+        return self.backend.available
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    # ---------------- cache ----------------
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        if self.cache_ttl <= 0:
+            return None
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            response, expires_at = entry
+            if expires_at < time.time():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return response
+
+    def _cache_put(self, key: str, response: str) -> None:
+        if self.cache_ttl <= 0:
+            return
+        with self._cache_lock:
+            self._cache[key] = (response, time.time() + self.cache_ttl)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_max_entries:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        with self._cache_lock:
+            self._cache.clear()
+
+    # ---------------- calls ----------------
+
+    async def _call_backend(self, key: str, model: str, system: str, prompt: str,
+                            max_tokens: int, timeout: float) -> str:
+        async def _guarded() -> str:
+            async with self._get_semaphore():
+                self._in_flight += 1
+                start = time.perf_counter()
+                outcome = "error"
+                try:
+                    response = await self.backend.complete(model, system, prompt, max_tokens)
+                    outcome = "ok"
+                    return response
+                except asyncio.CancelledError:
+                    outcome = "cancelled"  # timeout or caller went away
+                    raise
+                finally:
+                    self._in_flight -= 1
+                    LLM_REQUEST_SECONDS.observe(time.perf_counter() - start, backend=self.backend.name,
+                                                mode="complete", outcome=outcome)
+
+        self.calls += 1
+        try:
+            response = await asyncio.wait_for(_guarded(), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise LLMTimeoutError(f"LLM call exceeded {timeout:g}s")
+        except Exception:
+            self.errors += 1
+            raise
+
+        self._cache_put(key, response)
+        if self.record and self.backend.name != "replay":
+            record_response(self.replay_file, key, response)
+        return response
+
+    async def complete(self,
+                       prompt: str,
+                       system: str = "",
+                       model: Optional[str] = None,
+                       max_tokens: int = 4096,
+                       timeout: Optional[float] = None,
+                       use_cache: bool = True) -> str:
+        """
+        Return the completion text for a single-turn prompt
+
+        Args:
+            prompt: User message
+            system: System prompt
+            model: Model name (default: LLM_MODEL)
+            max_tokens: Completion token limit
+            timeout: Seconds to wait, including the wait for a slot (default: LLM_TIMEOUT)
+            use_cache: Serve/store the response from/in the cache
+
+        Raises:
+            LLMUnavailableError: No backend configured
+            LLMTimeoutError: Call exceeded the timeout
+            anthropic.APIError: Errors from the API are passed through
+        """
+        if not self.available:
+            raise LLMUnavailableError("LLM backend not configured (set ANTHROPIC_API_KEY or LLM_BACKEND=replay)")
+
+        model = model or self.model
+        timeout = timeout or self.timeout
+        key = cache_key(model, system, prompt, max_tokens)
+
+        if not use_cache:
+            return await self._call_backend(key, model, system, prompt, max_tokens, timeout)
+
+        cached = self._cache_get(key)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+
+        # Coalesce identical concurrent requests onto one backend call
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            response = await self._call_backend(key, model, system, prompt, max_tokens, timeout)
+            future.set_result(response)
+            return response
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters see the exception; silence "never retrieved" if there are none
+            future.exception()
+            raise
+        finally:
+            self._pending.pop(key, None)
+
+    async def stream(self,
+                     prompt: str,
+                     system: str = "",
+                     model: Optional[str] = None,
+                     max_tokens: int = 4096) -> AsyncIterator[str]:
+        """
+        Yield completion text chunks as they arrive
+
+        A cached response is yielded as one chunk; a completed stream is cached.
+        The concurrency slot is held for the life of the stream.
+        """
+        if not self.available:
+            raise LLMUnavailableError("LLM backend not configured (set ANTHROPIC_API_KEY or LLM_BACKEND=replay)")
+
+        model = model or self.model
+        key = cache_key(model, system, prompt, max_tokens)
+        cached = self._cache_get(key)
+        if cached is not None:
+            self.cache_hits += 1
+            yield cached
+            return
+
+        self.calls += 1
+        chunks = []
+        async with self._get_semaphore():
+            self._in_flight += 1
+            start = time.perf_counter()
+            outcome = "cancelled"
+            try:
+                async for chunk in self.backend.stream(model, system, prompt, max_tokens):
+                    chunks.append(chunk)
+                    yield chunk
+                outcome = "ok"
+            except Exception:
+                self.errors += 1
+                outcome = "error"
+                raise
+            finally:
+                self._in_flight -= 1
+                LLM_REQUEST_SECONDS.observe(time.perf_counter() - start, backend=self.backend.name,
+                                            mode="stream", outcome=outcome)
+
+        response = "".join(chunks)
+        self._cache_put(key, response)
+        if self.record and self.backend.name != "replay":
+            record_response(self.replay_file, key, response)
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client (call at application shutdown)"""
+        await self.backend.aclose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return gateway counters"""
+        with self._cache_lock:
+            cache_size = len(self._cache)
+        return {
+            "backend": self.backend.name,
+            "available": self.available,
+            "model": self.model,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+            "calls": self.calls,
+            "cache_hits": self.cache_hits,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "cache_size": cache_size,
+        }
+
+
+# Global gateway instance
+llm_gateway = LLMGateway()
+
+
+def _collect_metrics():
+    stats = llm_gateway.get_stats()
+    yield ("riskcast_llm_in_flight", "gauge", "LLM calls holding a concurrency slot",
+           {"backend": stats["backend"]}, stats["in_flight"])
+    yield ("riskcast_llm_cache_entries", "gauge", "Cached LLM responses", {}, stats["cache_size"])
+    for event in ("calls", "cache_hits", "coalesced", "errors", "timeouts"):
+        yield ("riskcast_llm_gateway_events_total", "counter", "LLM gateway call outcomes",
+               {"event": event}, stats[event])
+
+
+metrics.register_collector(_collect_metrics)
@@ -0,0 +1,314 @@
+"""
+RISKCAST Report Jobs
+Asynchronous PDF report rendering: submit -> job id -> poll -> download
+
+Rendering a report (ReportLab story build, chart decoding and resizing)
+takes up to several seconds of CPU. Routes submit a job and return at once;
+the PDF is rendered in a dedicated worker pool, separate from the risk
+engine pool so reports never delay analyses. Rendered PDFs are kept in a
+content-hash cache keyed on report data + language + layout: identical
+requests (including concurrent ones) render once. Jobs only remember the
+cache key and size; downloads are served from the cache, so a finished
+job's PDF is released when the cache evicts or expires it.
+
+Configuration (environment):
+    REPORT_EXECUTOR            "process" (default) or "thread"
+    REPORT_WORKERS             Render workers (default: 1)
+    REPORT_QUEUE_SIZE          Jobs allowed to wait for a free worker (default: 8)
+    REPORT_JOB_TIMEOUT         Seconds before a render is failed (default: 120)
+    REPORT_CACHE_MAX_ENTRIES   Rendered PDFs kept in memory (default: 32); also
+                               bounds how many finished jobs stay downloadable
+    REPORT_CACHE_TTL_SECONDS   Lifetime of a cached PDF and of its download (default: 3600)
+    REPORT_JOB_HISTORY         Finished jobs kept for polling (default: 256)
+"""
+
+import asyncio
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from app.core.services.engine_executor import EngineBusyError, EngineExecutor, EngineTimeoutError
+from app.core.utils.cache import ResultCache
+from app.core.utils.logger import get_logger
+from app.core.utils.metrics import metrics
+
+logger = get_logger("report", "jobs")
+
+# Bump when the PDF output changes so cached renders are not reused
+REPORT_VERSION = "report-2"
+
+LANGUAGES = ("en", "vi", "zh")
+LAYOUTS = ("letter", "a4")
+
+
+class ReportBusyError(Exception):
+    """Raised when too many reports are waiting to render (maps to HTTP 429)"""
+
+
+# ===============================================================
+# WORKER SIDE
+# ===============================================================
+
+def _init_report_worker() -> None:
+    """
+    Pre-warm a render worker
+
+    Imports ReportLab/PIL and registers fonts once per process.
+    """
+    from app.core.report.pdf_layouts import register_fonts
+
+    register_fonts()
+    _get_builder("en", "letter")
+
+
+@lru_cache(maxsize=None)
+def _get_builder(language: str, layout: str):
+    """Per-process PDFReportBuilder for one language/layout (styles are built once)"""
+    from app.core.report.pdf_builder import PDFReportBuilder
+
+    return PDFReportBuilder(language=language, layout=layout)
+
+
+def render_report_job(data: Dict[str, Any], language: str, layout: str) -> bytes:
+    """Worker job: render one PDF report"""
+    return _get_builder(language, layout).generate_report(data).getvalue()
+
+
+# ===============================================================
+# EVENT LOOP SIDE
+# ===============================================================
+
+@dataclass
+class ReportJob:
+    """One report render request"""
+    job_id: str
+    key: str
+    language: str
+    layout: str
+    status: str = "pending"  # pending | done | failed
+    cached: bool = False
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    size_bytes: Optional[int] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        def iso(ts: Optional[float]) -> Optional[str]:
+            return datetime.fromtimestamp(ts, timezone.utc).isoformat() if ts else None
+
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "language": self.language,
+            "layout": self.layout,
+            "cached": self.cached,
+            "size_bytes": self.size_bytes,
+            "render_ms": round((self.finished_at - self.created_at) * 1000, 1) if self.finished_at else None,
+            "created_at": iso(self.created_at),
+            "finished_at": iso(self.finished_at),
+            "error": self.error,
+        }
+
+
+class ReportJobManager:
+    """Tracks report jobs, renders them in the report pool and caches the PDFs"""
+
+    def __init__(self,
+                 executor: Optional[EngineExecutor] = None,
+                 cache: Optional[ResultCache] = None,
+                 history: Optional[int] = None):
+        self.executor = executor or EngineExecutor(
+            mode=os.getenv("REPORT_EXECUTOR", "process"),
+            workers=int(os.getenv("REPORT_WORKERS", "1")),
+            queue_size=int(os.getenv("REPORT_QUEUE_SIZE", "8")),
+            job_timeout=float(os.getenv("REPORT_JOB_TIMEOUT", "120")),
+            initializer=_init_report_worker,
+            name="report",
+        )
+        self.cache = cache or ResultCache(
+            max_entries=int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "32")),
+            ttl_seconds=float(os.getenv("REPORT_CACHE_TTL_SECONDS", "3600")),
+        )
+        self.history = history or int(os.getenv("REPORT_JOB_HISTORY", "256"))
+
+        self._jobs: "OrderedDict[str, ReportJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        # Counters
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.cache_hits = 0
+
+    @staticmethod
+    def make_key(data: Dict[str, Any], language: str, layout: str) -> str:
+        """Content hash of everything that affects the rendered PDF"""
+        return ResultCache.make_key(REPORT_VERSION, data, language, layout)
+
+    def submit(self, data: Dict[str, Any], language: str = "en", layout: str = "letter") -> ReportJob:
+        """
+        Create a report job (must be called from the event loop)
+
+        Args:
+            data: Report data (see PDFReportBuilder.generate_report)
+            language: Report language (en, vi, zh)
+            layout: Page size (letter, a4)
+
+        Returns:
+            ReportJob - already "done" when the PDF is cached
+
+        Raises:
+            ValueError: Unsupported language or layout
+            ReportBusyError: Too many reports waiting to render
+        """
+        language, layout = (language or "en").lower(), (layout or "letter").lower()
+        if language not in LANGUAGES:
+            raise ValueError(f"Unsupported report language '{language}' (expected one of {', '.join(LANGUAGES)})")
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unsupported report layout '{layout}' (expected one of {', '.join(LAYOUTS)})")
+
+        key = self.make_key(data, language, layout)
+        job = ReportJob(job_id=uuid.uuid4().hex, key=key, language=language, layout=layout)
+
+        pdf = self.cache.get(key)
+        with self._lock:
+            if pdf is None and self._pending >= self.executor.capacity:
+                self.rejected += 1
+                raise ReportBusyError(
+                    f"Report renderer busy ({self._pending}/{self.executor.capacity} reports pending)"
+                )
+            self.submitted += 1
+            if pdf is not None:
+                self.cache_hits += 1
+            else:
+                self._pending += 1
+            self._remember(job)
+
+        if pdf is not None:
+            self._finish(job, size_bytes=len(pdf), cached=True)
+        else:
+            job.task = asyncio.get_running_loop().create_task(self._render(job, data))
+        return job
+
+    async def _render(self, job: ReportJob, data: Dict[str, Any]) -> None:
+        try:
+            pdf = await self.cache.get_or_compute(
+                job.key,
+                lambda: self.executor.submit(render_report_job, data, job.language, job.layout)
+            )
+        except EngineBusyError:
+            self._finish(job, error="Report renderer busy, retry later")
+        except EngineTimeoutError:
+            self._finish(job, error=f"Report rendering exceeded {self.executor.job_timeout:.0f}s")
+        except Exception as e:
+            logger.warning("Report job %s failed: %s", job.job_id, e, exc_info=True)
+            self._finish(job, error=str(e) or type(e).__name__)
+        else:
+            self._finish(job, size_bytes=len(pdf))
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _finish(self, job: ReportJob, size_bytes: Optional[int] = None,
+                error: Optional[str] = None, cached: bool = False) -> None:
+        job.size_bytes, job.error, job.cached = size_bytes, error, cached
+        job.status = "failed" if error else "done"
+        job.finished_at = time.time()
+        with self._lock:
+            if error:
+                self.failed += 1
+            else:
+                self.completed += 1
+        logger.debug("Report job %s %s (%s/%s, cached=%s)", job.job_id, job.status,
+                     job.language, job.layout, cached)
+
+    def _remember(self, job: ReportJob) -> None:
+        """Store a job, dropping the oldest finished ones beyond the history size (lock held)"""
+        self._jobs[job.job_id] = job
+        if len(self._jobs) > self.history:
+            for job_id in [jid for jid, j in self._jobs.items() if j.status != "pending"]:
+                del self._jobs[job_id]
+                if len(self._jobs) <= self.history:
+                    break
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        """Look up a job by id"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def get_pdf(self, job: ReportJob) -> Optional[bytes]:
+        """
+        PDF of a finished job, read from the render cache
+
+        Returns:
+            PDF bytes, or None if the job is not done or the cache has
+            since evicted/expired the render
+        """
+        if job.status != "done":
+            return None
+        return self.cache.get(job.key)
+
+    async def wait(self, job: ReportJob, timeout: Optional[float] = None) -> ReportJob:
+        """
+        Wait for a job to finish
+
+        Args:
+            job: Job returned by submit()
+            timeout: Seconds to wait (default: wait until the render finishes or times out)
+
+        Returns:
+            The job (still "pending" if the wait timed out)
+        """
+        if job.task is not None and not job.task.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(job.task), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    def start(self) -> None:
+        """Start and pre-warm the render pool (call at application startup)"""
+        self.executor.start()
+
+    def shutdown(self) -> None:
+        """Stop the render pool (call at application shutdown)"""
+        self.executor.shutdown()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return job counters"""
+        with self._lock:
+            return {
+                "pending": self._pending,
+                "tracked": len(self._jobs),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "cache_hits": self.cache_hits,
+            }
+
+
+# Global instance
+report_jobs = ReportJobManager()
+
+
+def _collect_metrics():
+    stats = report_jobs.get_stats()
+    yield ("riskcast_report_jobs_pending", "gauge", "Report jobs waiting or rendering", {}, stats["pending"])
+    for outcome in ("submitted", "completed", "failed", "rejected", "cache_hits"):
+        yield ("riskcast_report_jobs_total", "counter", "Report jobs by outcome",
+               {"outcome": outcome}, stats[outcome])
+    cache_stats = report_jobs.cache.get_stats()
+    yield ("riskcast_report_cache_entries", "gauge", "Rendered PDFs cached", {}, cache_stats["entries"])
+
+
+metrics.register_collector(_collect_metrics)
@@ -1,7 +1,10 @@
 from typing import Dict, Any, Optional
 
-# Import risk engine using absolute import
-from app.core.engine.risk_engine_v16 import calculate_enterprise_risk
+from app.core.utils.cache import ResultCache, result_cache
+from app.core.services.engine_executor import run_engine_job, run_enterprise_risk_job, run_risk_service_job
+from app.core.utils.logger import get_logger
+
+logger = get_logger("engine", "risk_service")
 
 def _map_shipment_to_engine(shipment: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -369,10 +372,18 @@ def _transform_engine_output(engine_result: Dict[str, Any], original_payload: Di
     return result
 
 
-def run_risk_engine_v14(payload: Dict[str, Any]) -> Dict[str, Any]:
+def run_risk_engine_v14(payload: Dict[str, Any], engine: Optional[Any] = None) -> Dict[str, Any]:
     """
     Main service function: Map Shipment -> Engine input -> Engine output -> Option A format
+    
+    Args:
+        payload: Option A shipment payload (optional "seed" makes the run reproducible)
+        engine: Optional pre-built EnterpriseRiskEngineV16 (reused instead of a new one)
     """
+    # Imported here: the web process only builds cache keys and submits jobs;
+    # engine workers (and the thread executor at startup) load NumPy/SciPy
+    from app.core.engine.risk_engine_v16 import calculate_enterprise_risk
+    
     try:
         # Step 1: Map Option A Shipment to engine input format
         engine_input = _map_shipment_to_engine(payload)
@@ -382,7 +393,8 @@ def run_risk_engine_v14(payload: Dict[str, Any]) -> Dict[str, Any]:
         seller = payload.get("seller")
         
         # Step 3: Call actual risk engine with buyer/seller
-        engine_result = calculate_enterprise_risk(engine_input, buyer=buyer, seller=seller)
+        engine_result = calculate_enterprise_risk(engine_input, buyer=buyer, seller=seller, engine=engine,
+                                                  seed=payload.get("seed"))
         
         # Step 4: Transform engine output to Option A format
         # Pass original payload to extract ESG_score and other input fields
@@ -395,11 +407,10 @@ def run_risk_engine_v14(payload: Dict[str, Any]) -> Dict[str, Any]:
         return result
         
     except Exception as e:
-        print(f"[RISKCAST v14] ENGINE ERROR: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.error("Engine error: %s", e, exc_info=True)
         # Return default structure on error with all required fields
         return {
+            "engine_error": str(e),
             "risk_score": 0.5,
             "risk_level": "MODERATE",
             "expected_loss": 0,
@@ -433,3 +444,61 @@ def run_risk_engine_v14(payload: Dict[str, Any]) -> Dict[str, Any]:
             "buyer_seller_analysis": {},
             "financial_distribution": {}
         }
+
+
+# ===============================================================
+# RESULT CACHE
+# ===============================================================
+
+ENGINE_VERSION = "v16.0"
+
+# Payload fields read by _transform_engine_output (not part of engine input)
+_OUTPUT_PAYLOAD_FIELDS = (
+    'buyer', 'seller', 'distance', 'route_type', 'carrier_rating', 'weather_risk',
+    'port_risk', 'container_match', 'shipment_value', 'ENSO_index', 'typhoon_frequency',
+    'sst_anomaly', 'port_climate_stress', 'climate_volatility_index',
+    'climate_tail_event_probability', 'ESG_score', 'climate_resilience',
+    'green_packaging', 'priority_profile', 'priority_weights'
+)
+
+
+def risk_cache_key(payload: Dict[str, Any], seed: Optional[int] = None) -> str:
+    """
+    Content-addressed cache key for run_risk_engine_v14(payload)
+    
+    Hashes the normalized engine input from _map_shipment_to_engine, the
+    payload fields used when shaping the output, engine version and seed.
+    """
+    output_fields = {k: payload.get(k) for k in _OUTPUT_PAYLOAD_FIELDS if k in payload}
+    return ResultCache.make_key(ENGINE_VERSION, seed, _map_shipment_to_engine(payload), output_fields)
+
+
+async def run_risk_engine_v14_cached(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    run_risk_engine_v14 behind the result cache and the engine executor
+    
+    Identical concurrent requests share one engine job; error fallbacks
+    are never cached.
+    """
+    return await result_cache.get_or_compute(
+        risk_cache_key(payload, payload.get("seed")),
+        lambda: run_engine_job(run_risk_service_job, payload),
+        should_cache=lambda result: "engine_error" not in result
+    )
+
+
+async def calculate_enterprise_risk_cached(shipment_data: Dict[str, Any],
+                                           buyer: Optional[Dict] = None,
+                                           seller: Optional[Dict] = None,
+                                           seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    calculate_enterprise_risk behind the result cache and the engine executor
+    
+    The AI panel routes (analyze, route, insurance, delay, ESG) ask for the
+    same shipment in turn; they share one engine job instead of running it
+    once each.
+    """
+    return await result_cache.get_or_compute(
+        ResultCache.make_key(ENGINE_VERSION, "enterprise", seed, shipment_data, buyer, seller),
+        lambda: run_engine_job(run_enterprise_risk_job, shipment_data, buyer, seller, seed=seed)
+    )
@@ -102,9 +102,9 @@ async def secure_api_endpoint(
     
     # Check rate limit
     if rate_limit_per_minute:
-        rate_limiter.check_rate_limit(request, limit=rate_limit_per_minute)
+        await rate_limiter.check_rate_limit_async(request, limit=rate_limit_per_minute)
     else:
-        rate_limiter.check_rate_limit(request)
+        await rate_limiter.check_rate_limit_async(request)
     
     # Optional authentication
     user_id = None
@@ -3,9 +3,18 @@ RISKCAST Cache Module
 Caching utilities for risk analysis results
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, Awaitable
+from collections import OrderedDict
 from datetime import datetime, timedelta
+import asyncio
+import copy
+import hashlib
 import json
+import os
+import threading
+import time
+
+from app.core.utils.metrics import metrics
 
 
 class SimpleCache:
@@ -73,22 +82,174 @@ class SimpleCache:
 risk_cache = SimpleCache(ttl_seconds=3600)
 
 
+class ResultCache:
+    """
+    Bounded LRU + TTL cache for engine results with single-flight de-duplication
 
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+    Keys are content hashes (see make_key). Concurrent requests for the same
+    key share one computation; values are deep-copied on the way out so
+    callers can mutate their result freely.
+    """
+    
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 900):
+        """
+        Initialize cache
+        
+        Args:
+            max_entries: Maximum number of cached results (LRU eviction)
+            ttl_seconds: Time to live in seconds
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+    
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """
+        Build a content-addressed key from JSON-serializable parts
+        
+        Dict key order and whitespace do not affect the key.
+        """
+        canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get value from cache
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Copy of the cached value or None if expired/missing
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(value)
+    
+    def set(self, key: str, value: Any) -> None:
+        """
+        Set value in cache, evicting the least recently used entries if full
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    async def get_or_compute(self,
+                             key: str,
+                             compute: Callable[[], Awaitable[Any]],
+                             should_cache: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        Return the cached value for key, computing it at most once
+        
+        Concurrent callers with the same key while a computation is running
+        await that computation instead of starting their own.
+        
+        Args:
+            key: Cache key
+            compute: Coroutine factory producing the value on a miss
+            should_cache: Optional predicate; values failing it are returned but not stored
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            with self._lock:
+                self.coalesced += 1
+            return copy.deepcopy(await asyncio.shield(inflight))
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except BaseException as e:
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                future.exception()  # Mark retrieved when nobody is waiting
+            else:
+                future.cancel()
+            raise
+        else:
+            if should_cache is None or should_cache(value):
+                self.set(key, value)
+            future.set_result(value)
+            return copy.deepcopy(value)
+        finally:
+            self._inflight.pop(key, None)
+    
+    def invalidate(self, key: str) -> None:
+        """Invalidate specific cache entry"""
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        """Clear all cache entries"""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cache size and hit/miss/eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "coalesced": self.coalesced,
+                "inflight": len(self._inflight)
+            }
+
+
+# Global engine result cache
+result_cache = ResultCache(
+    max_entries=int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "256")),
+    ttl_seconds=float(os.getenv("RESULT_CACHE_TTL_SECONDS", "900"))
+)
+
+
+def _collect_metrics():
+    stats = result_cache.get_stats()
+    yield ("riskcast_result_cache_entries", "gauge", "Engine result cache entries", {}, stats["entries"])
+    for event in ("hits", "misses", "evictions", "expirations", "coalesced"):
+        yield ("riskcast_result_cache_events_total", "counter", "Engine result cache events",
+               {"event": event}, stats[event])
+
+
+metrics.register_collector(_collect_metrics)
@@ -0,0 +1,132 @@
+"""
+RISKCAST Structured Logging
+Per-subsystem loggers with request correlation IDs
+
+Loggers live under the ``riskcast`` namespace (``riskcast.engine``,
+``riskcast.ai``, ...). Messages use %-style arguments so a disabled level
+costs one ``isEnabledFor`` check and nothing is formatted; hot paths log at
+DEBUG and stay silent in production.
+
+The current request ID (set by RequestContextMiddleware from the
+``X-Request-ID`` header or a fresh UUID) is attached to every record
+emitted while that request is being handled.
+
+Configuration (environment):
+    LOG_LEVEL              Default level for every subsystem (default: INFO)
+    LOG_LEVEL_<SUBSYSTEM>  Level for one subsystem, e.g. LOG_LEVEL_ENGINE=DEBUG
+                           (engine, ai, storage, http, report)
+    LOG_FORMAT             "json" (default, one object per line) or "text"
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+
+ROOT_LOGGER = "riskcast"
+SUBSYSTEMS = ("engine", "ai", "storage", "http", "report")
+
+# Correlation ID of the request being handled ("-" outside a request)
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id"}
+
+_configured = False
+_configure_lock = threading.Lock()
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamp each record with the current request ID"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line; `extra` fields are included as keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def _level_from_env(name: str, default: str) -> int:
+    value = os.getenv(name, default).strip().upper()
+    level = logging.getLevelName(value)
+    return level if isinstance(level, int) else logging.INFO
+
+
+def configure_logging(force: bool = False) -> None:
+    """
+    Attach the stderr handler and apply levels from the environment
+
+    Called automatically by get_logger(); safe to call repeatedly.
+
+    Args:
+        force: Re-read the environment even if already configured
+    """
+    global _configured
+    if _configured and not force:
+        return
+    with _configure_lock:
+        if _configured and not force:
+            return
+
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(_level_from_env("LOG_LEVEL", "INFO"))
+        root.propagate = False
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+
+        handler = logging.StreamHandler(sys.stderr)
+        handler.addFilter(RequestContextFilter())
+        if os.getenv("LOG_FORMAT", "json").lower() == "text":
+            handler.setFormatter(logging.Formatter(
+                "%(asctime)s %(levelname)-7s %(name)s [%(request_id)s] %(message)s"
+            ))
+        else:
+            handler.setFormatter(JSONFormatter())
+        root.addHandler(handler)
+
+        for subsystem in SUBSYSTEMS:
+            # NOTSET inherits LOG_LEVEL from the root logger
+            logging.getLogger(f"{ROOT_LOGGER}.{subsystem}").setLevel(
+                _level_from_env(f"LOG_LEVEL_{subsystem.upper()}", "NOTSET"))
+
+        _configured = True
+
+
+def get_logger(subsystem: str, name: Optional[str] = None) -> logging.Logger:
+    """
+    Logger for a subsystem
+
+    Args:
+        subsystem: One of SUBSYSTEMS (engine, ai, storage, http, report)
+        name: Optional child name, e.g. "v16" -> riskcast.engine.v16
+
+    Returns:
+        logging.Logger honouring LOG_LEVEL_<SUBSYSTEM>
+    """
+    configure_logging()
+    logger_name = f"{ROOT_LOGGER}.{subsystem}"
+    if name:
+        logger_name = f"{logger_name}.{name}"
+    return logging.getLogger(logger_name)
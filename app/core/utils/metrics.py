@@ -0,0 +1,375 @@
+"""
+RISKCAST Metrics
+In-process counter/histogram registry rendered in Prometheus text format
+
+Metrics are recorded in memory and served by ``GET /metrics``; nothing
+external is required. Components that already keep their own counters
+(engine executor, LLM gateway, caches, rate limiter) register a collector
+that is read at scrape time instead of duplicating them.
+
+Engine jobs that run in the process pool record into the worker's registry;
+the executor ships those observations back with each result (``drain()`` in
+the worker, ``merge()`` in the parent), so /metrics covers every process.
+
+Usage:
+    ENGINE_STAGE_SECONDS.observe(0.12, engine="v16", stage="fahp")
+
+    @timed_stage("mc_sampling")
+    def simulate(...): ...
+
+    with timed_stage("carrier"):
+        ...
+
+A stage entered while another stage is running is recorded as
+"<outer>.<inner>" (e.g. "scenarios.mc_sampling"), so top-level stage
+totals never count the same time twice.
+"""
+
+import bisect
+import contextvars
+import functools
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# Seconds: sub-millisecond engine stages up to slow LLM calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Bytes: small JSON bodies up to report-sized payloads
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# (metric name, type, help, labels, value) read from a collector at scrape time
+Sample = Tuple[str, str, str, Dict[str, Any], float]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Labelled metric family; one value per label combination"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+    def drain(self) -> Dict[Tuple[str, ...], Any]:
+        """Return and reset the recorded values"""
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values: Dict[Tuple[str, ...], Any]) -> None:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing total"""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self._labels(key))} {_format_value(value)}"
+                for key, value in items]
+
+    def merge(self, values: Dict[Tuple[str, ...], float]) -> None:
+        with self._lock:
+            for key, value in values.items():
+                self._values[key] = self._values.get(key, 0.0) + value
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observations (cumulative buckets on render)"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [per-bucket counts (last = +Inf), sum, count]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def time(self, **labels) -> "_Timer":
+        """Context manager / decorator observing elapsed wall time in seconds"""
+        return _Timer(self, labels)
+
+    def get_count(self, **labels) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state[2] if state else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()]
+        lines = []
+        for key, (counts, total, count) in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+    def merge(self, values: Dict[Tuple[str, ...], list]) -> None:
+        with self._lock:
+            for key, (counts, total, count) in values.items():
+                state = self._values.get(key)
+                if state is None:
+                    state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                state[0] = [a + b for a, b in zip(state[0], counts)]
+                state[1] += total
+                state[2] += count
+
+
+class _Timer:
+    """Observe elapsed seconds into a histogram; usable with `with` or as a decorator"""
+
+    __slots__ = ("histogram", "labels", "_start")
+
+    def __init__(self, histogram: Histogram, labels: Dict[str, Any]):
+        self.histogram = histogram
+        self.labels = labels
+        self._start = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.histogram.observe(time.perf_counter() - self._start, **self.labels)
+
+    def __call__(self, fn: Callable) -> Callable:
+        histogram, labels = self.histogram, self.labels
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, **labels)
+        return wrapper
+
+
+class MetricsRegistry:
+    """Named metric families plus scrape-time collectors"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} already registered with a different type or labels")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def register_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """
+        Add a function read at scrape time
+
+        Args:
+            collector: Returns (name, "counter"|"gauge", help, labels, value) samples
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def drain(self) -> Dict[str, Dict]:
+        """Return and reset every recorded value (sent from engine worker processes)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: values for metric in metrics if (values := metric.drain())}
+
+    def merge(self, drained: Dict[str, Dict]) -> None:
+        """Add values drained from another process's registry"""
+        with self._lock:
+            metrics = dict(self._metrics)
+        for name, values in drained.items():
+            metric = metrics.get(name)
+            if metric is not None:
+                metric.merge(values)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+            collectors = list(self._collectors)
+
+        lines: List[str] = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+
+        families: Dict[str, Tuple[str, str, List[str]]] = {}
+        for collector in collectors:
+            try:
+                samples = list(collector())
+            except Exception:
+                # A failing source must not break the whole scrape
+                continue
+            for name, kind, documentation, labels, value in samples:
+                family = families.setdefault(name, (kind, documentation, []))
+                family[2].append(f"{name}{_format_labels(labels)} {_format_value(float(value))}")
+        for name, (kind, documentation, samples) in families.items():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+
+        return "\n".join(lines) + "\n"
+
+
+# Global registry
+metrics = MetricsRegistry()
+
+ENGINE_STAGE_SECONDS = metrics.histogram(
+    "riskcast_engine_stage_seconds",
+    "Wall time of risk engine stages",
+    ("engine", "stage"),
+)
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "riskcast_http_request_duration_seconds",
+    "HTTP request duration until the response starts",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_SIZE_BYTES = metrics.histogram(
+    "riskcast_http_request_size_bytes",
+    "HTTP request body size (Content-Length)",
+    ("method", "route"),
+    buckets=SIZE_BUCKETS,
+)
+HTTP_RESPONSE_SIZE_BYTES = metrics.histogram(
+    "riskcast_http_response_size_bytes",
+    "HTTP response body size (Content-Length; streamed responses are not counted)",
+    ("method", "route"),
+    buckets=SIZE_BUCKETS,
+)
+LLM_REQUEST_SECONDS = metrics.histogram(
+    "riskcast_llm_request_duration_seconds",
+    "LLM backend call latency (whole stream for streamed calls)",
+    ("backend", "mode", "outcome"),
+)
+LLM_TOKENS = metrics.counter(
+    "riskcast_llm_tokens_total",
+    "LLM tokens reported by the API",
+    ("model", "direction"),
+)
+RATE_LIMIT_DECISIONS = metrics.counter(
+    "riskcast_rate_limit_decisions_total",
+    "Rate limiter decisions",
+    ("route_class", "outcome"),
+)
+
+
+_ENCLOSING_STAGE: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "riskcast_engine_stage", default=None
+)
+
+
+class _StageTimer:
+    """timed_stage() timer: labels nested stages "<outer>.<inner>" """
+
+    __slots__ = ("stage", "engine", "_start", "_label", "_token")
+
+    def __init__(self, stage: str, engine: str):
+        self.stage = stage
+        self.engine = engine
+
+    def _enter(self) -> Tuple[str, contextvars.Token]:
+        outer = _ENCLOSING_STAGE.get()
+        label = f"{outer}.{self.stage}" if outer else self.stage
+        return label, _ENCLOSING_STAGE.set(label)
+
+    def _exit(self, label: str, token: contextvars.Token, start: float) -> None:
+        _ENCLOSING_STAGE.reset(token)
+        ENGINE_STAGE_SECONDS.observe(time.perf_counter() - start, engine=self.engine, stage=label)
+
+    def __enter__(self) -> "_StageTimer":
+        self._label, self._token = self._enter()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._exit(self._label, self._token, self._start)
+
+    def __call__(self, fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            label, token = self._enter()
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._exit(label, token, start)
+        return wrapper
+
+
+def timed_stage(stage: str, engine: str = "v16") -> _StageTimer:
+    """Time an engine stage into riskcast_engine_stage_seconds (decorator or `with`)"""
+    return _StageTimer(stage, engine)
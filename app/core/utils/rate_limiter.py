@@ -1,42 +1,239 @@
 """
 RISKCAST Security - Rate Limiting
 Prevents abuse, brute-force attacks, and spam
+
+Token bucket per (route class, client): each key holds two numbers - the
+token count and the time it was last refilled - so CPU and memory per
+client are O(1) regardless of request rate. Idle keys (bucket refilled to
+capacity) carry no information and are evicted on a timer; each key records
+when it will be full again, so long-period buckets are kept until then.
+
+Async callers (middleware, decorators) use is_allowed_async() /
+check_rate_limit_async(): backends that block (SQLite) run in a worker
+thread instead of on the event loop.
+
+Configuration (environment):
+    RATE_LIMIT_PER_MINUTE           Default route class (default: 60)
+    RATE_LIMIT_ENGINE_PER_MINUTE    Risk engine routes (default: 30)
+    RATE_LIMIT_AI_PER_MINUTE        AI routes (default: 10)
+    RATE_LIMIT_STATIC_PER_MINUTE    Static assets (default: 600; 0 disables)
+    RATE_LIMIT_POLL_PER_MINUTE      Report/batch job status, results and downloads
+                                    (default: 300)
+    RATE_LIMIT_BACKEND              "memory" (per process, default) or
+                                    "sqlite" (shared by all uvicorn workers)
+    RATE_LIMIT_DB_PATH              SQLite file (default: data/rate_limit.db)
 """
 
+import asyncio
+import math
+import sqlite3
+import threading
 import time
-from collections import defaultdict
-from typing import Optional
+from pathlib import Path
+from typing import Dict, Optional, Tuple
 from fastapi import Request, HTTPException, status
 from functools import wraps
 import os
 
+from app.core.utils.metrics import RATE_LIMIT_DECISIONS, metrics
 
-class RateLimiter:
-    """In-memory rate limiter (for production, use Redis)"""
+
+# Route classes and path prefixes (first match wins; everything else is "default").
+# Job polling (.../jobs/{id}, /batch/{id}/...) sits before "engine" so only
+# the submissions (POST .../jobs, POST /batch) spend the engine budget.
+ROUTE_CLASS_PREFIXES = (
+    ("static", ("/static/", "/dist/", "/assets/", "/favicon.ico", "/.well-known/")),
+    ("ai", ("/api/ai/", "/ai/")),
+    ("poll", ("/api/v1/risk/v2/report/jobs/", "/api/v1/risk/batch/")),
+    ("engine", ("/api/analyze", "/api/run", "/api/v1/risk/", "/api/v1/analyze")),
+)
+
+
+def classify_route(path: str) -> str:
+    """Map a request path to its rate limit route class"""
+    for route_class, prefixes in ROUTE_CLASS_PREFIXES:
+        if path.startswith(prefixes):
+            return route_class
+    return "default"
+
+
+# ===============================================================
+# STORAGE BACKENDS
+# ===============================================================
+
+class RateLimitBackend:
+    """Token bucket state store: key -> (tokens, updated_at, full_at)"""
+    
+    # True when consume() may block (disk I/O, locks held by other processes)
+    blocking = False
+    
+    def consume(self, key: str, capacity: float, refill_per_second: float,
+                now: float) -> Tuple[bool, float]:
+        """
+        Refill the bucket for `key` and take one token if available
+        
+        Returns:
+            (allowed, tokens left after this request)
+        """
+        raise NotImplementedError
+    
+    def evict_refilled(self, now: float) -> int:
+        """Drop keys whose bucket is back at capacity by `now`; returns the number removed"""
+        raise NotImplementedError
+    
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+def _refill(tokens: float, updated_at: float, capacity: float,
+            refill_per_second: float, now: float) -> float:
+    return min(capacity, tokens + max(0.0, now - updated_at) * refill_per_second)
+
+
+def _full_at(tokens: float, capacity: float, refill_per_second: float, now: float) -> float:
+    """Time at which the bucket is back at capacity (safe to evict from then on)"""
+    return now + max(0.0, capacity - tokens) / refill_per_second
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Per-process dict of buckets"""
     
     def __init__(self):
-        self.requests = defaultdict(list)
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+    
+    def consume(self, key: str, capacity: float, refill_per_second: float,
+                now: float) -> Tuple[bool, float]:
+        with self._lock:
+            tokens, updated_at, _ = self._buckets.get(key, (capacity, now, now))
+            tokens = _refill(tokens, updated_at, capacity, refill_per_second, now)
+            allowed = tokens >= 1.0
+            if allowed:
+                tokens -= 1.0
+            self._buckets[key] = (tokens, now, _full_at(tokens, capacity, refill_per_second, now))
+            return allowed, tokens
+    
+    def evict_refilled(self, now: float) -> int:
+        with self._lock:
+            idle = [key for key, (_, _, full_at) in self._buckets.items() if full_at <= now]
+            for key in idle:
+                del self._buckets[key]
+            return len(idle)
+    
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """
+    Buckets in an SQLite table (WAL), shared by every process on the host
+    
+    Each consume is one BEGIN IMMEDIATE read-modify-write, so concurrent
+    workers never double-spend a token. It can wait up to `timeout` for the
+    write lock, so async callers run it in a worker thread (blocking = True).
+    """
+    
+    blocking = True
+    
+    def __init__(self, db_path: str, timeout: float = 5.0):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.timeout = timeout
+        self._local = threading.local()
+        
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL, full_at REAL)"
+        )
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(buckets)")}
+        if "full_at" not in columns:
+            # Tables created before full_at: rows without it are evicted one minute after use
+            conn.execute("ALTER TABLE buckets ADD COLUMN full_at REAL")
+        conn.execute("DROP INDEX IF EXISTS idx_buckets_updated")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_buckets_full ON buckets (full_at)")
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode: transactions are opened explicitly
+            conn = sqlite3.connect(str(self.db_path), timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+        return conn
+    
+    def consume(self, key: str, capacity: float, refill_per_second: float,
+                now: float) -> Tuple[bool, float]:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated_at FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens, updated_at = row if row else (capacity, now)
+            tokens = _refill(tokens, updated_at, capacity, refill_per_second, now)
+            allowed = tokens >= 1.0
+            if allowed:
+                tokens -= 1.0
+            conn.execute(
+                "INSERT INTO buckets (key, tokens, updated_at, full_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, "
+                "updated_at = excluded.updated_at, full_at = excluded.full_at",
+                (key, tokens, now, _full_at(tokens, capacity, refill_per_second, now))
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, tokens
+    
+    def evict_refilled(self, now: float) -> int:
+        cursor = self._connect().execute(
+            "DELETE FROM buckets WHERE COALESCE(full_at, updated_at + 60) <= ?", (now,)
+        )
+        return cursor.rowcount
+    
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM buckets").fetchone()[0]
+
+
+def _create_backend() -> RateLimitBackend:
+    backend = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+    if backend == "sqlite":
+        return SQLiteRateLimitBackend(os.getenv("RATE_LIMIT_DB_PATH", "data/rate_limit.db"))
+    return MemoryRateLimitBackend()
+
+
+# ===============================================================
+# RATE LIMITER
+# ===============================================================
+
+class RateLimiter:
+    """Token bucket rate limiter with per-route-class limits"""
+    
+    def __init__(self, backend: Optional[RateLimitBackend] = None):
+        self.backend = backend if backend is not None else _create_backend()
         self.max_requests_per_minute = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
         self.max_requests_per_minute_ai = int(os.getenv("RATE_LIMIT_AI_PER_MINUTE", "10"))
-        self.cleanup_interval = 300  # Cleanup old entries every 5 minutes
+        # Requests per minute for each route class (<= 0 disables limiting)
+        self.route_limits = {
+            "default": self.max_requests_per_minute,
+            "engine": int(os.getenv("RATE_LIMIT_ENGINE_PER_MINUTE", "30")),
+            "ai": self.max_requests_per_minute_ai,
+            "static": int(os.getenv("RATE_LIMIT_STATIC_PER_MINUTE", "600")),
+            "poll": int(os.getenv("RATE_LIMIT_POLL_PER_MINUTE", "300")),
+        }
+        self.cleanup_interval = 300  # Evict idle keys every 5 minutes
         self.last_cleanup = time.time()
+        self._cleanup_lock = threading.Lock()
     
-    def cleanup_old_entries(self):
-        """Remove old rate limit entries"""
+    def cleanup_old_entries(self, force: bool = False) -> int:
+        """Evict keys whose bucket has refilled completely"""
         current_time = time.time()
-        if current_time - self.last_cleanup < self.cleanup_interval:
-            return
-        
-        cutoff_time = current_time - 60  # Remove entries older than 1 minute
-        for ip in list(self.requests.keys()):
-            self.requests[ip] = [
-                req_time for req_time in self.requests[ip]
-                if req_time > cutoff_time
-            ]
-            if not self.requests[ip]:
-                del self.requests[ip]
-        
-        self.last_cleanup = current_time
+        with self._cleanup_lock:
+            if not force and current_time - self.last_cleanup < self.cleanup_interval:
+                return 0
+            self.last_cleanup = current_time
+        return self.backend.evict_refilled(current_time)
     
     def get_client_ip(self, request: Request) -> str:
         """Get client IP address from request"""
@@ -57,61 +254,88 @@ class RateLimiter:
         
         return "unknown"
     
-    def is_allowed(self, ip: str, limit: int = None) -> tuple[bool, int, int]:
+    def is_allowed(self, ip: str, limit: int = None, route_class: str = "default",
+                   period_seconds: float = 60.0) -> tuple[bool, int, int]:
         """
         Check if request is allowed
         
         Args:
             ip: Client IP address
-            limit: Custom limit (None = use default)
-            
+            limit: Custom limit per period (None = route class limit)
+            route_class: "default", "engine", "ai" or "static"
+            period_seconds: Period the limit applies to
+        
         Returns:
             Tuple of (is_allowed, remaining, reset_in_seconds)
         """
         self.cleanup_old_entries()
         
         if limit is None:
-            limit = self.max_requests_per_minute
-        
-        current_time = time.time()
-        cutoff_time = current_time - 60
-        self.requests[ip] = [
-            req_time for req_time in self.requests[ip]
-            if req_time > cutoff_time
-        ]
+            limit = self.route_limits.get(route_class, self.max_requests_per_minute)
+            key = f"{route_class}:{ip}"
+        else:
+            # Custom limits get their own bucket so they never drain the class bucket
+            key = f"{route_class}/{limit}/{period_seconds:g}:{ip}"
         
-        # Check if limit exceeded
-        request_count = len(self.requests[ip])
-        is_allowed = request_count < limit
-        remaining = max(0, limit - request_count)
-        reset_in = int(60 - (current_time - (self.requests[ip][0] if self.requests[ip] else current_time)))
+        refill_per_second = limit / period_seconds
+        allowed, tokens = self.backend.consume(key, float(limit), refill_per_second, time.time())
+        RATE_LIMIT_DECISIONS.inc(route_class=route_class, outcome="allowed" if allowed else "rejected")
         
-        if is_allowed:
-            # Record this request
-            self.requests[ip].append(current_time)
-        
-        return is_allowed, remaining, reset_in
+        remaining = int(tokens)
+        if allowed:
+            # Seconds until the bucket is full again
+            reset_in = math.ceil((limit - tokens) / refill_per_second)
+        else:
+            # Seconds until the next token
+            reset_in = max(1, math.ceil((1.0 - tokens) / refill_per_second))
+        return allowed, remaining, reset_in
+    
+    async def is_allowed_async(self, ip: str, limit: int = None, route_class: str = "default",
+                               period_seconds: float = 60.0) -> tuple[bool, int, int]:
+        """is_allowed() for async callers: blocking backends run in a worker thread"""
+        if self.backend.blocking:
+            return await asyncio.to_thread(self.is_allowed, ip, limit, route_class, period_seconds)
+        return self.is_allowed(ip, limit, route_class, period_seconds)
     
-    def check_rate_limit(self, request: Request, limit: Optional[int] = None) -> None:
+    def check_rate_limit(self, request: Request, limit: Optional[int] = None,
+                         route_class: Optional[str] = None) -> None:
         """
         Check rate limit and raise exception if exceeded
         
         Args:
             request: FastAPI request object
-            limit: Custom limit (None = use default)
-            
+            limit: Custom limit (None = route class limit)
+            route_class: Route class (None = classify the request path)
+        
         Raises:
             HTTPException: If rate limit exceeded
         """
         ip = self.get_client_ip(request)
-        is_allowed, remaining, reset_in = self.is_allowed(ip, limit)
-        
+        route_class = route_class or classify_route(request.url.path)
+        effective_limit = limit if limit is not None else self.route_limits.get(route_class, self.max_requests_per_minute)
+        if effective_limit <= 0:
+            return
+        self._raise_if_rejected(self.is_allowed(ip, limit, route_class), effective_limit)
+    
+    async def check_rate_limit_async(self, request: Request, limit: Optional[int] = None,
+                                     route_class: Optional[str] = None) -> None:
+        """check_rate_limit() for async callers (see is_allowed_async)"""
+        ip = self.get_client_ip(request)
+        route_class = route_class or classify_route(request.url.path)
+        effective_limit = limit if limit is not None else self.route_limits.get(route_class, self.max_requests_per_minute)
+        if effective_limit <= 0:
+            return
+        self._raise_if_rejected(await self.is_allowed_async(ip, limit, route_class), effective_limit)
+    
+    @staticmethod
+    def _raise_if_rejected(decision: tuple, effective_limit: int) -> None:
+        is_allowed, remaining, reset_in = decision
         if not is_allowed:
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail=f"Rate limit exceeded. Maximum {limit} requests per minute. Try again in {reset_in} seconds.",
+                detail=f"Rate limit exceeded. Maximum {effective_limit} requests per minute. Try again in {reset_in} seconds.",
                 headers={
-                    "X-RateLimit-Limit": str(limit),
+                    "X-RateLimit-Limit": str(effective_limit),
                     "X-RateLimit-Remaining": str(remaining),
                     "X-RateLimit-Reset": str(reset_in),
                     "Retry-After": str(reset_in),
@@ -123,6 +347,14 @@ class RateLimiter:
 rate_limiter = RateLimiter()
 
 
+def _collect_metrics():
+    yield ("riskcast_rate_limit_buckets", "gauge", "Client token buckets held by the rate limiter backend",
+           {"backend": type(rate_limiter.backend).__name__}, len(rate_limiter.backend))
+
+
+metrics.register_collector(_collect_metrics)
+
+
 def rate_limit(max_requests: int = 60, per_minutes: int = 1):
     """
     Decorator to apply rate limiting to routes
@@ -148,7 +380,16 @@ def rate_limit(max_requests: int = 60, per_minutes: int = 1):
                         break
             
             if request:
-                rate_limiter.check_rate_limit(request, limit=max_requests)
+                ip = rate_limiter.get_client_ip(request)
+                is_allowed, remaining, reset_in = await rate_limiter.is_allowed_async(
+                    ip, max_requests, classify_route(request.url.path), period_seconds=per_minutes * 60
+                )
+                if not is_allowed:
+                    raise HTTPException(
+                        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                        detail=f"Rate limit exceeded. Try again in {reset_in} seconds.",
+                        headers={"Retry-After": str(reset_in)},
+                    )
             
             return await f(*args, **kwargs)
         
@@ -175,29 +416,8 @@ def ai_rate_limit(f):
                     break
         
         if request:
-            rate_limiter.check_rate_limit(request, limit=rate_limiter.max_requests_per_minute_ai)
+            await rate_limiter.check_rate_limit_async(request, route_class="ai")
         
         return await f(*args, **kwargs)
     
     return wrapper
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
@@ -0,0 +1,209 @@
+"""
+RISKCAST Startup Profiling
+Per-step boot timings and an optional import-time breakdown
+
+main.py wraps each router import (and the startup hooks) in
+``startup_profiler.step(name)``; once the application has started, the
+report is logged and exported on /metrics as ``riskcast_startup_*`` gauges.
+
+The import profile re-imports ``app.main`` in a ``python -X importtime``
+child process (in a background thread, so boot is not delayed) and logs
+the packages with the largest import cost.
+
+Configuration (environment):
+    STARTUP_REPORT          Log the per-step startup report (default: true)
+    STARTUP_IMPORT_PROFILE  Log an -X importtime summary after boot
+                            (default: true when LOG_LEVEL=DEBUG)
+    STARTUP_IMPORT_TOP      Packages listed in the import summary (default: 15)
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.core.utils.logger import get_logger
+from app.core.utils.metrics import metrics
+
+logger = get_logger("http", "startup")
+
+ROOT_DIR = Path(__file__).resolve().parents[3]
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass
+class StartupStep:
+    """One timed boot step"""
+    name: str
+    seconds: float
+    modules: int  # Modules first imported during the step
+
+
+class StartupProfiler:
+    """Records wall time and newly imported modules per boot step"""
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._modules_at_start = len(sys.modules)
+        self.steps: List[StartupStep] = []
+        self.ready_seconds: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        """Time a block (router import, startup hook, ...)"""
+        modules_before = len(sys.modules)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            step = StartupStep(name, time.perf_counter() - start, len(sys.modules) - modules_before)
+            with self._lock:
+                self.steps.append(step)
+
+    def mark_ready(self) -> None:
+        """Record the time from profiler creation until the app serves requests"""
+        self.ready_seconds = time.perf_counter() - self._start
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Startup summary
+
+        Returns:
+            Dict with ready_seconds, module count and one entry per step
+        """
+        with self._lock:
+            steps = list(self.steps)
+        return {
+            "ready_seconds": self.ready_seconds,
+            "modules_loaded": len(sys.modules) - self._modules_at_start,
+            "steps": [
+                {"name": s.name, "seconds": round(s.seconds, 4), "modules": s.modules}
+                for s in steps
+            ],
+        }
+
+    def log_report(self) -> None:
+        """Log the per-step report (INFO), slowest steps first"""
+        if not _env_flag("STARTUP_REPORT", True):
+            return
+        report = self.report()
+        logger.info("Startup complete in %.2fs (%d modules loaded)",
+                    report["ready_seconds"] or 0.0, report["modules_loaded"])
+        for step in sorted(report["steps"], key=lambda s: s["seconds"], reverse=True):
+            logger.info("  %-28s %8.1f ms  %5d modules", step["name"], step["seconds"] * 1000, step["modules"])
+
+    def collect(self):
+        """Metrics collector: startup gauges"""
+        if self.ready_seconds is not None:
+            yield ("riskcast_startup_ready_seconds", "gauge",
+                   "Seconds from application import until startup completed", {}, self.ready_seconds)
+        for step in self.report()["steps"]:
+            yield ("riskcast_startup_step_seconds", "gauge",
+                   "Wall time of each startup step (router imports, startup hooks)",
+                   {"step": step["name"]}, step["seconds"])
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """
+    Parse ``-X importtime`` output
+
+    Args:
+        stderr: Child process stderr
+
+    Returns:
+        (module, self_us, cumulative_us) per imported module
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # Header line
+        rows.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+    return rows
+
+
+def summarize_importtime(rows: List[Tuple[str, int, int]], top: int = 15) -> List[Tuple[str, float, int]]:
+    """
+    Aggregate import self-time by top-level package
+
+    Args:
+        rows: parse_importtime() output
+        top: Number of packages to return
+
+    Returns:
+        (package, milliseconds, module count), most expensive first
+    """
+    totals: Dict[str, List[float]] = {}
+    for module, self_us, _ in rows:
+        root = module.split(".")[0]
+        if root == "app":
+            # Own code: break down one level further (app.core, app.api_ai, ...)
+            root = ".".join(module.split(".")[:2])
+        entry = totals.setdefault(root, [0.0, 0])
+        entry[0] += self_us / 1000
+        entry[1] += 1
+    ranked = sorted(totals.items(), key=lambda item: item[1][0], reverse=True)
+    return [(name, round(ms, 1), int(count)) for name, (ms, count) in ranked[:top]]
+
+
+def profile_imports(module: str = "app.main", top: Optional[int] = None) -> Optional[List[Tuple[str, float, int]]]:
+    """
+    Import ``module`` in a ``python -X importtime`` child and log the costliest packages
+
+    Args:
+        module: Module to import in the child
+        top: Packages to report (default: STARTUP_IMPORT_TOP)
+
+    Returns:
+        summarize_importtime() output, or None if the child failed
+    """
+    top = top or int(os.getenv("STARTUP_IMPORT_TOP", "15"))
+    env = dict(os.environ, STARTUP_IMPORT_PROFILE="false", STARTUP_REPORT="false")
+    try:
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT_DIR, env=env, capture_output=True, text=True, timeout=120,
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning("Import profile failed: %s", e)
+        return None
+    rows = parse_importtime(proc.stderr)
+    if proc.returncode != 0 or not rows:
+        logger.warning("Import profile failed (exit code %s)", proc.returncode)
+        return None
+
+    summary = summarize_importtime(rows, top)
+    total_ms = sum(self_us for _, self_us, _ in rows) / 1000
+    logger.info("Import profile for %s: %.0f ms across %d modules", module, total_ms, len(rows))
+    for name, ms, count in summary:
+        logger.info("  %-28s %8.1f ms  %5d modules", name, ms, count)
+    return summary
+
+
+def start_import_profile() -> Optional[threading.Thread]:
+    """Run profile_imports() in the background when STARTUP_IMPORT_PROFILE is on"""
+    debug = os.getenv("LOG_LEVEL", "INFO").strip().upper() == "DEBUG"
+    if not _env_flag("STARTUP_IMPORT_PROFILE", debug):
+        return None
+    thread = threading.Thread(target=profile_imports, name="riskcast-import-profile", daemon=True)
+    thread.start()
+    return thread
+
+
+# Global instance (created when main.py starts importing the application)
+startup_profiler = StartupProfiler()
+metrics.register_collector(startup_profiler.collect)
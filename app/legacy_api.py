@@ -0,0 +1,51 @@
+"""
+RISKCAST Legacy API Loader
+Single shared import of app/api.py
+
+``app/api.py`` (Option A ``/api/run`` routes and ``LAST_RESULT``) is
+shadowed by the ``app/api/`` package, so it cannot be imported by name and
+is loaded from its file path instead. The module is executed once and
+registered in ``sys.modules``; main.py and the overview routes all get the
+same instance (one router, one LAST_RESULT) instead of re-executing it.
+"""
+
+import importlib.util
+import sys
+import threading
+from pathlib import Path
+from types import ModuleType
+
+MODULE_NAME = "legacy_api"
+LEGACY_API_PATH = Path(__file__).resolve().parent / "api.py"
+
+_load_lock = threading.Lock()
+
+
+def load_legacy_api() -> ModuleType:
+    """
+    Return the app/api.py module, executing it on first use
+
+    Returns:
+        The shared legacy API module
+
+    Raises:
+        FileNotFoundError: app/api.py is missing
+    """
+    module = sys.modules.get(MODULE_NAME)
+    if module is not None:
+        return module
+
+    with _load_lock:
+        module = sys.modules.get(MODULE_NAME)
+        if module is None:
+            if not LEGACY_API_PATH.exists():
+                raise FileNotFoundError(LEGACY_API_PATH)
+            spec = importlib.util.spec_from_file_location(MODULE_NAME, LEGACY_API_PATH)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[MODULE_NAME] = module
+            try:
+                spec.loader.exec_module(module)
+            except BaseException:
+                sys.modules.pop(MODULE_NAME, None)
+                raise
+    return module
@@ -2,6 +2,11 @@
 """
 RISKCAST Enterprise AI - FastAPI Application
 Main entry point for the RISKCAST backend server
+
+Boot is profiled per step (router imports, startup hooks) and reported once
+the app has started; see app/core/utils/startup.py for STARTUP_REPORT and
+STARTUP_IMPORT_PROFILE. Heavy optional subsystems (PDF reports, the
+Anthropic SDK, the v16 engine with SciPy) are imported on first use.
 """
 import multiprocessing
 import os
@@ -17,22 +22,40 @@ root_dir = Path(__file__).resolve().parent.parent
 env_file = root_dir / ".env"
 if env_file.exists():
     load_dotenv(env_file)
-    print(f"[INFO] Loaded .env from: {env_file}")
+
+# Logging reads LOG_LEVEL* / LOG_FORMAT, so it is configured after .env is loaded
+from app.core.utils.logger import get_logger
+logger = get_logger("http")
+if env_file.exists():
+    logger.info("Loaded .env from: %s", env_file)
+
+from app.core.utils.startup import startup_profiler, start_import_profile
 
 # FastAPI imports
-from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, FileResponse, RedirectResponse, Response
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
-from fastapi.middleware.cors import CORSMiddleware
-
-# Application routers
-from app.api import router as api_router
-from app.api_ai import router as ai_router
-from app.routes.overview import router as overview_router
-from app.routes.update_shipment_route_v33 import router as update_shipment_router
-from app.routes.ai_endpoints_v33 import router as ai_endpoints_router
-from app.routes.overview_v34_4 import router as overview_v34_4_router
+with startup_profiler.step("fastapi"):
+    from fastapi import FastAPI, Request
+    from fastapi.responses import HTMLResponse, FileResponse, RedirectResponse, Response
+    from fastapi.staticfiles import StaticFiles
+    from fastapi.templating import Jinja2Templates
+    from fastapi.middleware.cors import CORSMiddleware
+
+# Application routers (app/api.py is loaded once and shared with the overview routes)
+from app.legacy_api import LEGACY_API_PATH, load_legacy_api
+
+with startup_profiler.step("router:api"):
+    from app.api import router as api_router
+with startup_profiler.step("router:legacy_api"):
+    legacy_api = load_legacy_api() if LEGACY_API_PATH.exists() else None
+with startup_profiler.step("router:api_ai"):
+    from app.api_ai import router as ai_router
+with startup_profiler.step("router:overview"):
+    from app.routes.overview import router as overview_router
+with startup_profiler.step("router:update_shipment_v33"):
+    from app.routes.update_shipment_route_v33 import router as update_shipment_router
+with startup_profiler.step("router:ai_endpoints_v33"):
+    from app.routes.ai_endpoints_v33 import router as ai_endpoints_router
+with startup_profiler.step("router:overview_v34_4"):
+    from app.routes.overview_v34_4 import router as overview_v34_4_router
 
 # Core modules
 from app.core import build_helper
@@ -56,6 +79,11 @@ app.add_middleware(ErrorHandlerMiddleware)
 from app.middleware.security_headers import SecurityHeadersMiddleware
 app.add_middleware(SecurityHeadersMiddleware)
 
+# Rate Limit Middleware (token buckets per route class; inside CORS so 429s keep CORS headers)
+if os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes"):
+    from app.middleware.rate_limit import RateLimitMiddleware
+    app.add_middleware(RateLimitMiddleware)
+
 # CORS Middleware (restricted origins)
 allowed_origins = os.getenv("ALLOWED_ORIGINS", "http://localhost:8000,http://127.0.0.1:8000").split(",")
 app.add_middleware(
@@ -63,8 +91,8 @@ app.add_middleware(
     allow_origins=[origin.strip() for origin in allowed_origins],
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
-    allow_headers=["Content-Type", "Authorization", "X-Requested-With"],
-    expose_headers=["X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset"],
+    allow_headers=["Content-Type", "Authorization", "X-Requested-With", "X-Request-ID"],
+    expose_headers=["X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset", "X-Request-ID"],
 )
 
 # Cache Headers Middleware (for production assets)
@@ -74,6 +102,61 @@ app.add_middleware(CacheHeadersMiddleware)
 from starlette.middleware.sessions import SessionMiddleware
 app.add_middleware(SessionMiddleware, secret_key=os.getenv("SESSION_SECRET_KEY", "riskcast-session-secret-key-change-in-production"))
 
+# Metrics Middleware (request duration/size histograms, including rate-limited and failed requests)
+from app.middleware.metrics import MetricsMiddleware
+app.add_middleware(MetricsMiddleware)
+
+# Request Context Middleware (added last = outermost, so every log line in a request carries its ID)
+from app.middleware.request_context import RequestContextMiddleware
+app.add_middleware(RequestContextMiddleware)
+
+# ============================
+# BATCH JOBS (registered before the executor's shutdown hook: cancel jobs first)
+# ============================
+@app.on_event("shutdown")
+async def stop_batch_jobs():
+    """Cancel running batch scoring jobs"""
+    from app.core.services.batch_jobs import batch_jobs
+    await batch_jobs.shutdown()
+
+# ============================
+# ENGINE EXECUTOR (process pool for CPU-bound risk engine jobs)
+# ============================
+from app.core.services.engine_executor import engine_executor
+
+@app.on_event("startup")
+def start_engine_executor():
+    """Start and pre-warm the engine worker pool"""
+    with startup_profiler.step("startup:engine_executor"):
+        engine_executor.start()
+
+@app.on_event("shutdown")
+def stop_engine_executor():
+    """Stop the engine worker pool"""
+    engine_executor.shutdown()
+
+# ============================
+# REPORT JOBS (separate pool for PDF rendering)
+# ============================
+from app.core.services.report_jobs import report_jobs
+
+@app.on_event("startup")
+def start_report_jobs():
+    """Start the PDF render pool (fonts registered once per worker)"""
+    with startup_profiler.step("startup:report_executor"):
+        report_jobs.start()
+
+@app.on_event("shutdown")
+def stop_report_jobs():
+    """Stop the PDF render pool"""
+    report_jobs.shutdown()
+
+@app.on_event("shutdown")
+async def close_llm_gateway():
+    """Close the pooled LLM HTTP client"""
+    from app.core.services.llm_gateway import llm_gateway
+    await llm_gateway.aclose()
+
 # ============================
 # TEMPLATES PATH - Use shared instance
 # ============================
@@ -187,11 +270,29 @@ app.include_router(ai_endpoints_router)  # POST /api/ai/*
 
 # Include Overview v34.4 routes (Ultra Vision Pro)
 app.include_router(overview_v34_4_router)  # GET /overview-v34-4
-import importlib.util
-api_py_path = Path(__file__).parent / "api.py"
-if api_py_path.exists():
-    spec = importlib.util.spec_from_file_location("legacy_api", api_py_path)
-    if spec is not None and spec.loader is not None:
-        legacy_api = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(legacy_api)
-        app.include_router(legacy_api.router, prefix="/api", tags=["legacy"])
+
+# Include legacy Option A routes (app/api.py)
+if legacy_api is not None:
+    app.include_router(legacy_api.router, prefix="/api", tags=["legacy"])
+
+# ============================
+# METRICS (Prometheus text format)
+# ============================
+from app.core.utils.metrics import metrics
+
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Prometheus scrape endpoint: engine stages, HTTP, LLM, executor, caches, rate limiter"""
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# ============================
+# STARTUP REPORT (registered last: runs after the other startup hooks)
+# ============================
+@app.on_event("startup")
+def report_startup():
+    """Log time per router/startup step; optionally profile imports in the background"""
+    startup_profiler.mark_ready()
+    startup_profiler.log_report()
+    start_import_profile()
@@ -1,15 +1,30 @@
 """
 RISKCAST Enterprise AI - Mini Memory System
 Stores and compares shipment analysis history
+
+Storage backends:
+    SQLiteMemoryBackend   Embedded SQLite in WAL mode (default): indexed
+                          shipments table + keyed KV table, O(log n) writes,
+                          safe for concurrent readers and writers
+    JSONMemoryBackend     Legacy history.json / kv_store.json files
+
+Configuration (environment):
+    MEMORY_BACKEND        "sqlite" (default) or "json"
 """
 
 import json
+import os
+import sqlite3
+import threading
 import uuid
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 from dataclasses import dataclass, asdict
 
+from app.core.utils.logger import get_logger
+
+logger = get_logger("storage", "memory")
 
 @dataclass
 class ShipmentMemory:
@@ -25,16 +40,56 @@ class ShipmentMemory:
         return asdict(self)
 
 
-class MemorySystem:
-    """Mini Memory System for RISKCAST"""
+# ===============================================================
+# STORAGE BACKENDS
+# ===============================================================
+
+class MemoryBackend:
+    """Storage interface used by MemorySystem"""
+    
+    def save_shipment(self, record: Dict) -> None:
+        raise NotImplementedError
     
-    def __init__(self, data_dir: str = "data"):
+    def get_shipment(self, shipment_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+    
+    def query_shipments(self,
+                        limit: int = 10,
+                        offset: int = 0,
+                        route: Optional[str] = None,
+                        risk_level: Optional[str] = None,
+                        since: Optional[str] = None,
+                        until: Optional[str] = None) -> Tuple[List[Dict], int]:
         """
-        Initialize memory system
+        Newest-first page of shipment records matching the filters
         
-        Args:
-            data_dir: Directory to store history data
+        Returns:
+            (records, total matching count)
         """
+        raise NotImplementedError
+    
+    def set(self, key: str, value: Any) -> None:
+        raise NotImplementedError
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        raise NotImplementedError
+
+
+def _shipment_index_fields(record: Dict) -> Tuple[Optional[str], Optional[str]]:
+    """(route, risk_level) indexed for a shipment record"""
+    shipment_data = record.get('shipment_data') or {}
+    risk_analysis = record.get('risk_analysis') or {}
+    route = shipment_data.get('route') or shipment_data.get('trade_route')
+    risk_level = risk_analysis.get('risk_level')
+    return (str(route) if route is not None else None,
+            str(risk_level) if risk_level is not None else None)
+
+
+class JSONMemoryBackend(MemoryBackend):
+    """Legacy backend: whole-file JSON rewrites (single process only)"""
+    
+    def __init__(self, data_dir: Path):
+        self._lock = threading.Lock()
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
         self.history_file = self.data_dir / "history.json"
@@ -70,7 +125,7 @@ class MemorySystem:
             with open(self.history_file, 'w', encoding='utf-8') as f:
                 json.dump(self.history, f, indent=2, ensure_ascii=False)
         except IOError as e:
-            print(f"Error saving history: {e}")
+            logger.error("Error saving history: %s", e)
     
     def _save_kv_store(self) -> None:
         """Save key-value store to file"""
@@ -78,7 +133,245 @@ class MemorySystem:
             with open(self.kv_store_file, 'w', encoding='utf-8') as f:
                 json.dump(self.kv_store, f, indent=2, ensure_ascii=False)
         except IOError as e:
-            print(f"Error saving kv_store: {e}")
+            logger.error("Error saving kv_store: %s", e)
+    
+    def save_shipment(self, record: Dict) -> None:
+        with self._lock:
+            self.history[record['shipment_id']] = record
+            self._save_history()
+    
+    def get_shipment(self, shipment_id: str) -> Optional[Dict]:
+        return self.history.get(shipment_id)
+    
+    def query_shipments(self,
+                        limit: int = 10,
+                        offset: int = 0,
+                        route: Optional[str] = None,
+                        risk_level: Optional[str] = None,
+                        since: Optional[str] = None,
+                        until: Optional[str] = None) -> Tuple[List[Dict], int]:
+        shipments = []
+        with self._lock:
+            records = list(self.history.values())
+        for record in records:
+            record_route, record_level = _shipment_index_fields(record)
+            timestamp = record.get('timestamp', '')
+            if route is not None and record_route != route:
+                continue
+            if risk_level is not None and record_level != risk_level:
+                continue
+            if since is not None and timestamp < since:
+                continue
+            if until is not None and timestamp >= until:
+                continue
+            shipments.append(record)
+        # Sort by timestamp (newest first)
+        shipments.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
+        return shipments[offset:offset + limit], len(shipments)
+    
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self.kv_store[key] = value
+            self._save_kv_store()
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.kv_store.get(key, default)
+
+
+class SQLiteMemoryBackend(MemoryBackend):
+    """
+    Embedded SQLite backend (WAL mode)
+    
+    One connection per thread; WAL lets readers run alongside the single
+    writer, and each write is one indexed row instead of a file rewrite.
+    Records are stored as JSON text; route, risk level and timestamp are
+    extracted into indexed columns for filtered, paginated queries.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS shipments (
+            shipment_id TEXT PRIMARY KEY,
+            timestamp   TEXT NOT NULL,
+            route       TEXT,
+            risk_level  TEXT,
+            record      TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_shipments_timestamp ON shipments (timestamp);
+        CREATE INDEX IF NOT EXISTS idx_shipments_route ON shipments (route, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_shipments_risk_level ON shipments (risk_level, timestamp);
+        CREATE TABLE IF NOT EXISTS kv_store (
+            key        TEXT PRIMARY KEY,
+            value      TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key   TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """
+    
+    def __init__(self, db_path: Path, timeout: float = 30.0):
+        """
+        Args:
+            db_path: SQLite database file
+            timeout: Seconds to wait for a locked database
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.timeout = timeout
+        self._local = threading.local()
+        
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(self.SCHEMA)
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=self.timeout)
+            conn.row_factory = sqlite3.Row
+            # WAL + NORMAL: durable across application crashes, one fsync per checkpoint
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    @staticmethod
+    def _dumps(value: Any) -> str:
+        return json.dumps(value, ensure_ascii=False, default=str)
+    
+    def save_shipment(self, record: Dict) -> None:
+        route, risk_level = _shipment_index_fields(record)
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO shipments (shipment_id, timestamp, route, risk_level, record) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (record['shipment_id'], record.get('timestamp', ''), route, risk_level, self._dumps(record))
+            )
+    
+    def get_shipment(self, shipment_id: str) -> Optional[Dict]:
+        row = self._connect().execute(
+            "SELECT record FROM shipments WHERE shipment_id = ?", (shipment_id,)
+        ).fetchone()
+        return json.loads(row["record"]) if row else None
+    
+    def query_shipments(self,
+                        limit: int = 10,
+                        offset: int = 0,
+                        route: Optional[str] = None,
+                        risk_level: Optional[str] = None,
+                        since: Optional[str] = None,
+                        until: Optional[str] = None) -> Tuple[List[Dict], int]:
+        clauses, params = [], []
+        for column, op, value in (("route", "=", route), ("risk_level", "=", risk_level),
+                                  ("timestamp", ">=", since), ("timestamp", "<", until)):
+            if value is not None:
+                clauses.append(f"{column} {op} ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        
+        conn = self._connect()
+        total = conn.execute(f"SELECT COUNT(*) FROM shipments{where}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT record FROM shipments{where} ORDER BY timestamp DESC LIMIT ? OFFSET ?",
+            params + [int(limit), int(offset)]
+        ).fetchall()
+        return [json.loads(row["record"]) for row in rows], total
+    
+    def set(self, key: str, value: Any) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO kv_store (key, value, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                (key, self._dumps(value), datetime.now().isoformat())
+            )
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        row = self._connect().execute("SELECT value FROM kv_store WHERE key = ?", (key,)).fetchone()
+        return json.loads(row["value"]) if row else default
+    
+    def import_json_files(self, history_file: Path, kv_store_file: Path) -> Dict[str, int]:
+        """
+        One-shot import of the legacy JSON files
+        
+        Runs once per database (recorded in the meta table); existing rows
+        win over imported ones. The JSON files are left untouched.
+        
+        Returns:
+            Counts of imported shipments and keys
+        """
+        conn = self._connect()
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'json_imported'").fetchone():
+            return {"shipments": 0, "keys": 0}
+        
+        def load(path: Path) -> Dict:
+            if not path.exists():
+                return {}
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                return data if isinstance(data, dict) else {}
+            except (json.JSONDecodeError, IOError) as e:
+                logger.error("Error importing %s: %s", path, e)
+                return {}
+        
+        history = load(history_file)
+        kv_store = load(kv_store_file)
+        now = datetime.now().isoformat()
+        
+        shipment_rows = []
+        for shipment_id, record in history.items():
+            if not isinstance(record, dict):
+                continue
+            record = {**record, 'shipment_id': record.get('shipment_id', shipment_id)}
+            route, risk_level = _shipment_index_fields(record)
+            shipment_rows.append((record['shipment_id'], record.get('timestamp', ''), route, risk_level,
+                                  self._dumps(record)))
+        
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO shipments (shipment_id, timestamp, route, risk_level, record) "
+                "VALUES (?, ?, ?, ?, ?)", shipment_rows
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO kv_store (key, value, updated_at) VALUES (?, ?, ?)",
+                [(key, self._dumps(value), now) for key, value in kv_store.items()]
+            )
+            conn.execute("INSERT INTO meta (key, value) VALUES ('json_imported', ?)", (now,))
+        
+        return {"shipments": len(shipment_rows), "keys": len(kv_store)}
+
+
+# ===============================================================
+# MEMORY SYSTEM
+# ===============================================================
+
+class MemorySystem:
+    """Mini Memory System for RISKCAST"""
+    
+    def __init__(self, data_dir: str = "data", backend: Optional[str] = None):
+        """
+        Initialize memory system
+        
+        Args:
+            data_dir: Directory to store history data
+            backend: "sqlite" or "json" (default: MEMORY_BACKEND env, then "sqlite")
+        """
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(exist_ok=True)
+        self.history_file = self.data_dir / "history.json"
+        self.kv_store_file = self.data_dir / "kv_store.json"
+        
+        backend = (backend or os.getenv("MEMORY_BACKEND", "sqlite")).lower()
+        if backend == "json":
+            self.backend: MemoryBackend = JSONMemoryBackend(self.data_dir)
+        else:
+            self.backend = SQLiteMemoryBackend(self.data_dir / "memory.db")
+            imported = self.backend.import_json_files(self.history_file, self.kv_store_file)
+            if imported["shipments"] or imported["keys"]:
+                logger.info("Imported %d shipment(s) and %d key(s) from JSON files",
+                            imported['shipments'], imported['keys'])
     
     def save_shipment(self, shipment_data: Dict, risk_analysis: Dict, summary: str = "") -> str:
         """
@@ -102,8 +395,7 @@ class MemorySystem:
             summary=summary
         )
         
-        self.history[shipment_id] = memory.to_dict()
-        self._save_history()
+        self.backend.save_shipment(memory.to_dict())
         
         return shipment_id
     
@@ -117,7 +409,7 @@ class MemorySystem:
         Returns:
             Shipment memory dict or None
         """
-        return self.history.get(shipment_id)
+        return self.backend.get_shipment(shipment_id)
     
     def get_all_shipments(self, limit: int = 10) -> List[Dict]:
         """
@@ -129,10 +421,38 @@ class MemorySystem:
         Returns:
             List of shipment memories
         """
-        shipments = list(self.history.values())
-        # Sort by timestamp (newest first)
-        shipments.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-        return shipments[:limit]
+        shipments, _ = self.backend.query_shipments(limit=limit)
+        return shipments
+    
+    def query_shipments(self,
+                        limit: int = 10,
+                        offset: int = 0,
+                        route: Optional[str] = None,
+                        risk_level: Optional[str] = None,
+                        since: Optional[str] = None,
+                        until: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Paginated, filtered shipment history (newest first)
+        
+        Args:
+            limit: Page size
+            offset: Records to skip
+            route: Exact route filter
+            risk_level: Exact risk level filter
+            since: ISO timestamp lower bound (inclusive)
+            until: ISO timestamp upper bound (exclusive)
+        
+        Returns:
+            Page of shipment memories with total count
+        """
+        items, total = self.backend.query_shipments(limit=limit, offset=offset, route=route,
+                                                    risk_level=risk_level, since=since, until=until)
+        return {
+            "items": items,
+            "total": total,
+            "limit": limit,
+            "offset": offset
+        }
     
     def compare_shipments(self, shipment_id_1: str, shipment_id_2: str) -> Dict:
         """
@@ -244,8 +564,7 @@ class MemorySystem:
             key: Storage key
             value: Value to store (must be JSON serializable)
         """
-        self.kv_store[key] = value
-        self._save_kv_store()
+        self.backend.set(key, value)
     
     def get(self, key: str, default: Any = None) -> Any:
         """
@@ -258,7 +577,7 @@ class MemorySystem:
         Returns:
             Stored value or default
         """
-        return self.kv_store.get(key, default)
+        return self.backend.get(key, default)
 
 
 def _generate_comparison_insights(shipment_1: Dict, shipment_2: Dict, risk_change: float) -> List[str]:
@@ -0,0 +1,50 @@
+"""
+RISKCAST Metrics - HTTP Middleware
+Records request duration and body sizes per route template
+"""
+
+import time
+
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.utils.metrics import HTTP_REQUEST_SECONDS, HTTP_REQUEST_SIZE_BYTES, HTTP_RESPONSE_SIZE_BYTES
+
+
+def _route_label(request) -> str:
+    """Route template (e.g. /api/v1/risk/scenario/{name}) so label cardinality stays bounded"""
+    route = request.scope.get("route")
+    template = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if not template:
+        return "unmatched"
+    
+    # Routes of a router included with a prefix may report their path without it
+    regex = getattr(route, "path_regex", None)
+    path = request.scope.get("path", "")
+    if regex is not None and not regex.match(path):
+        for i in range(1, len(path)):
+            if path[i] == "/" and regex.match(path[i:]):
+                return path[:i] + template
+    return template
+
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    """Observe riskcast_http_* histograms for every request"""
+    
+    async def dispatch(self, request, call_next):
+        start = time.perf_counter()
+        status_code = 500
+        response = None
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            route = _route_label(request)
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, method=request.method,
+                                         route=route, status=status_code)
+            request_size = request.headers.get("content-length")
+            if request_size and request_size.isdigit():
+                HTTP_REQUEST_SIZE_BYTES.observe(int(request_size), method=request.method, route=route)
+            response_size = response.headers.get("content-length") if response is not None else None
+            if response_size and response_size.isdigit():
+                HTTP_RESPONSE_SIZE_BYTES.observe(int(response_size), method=request.method, route=route)
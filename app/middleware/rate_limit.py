@@ -0,0 +1,47 @@
+"""
+RISKCAST Security - Rate Limit Middleware
+Applies per-route-class token buckets to every request
+"""
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+
+from app.core.utils.rate_limiter import rate_limiter, classify_route
+
+
+class RateLimitMiddleware(BaseHTTPMiddleware):
+    """Reject clients over their route class limit with 429 and X-RateLimit-* headers"""
+    
+    def __init__(self, app, limiter=None):
+        super().__init__(app)
+        self.limiter = limiter or rate_limiter
+    
+    async def dispatch(self, request, call_next):
+        route_class = classify_route(request.url.path)
+        limit = self.limiter.route_limits.get(route_class, self.limiter.max_requests_per_minute)
+        if limit <= 0 or request.method == "OPTIONS":
+            return await call_next(request)
+        
+        ip = self.limiter.get_client_ip(request)
+        allowed, remaining, reset_in = await self.limiter.is_allowed_async(ip, route_class=route_class)
+        headers = {
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(reset_in),
+        }
+        
+        if not allowed:
+            headers["Retry-After"] = str(reset_in)
+            return JSONResponse(
+                status_code=429,
+                content={
+                    "error": "rate_limit_exceeded",
+                    "detail": f"Rate limit exceeded. Maximum {limit} requests per minute. Try again in {reset_in} seconds.",
+                    "route_class": route_class,
+                },
+                headers=headers,
+            )
+        
+        response = await call_next(request)
+        response.headers.update(headers)
+        return response
@@ -0,0 +1,43 @@
+"""
+RISKCAST Logging - Request Context Middleware
+Assigns each request a correlation ID used by every log record it produces
+"""
+
+import re
+import time
+import uuid
+
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.utils.logger import get_logger, request_id_var
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Client-supplied IDs are accepted only if short and log-safe
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+logger = get_logger("http", "access")
+
+
+class RequestContextMiddleware(BaseHTTPMiddleware):
+    """Set the request ID context, echo it in X-Request-ID and log the request at DEBUG"""
+    
+    async def dispatch(self, request, call_next):
+        request_id = request.headers.get(REQUEST_ID_HEADER, "")
+        if not _VALID_REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+        
+        token = request_id_var.set(request_id)
+        start = time.perf_counter()
+        try:
+            response = await call_next(request)
+        except Exception:
+            logger.error("%s %s failed", request.method, request.url.path, exc_info=True)
+            raise
+        else:
+            response.headers[REQUEST_ID_HEADER] = request_id
+            logger.debug("%s %s -> %d (%.1f ms)", request.method, request.url.path,
+                         response.status_code, (time.perf_counter() - start) * 1000)
+            return response
+        finally:
+            request_id_var.reset(token)
@@ -4,14 +4,26 @@ Wrapper for risk calculation functions
 """
 
 from typing import Dict, List, Optional, Any
-from app.core.engine.risk_engine_v16 import (
-    EnterpriseRiskEngine,
-    calculate_enterprise_risk,
-    compute_partner_risk
-)
 
 
-def compute_overall_risk(shipment_data: Dict, buyer: Optional[Dict] = None, seller: Optional[Dict] = None) -> float:
+# The v16 engine (NumPy/SciPy) is imported on first use, not when the AI
+# routes that use these helpers are loaded
+def calculate_enterprise_risk(*args, **kwargs) -> Dict:
+    """Deferred app.core.engine.risk_engine_v16.calculate_enterprise_risk"""
+    from app.core.engine.risk_engine_v16 import calculate_enterprise_risk as _calculate
+    return _calculate(*args, **kwargs)
+
+
+def __getattr__(name: str):
+    # Re-exports kept for callers importing them from this module
+    if name in ("EnterpriseRiskEngine", "compute_partner_risk"):
+        from app.core.engine import risk_engine_v16
+        return getattr(risk_engine_v16, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def compute_overall_risk(shipment_data: Dict, buyer: Optional[Dict] = None, seller: Optional[Dict] = None,
+                         result: Optional[Dict] = None) -> float:
     """
     Compute overall risk index (0-100)
     
@@ -19,46 +31,54 @@ def compute_overall_risk(shipment_data: Dict, buyer: Optional[Dict] = None, sell
         shipment_data: Shipment parameters
         buyer: Optional buyer information
         seller: Optional seller information
+        result: calculate_enterprise_risk output to reuse (None = run the engine)
     
     Returns:
         Overall risk index (0-100)
     """
-    result = calculate_enterprise_risk(shipment_data, buyer, seller)
+    if result is None:
+        result = calculate_enterprise_risk(shipment_data, buyer, seller)
     return result.get('overall_risk_index', 50.0)
 
 
-def compute_route_risk(shipment_data: Dict) -> Dict:
+def compute_route_risk(shipment_data: Dict, result: Optional[Dict] = None) -> Dict:
     """
     Compute route-specific risk factors
     
     Args:
         shipment_data: Shipment parameters
+        result: calculate_enterprise_risk output to reuse (None = run the engine)
     
     Returns:
         Dictionary with route risk details
     """
-    result = calculate_enterprise_risk(shipment_data)
+    if result is None:
+        result = calculate_enterprise_risk(shipment_data)
+    
+    risk_factors = _risk_factor_scores(result)
     
     return {
-        'route_risk_score': result.get('risk_factors', {}).get('route_complexity', 5.0) * 10,
-        'weather_risk': result.get('risk_factors', {}).get('weather_exposure', 5.0) * 10,
-        'port_risk': result.get('risk_factors', {}).get('port_risk', 5.0) * 10,
+        'route_risk_score': risk_factors.get('route_complexity', 5.0) * 10,
+        'weather_risk': risk_factors.get('weather_exposure', 5.0) * 10,
+        'port_risk': risk_factors.get('port_risk', 5.0) * 10,
         'transport_reliability': result.get('reliability_score', 50.0),
         'recommended_mode': shipment_data.get('transport_mode', 'sea')
     }
 
 
-def compute_esg_score(shipment_data: Dict) -> Dict:
+def compute_esg_score(shipment_data: Dict, result: Optional[Dict] = None) -> Dict:
     """
     Compute ESG (Environmental, Social, Governance) score
     
     Args:
         shipment_data: Shipment parameters
+        result: calculate_enterprise_risk output to reuse (None = run the engine)
     
     Returns:
         Dictionary with ESG metrics
     """
-    result = calculate_enterprise_risk(shipment_data)
+    if result is None:
+        result = calculate_enterprise_risk(shipment_data)
     
     # Extract ESG-related metrics
     esg_score = result.get('esg_score', 50.0)
@@ -82,24 +102,26 @@ def compute_esg_score(shipment_data: Dict) -> Dict:
     }
 
 
-def compute_delay_probability(shipment_data: Dict) -> Dict:
+def compute_delay_probability(shipment_data: Dict, result: Optional[Dict] = None) -> Dict:
     """
     Compute predictive delay probability and factors
     
     Args:
         shipment_data: Shipment parameters
+        result: calculate_enterprise_risk output to reuse (None = run the engine)
     
     Returns:
         Dictionary with delay analysis
     """
-    result = calculate_enterprise_risk(shipment_data)
+    if result is None:
+        result = calculate_enterprise_risk(shipment_data)
     
     # Extract delay-related metrics
     delay_probability = result.get('delay_probability', 0.3) * 100
     expected_delay_days = result.get('expected_delay_days', 2.0)
     
     # Identify main delay factors
-    risk_factors = result.get('risk_factors', {})
+    risk_factors = _risk_factor_scores(result)
     main_factors = []
     
     if risk_factors.get('weather_exposure', 0) > 6.0:
@@ -200,6 +222,30 @@ def generate_summary(shipment_data: Dict, risk_result: Dict) -> str:
 
 # ==================== HELPER FUNCTIONS ====================
 
+def _risk_factor_scores(result: Dict) -> Dict[str, float]:
+    """
+    Layer risk scores (0-10) keyed by snake_case layer name
+    
+    The v16 engine returns risk_factors as a list of {"name", "score", ...}
+    entries; older results used a name -> score dict. Adds port_risk (worst
+    POL/POD layer) and transport_reliability (10 - carrier risk).
+    """
+    factors = result.get('risk_factors') or {}
+    if isinstance(factors, list):
+        factors = {
+            str(factor.get('name', '')).lower().replace(' ', '_'): factor.get('score')
+            for factor in factors if isinstance(factor, dict)
+        }
+    scores = {name: float(score) for name, score in factors.items() if isinstance(score, (int, float))}
+    
+    port_scores = [score for name, score in scores.items() if name.startswith(('pol_', 'pod_'))]
+    if port_scores:
+        scores.setdefault('port_risk', max(port_scores))
+    if 'carrier_reliability' in scores:
+        scores.setdefault('transport_reliability', 10.0 - scores['carrier_reliability'])
+    return scores
+
+
 def _estimate_carbon_footprint(shipment_data: Dict) -> float:
     """Estimate carbon footprint in kg CO2e"""
     distance = shipment_data.get('distance', 1000)
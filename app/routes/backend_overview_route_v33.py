@@ -11,15 +11,11 @@ from app.memory import memory_system
 import json
 from typing import Dict, Any, Optional
 
-# Import LAST_RESULT from app/api.py module file
-import importlib.util
-from pathlib import Path
+from app.legacy_api import load_legacy_api
 
-_api_module_path = Path(__file__).parent.parent / "api.py"
-_api_spec = importlib.util.spec_from_file_location("_api_module", _api_module_path)
-_api_module = importlib.util.module_from_spec(_api_spec)
-_api_spec.loader.exec_module(_api_module)
-LAST_RESULT = _api_module.LAST_RESULT
+# app/api.py (shared module instance, see app/legacy_api.py). api.py rebinds
+# LAST_RESULT on every run, so read _api_module.LAST_RESULT at request time.
+_api_module = load_legacy_api()
 
 # Port database with lat/lon
 PORT_DATABASE = {
@@ -84,8 +80,9 @@ async def overview_v33_page(request: Request, id: Optional[str] = None):
         shipment_data = memory_system.get("latest_shipment") or {}
     
     # Priority 3: Get from LAST_RESULT (legacy)
-    if not shipment_data and LAST_RESULT:
-        shipment = LAST_RESULT.get('shipment', {})
+    last_result = _api_module.LAST_RESULT
+    if not shipment_data and last_result:
+        shipment = last_result.get('shipment', {})
         if shipment:
             shipment_data = {
                 'transport_mode': shipment.get('transport_mode', ''),
@@ -96,8 +93,8 @@ async def overview_v33_page(request: Request, id: Optional[str] = None):
                 'cargo_value': shipment.get('cargo_value', 0),
                 'pol_code': shipment.get('origin', ''),
                 'pod_code': shipment.get('destination', ''),
-                'risk_score': LAST_RESULT.get('overall_risk', 7.2),
-                'risk_level': LAST_RESULT.get('risk_level', 'Medium')
+                'risk_score': last_result.get('overall_risk', 7.2),
+                'risk_level': last_result.get('risk_level', 'Medium')
             }
     
     # Get POL/POD info
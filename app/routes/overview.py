@@ -3,15 +3,11 @@ from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse, JSONResponse
 from app.core.templates import templates
 from app.memory import memory_system
-import importlib.util
-from pathlib import Path
+from app.legacy_api import load_legacy_api
 
-# Import LAST_RESULT from app/api.py module file (not from app/api package)
-_api_module_path = Path(__file__).parent.parent / "api.py"
-_api_spec = importlib.util.spec_from_file_location("_api_module", _api_module_path)
-_api_module = importlib.util.module_from_spec(_api_spec)
-_api_spec.loader.exec_module(_api_module)
-LAST_RESULT = _api_module.LAST_RESULT
+# app/api.py (shared module instance, see app/legacy_api.py). api.py rebinds
+# LAST_RESULT on every run, so read _api_module.LAST_RESULT at request time.
+_api_module = load_legacy_api()
 
 # Port database with lat/lon
 PORT_DATABASE = {
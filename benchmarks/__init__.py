@@ -0,0 +1,11 @@
+"""
+RISKCAST Benchmarks
+Reproducible performance benchmarks with baseline regression gating
+
+Usage (from the repository root):
+    python -m benchmarks list
+    python -m benchmarks run [-k PATTERN] [--rounds N] [--output FILE]
+    python -m benchmarks compare BASELINE [CURRENT] [--threshold 0.2]
+
+See benchmarks/README.md.
+"""
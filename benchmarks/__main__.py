@@ -0,0 +1,105 @@
+"""
+RISKCAST Benchmarks - Command line
+
+    python -m benchmarks list
+    python -m benchmarks run [-k PATTERN] [--rounds N] [--output FILE]
+    python -m benchmarks compare BASELINE [CURRENT] [--threshold 0.2]
+
+``compare`` without CURRENT runs the suite first. Exit status is 1 when any
+benchmark is slower than the baseline by more than the threshold (or fails).
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from . import harness
+
+
+def _print_result(name: str, result: dict) -> None:
+    if result["status"] == "ok":
+        print(f"  {name:<32} median {harness.format_seconds(result['median']):>10}"
+              f"  min {harness.format_seconds(result['min']):>10}"
+              f"  ±{harness.format_seconds(result['stdev'])}", flush=True)
+    else:
+        print(f"  {name:<32} {result['status']}: {result.get('reason', '')}", flush=True)
+
+
+def _run(args) -> dict:
+    harness.configure_environment()
+    print(f"Running benchmarks (rounds={args.rounds or 'default'})", flush=True)
+    results = harness.run_all(args.filter, args.rounds, progress=_print_result)
+    output = Path(args.output)
+    harness.save_results(results, output)
+    print(f"Results written to {output}")
+    return results
+
+
+def cmd_list(args) -> int:
+    harness.configure_environment()
+    for name, bench in harness.load_benchmarks().items():
+        print(f"{bench.group:<10} {name}")
+    return 0
+
+
+def cmd_run(args) -> int:
+    results = _run(args)
+    return 1 if any(r["status"] == "error" for r in results["benchmarks"].values()) else 0
+
+
+def cmd_compare(args) -> int:
+    baseline = harness.load_results(Path(args.baseline))
+    current = harness.load_results(Path(args.current)) if args.current else _run(args)
+
+    rows, regressions = harness.compare(baseline, current, args.threshold, args.metric)
+    print(f"\n{'benchmark':<32} {'baseline':>10} {'current':>10} {'change':>8}  status")
+    for row in rows:
+        change = f"{row['change'] * 100:+.1f}%" if row["change"] is not None else "-"
+        print(f"{row['name']:<32} {harness.format_seconds(row['baseline']):>10} "
+              f"{harness.format_seconds(row['current']):>10} {change:>8}  {row['status']}")
+
+    base_env, current_env = baseline.get("environment", {}), current.get("environment", {})
+    for key in ("python", "numpy", "machine", "cpu_count"):
+        if base_env.get(key) != current_env.get(key):
+            print(f"warning: {key} differs from baseline "
+                  f"({base_env.get(key)} vs {current_env.get(key)}); timings may not be comparable")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="RISKCAST performance benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_run_options(p):
+        p.add_argument("-k", "--filter", help="Only run benchmarks matching this fnmatch pattern")
+        p.add_argument("--rounds", type=int, help="Override the number of timed rounds")
+        p.add_argument("--output", default=str(harness.RESULTS_DIR / "latest.json"),
+                       help="Where to write results (default: benchmarks/results/latest.json)")
+
+    sub.add_parser("list", help="List benchmarks").set_defaults(func=cmd_list)
+
+    run = sub.add_parser("run", help="Run benchmarks and write a results file")
+    add_run_options(run)
+    run.set_defaults(func=cmd_run)
+
+    compare = sub.add_parser("compare", help="Compare results against a baseline")
+    compare.add_argument("baseline", help="Baseline results JSON (e.g. benchmarks/baseline.json)")
+    compare.add_argument("current", nargs="?", help="Results JSON to check (default: run the suite now)")
+    compare.add_argument("--threshold", type=float, default=harness.DEFAULT_THRESHOLD,
+                         help="Relative slowdown flagged as a regression (default: 0.2 = 20%%)")
+    compare.add_argument("--metric", default="median", choices=("median", "min", "mean"),
+                         help="Timing statistic to compare (default: median)")
+    add_run_options(compare)
+    compare.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
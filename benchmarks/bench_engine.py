@@ -0,0 +1,66 @@
+"""
+RISKCAST Benchmarks - Risk Engine v16
+Monte Carlo sampling, financial metrics, delay estimation, full assessment
+"""
+
+import numpy as np
+
+from .fixtures import SEED, V16_SHIPMENT, copy_of, monte_carlo_inputs, risk_distribution
+from .harness import benchmark
+
+
+def _correlated_samples(iterations: int):
+    from app.core.engine.risk_engine_v16 import MonteCarloEngine
+
+    inputs = monte_carlo_inputs()
+    engine = MonteCarloEngine(iterations)
+
+    def run():
+        engine.generate_correlated_samples(
+            inputs['means'], inputs['volatilities'], inputs['correlation'],
+            rng=np.random.default_rng(SEED)
+        )
+    return run
+
+
+@benchmark("mc_correlated_samples_10k", group="engine")
+def mc_correlated_samples_10k():
+    return _correlated_samples(10_000)
+
+
+@benchmark("mc_correlated_samples_50k", group="engine")
+def mc_correlated_samples_50k():
+    return _correlated_samples(50_000)
+
+
+@benchmark("mc_correlated_samples_100k", group="engine")
+def mc_correlated_samples_100k():
+    return _correlated_samples(100_000)
+
+
+@benchmark("financial_metrics_50k", group="engine", number=5)
+def financial_metrics_50k():
+    from app.core.engine.risk_engine_v16 import FinancialRiskCalculator
+
+    distribution = risk_distribution(50_000)
+    shipment_value = V16_SHIPMENT['cargo_value']
+
+    def run():
+        FinancialRiskCalculator.calculate_all_metrics(distribution)
+        FinancialRiskCalculator.calculate_financial_distribution(distribution, shipment_value)
+    return run
+
+
+@benchmark("delay_estimator_50k", group="engine", number=5)
+def delay_estimator_50k():
+    from app.core.engine.risk_engine_v16 import DelayEstimator
+
+    distribution = risk_distribution(50_000)
+    return lambda: DelayEstimator.estimate_delay_distribution(distribution)
+
+
+@benchmark("calculate_enterprise_risk", group="engine")
+def calculate_enterprise_risk():
+    from app.core.engine.risk_engine_v16 import calculate_enterprise_risk as calculate
+
+    return lambda: calculate(copy_of(V16_SHIPMENT), seed=SEED)
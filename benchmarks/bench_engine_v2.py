@@ -0,0 +1,76 @@
+"""
+RISKCAST Benchmarks - Engine v2
+FAHP, TOPSIS and the async risk pipeline
+"""
+
+import asyncio
+
+import numpy as np
+
+from .fixtures import PIPELINE_SHIPMENT, RISK_CONTEXT, SEED, copy_of
+from .harness import benchmark
+
+
+@benchmark("fahp_solve_cached", group="engine_v2", number=100)
+def fahp_solve_cached():
+    from app.core.engine_v2.fahp import FAHPSolver
+
+    solver = FAHPSolver()
+    return lambda: solver.solve(risk_context=RISK_CONTEXT)
+
+
+@benchmark("fahp_solve_uncached", group="engine_v2", number=20)
+def fahp_solve_uncached():
+    from app.core.engine_v2.fahp import FAHPSolver
+
+    solver = FAHPSolver()
+
+    def run():
+        FAHPSolver.clear_cache()
+        solver.solve(risk_context=RISK_CONTEXT)
+    return run
+
+
+def _topsis_inputs(n_alternatives: int):
+    from app.core.engine_v2.fahp import FAHPSolver
+
+    criteria = list(RISK_CONTEXT)
+    rng = np.random.default_rng(SEED)
+    alternatives = [
+        {c: float(np.clip(RISK_CONTEXT[c] + rng.normal(0, 0.1), 0.0, 1.0)) for c in criteria}
+        for _ in range(n_alternatives)
+    ]
+    weights = FAHPSolver().solve(risk_context=RISK_CONTEXT)
+    directions = {c: "minimize" for c in criteria}
+    return alternatives, criteria, weights, directions
+
+
+@benchmark("topsis_solve", group="engine_v2", number=100)
+def topsis_solve():
+    from app.core.engine_v2.topsis import TOPSISSolver
+
+    alternatives, criteria, weights, directions = _topsis_inputs(1)
+    solver = TOPSISSolver()
+    return lambda: solver.solve(alternatives, criteria, weights, directions)
+
+
+@benchmark("topsis_solve_batch_100", group="engine_v2", number=20)
+def topsis_solve_batch_100():
+    from app.core.engine_v2.topsis import TOPSISSolver
+
+    alternatives, criteria, weights, directions = _topsis_inputs(100)
+    solver = TOPSISSolver()
+    return lambda: solver.solve_batch(alternatives, criteria, weights, directions)
+
+
+@benchmark("risk_pipeline_run", group="engine_v2")
+def risk_pipeline_run():
+    from app.core.engine_v2.risk_pipeline import get_risk_pipeline
+
+    pipeline = get_risk_pipeline()
+    loop = asyncio.new_event_loop()
+
+    def run():
+        pipeline.climate_model.rng = np.random.default_rng(SEED)
+        loop.run_until_complete(pipeline.run(copy_of(PIPELINE_SHIPMENT)))
+    return run
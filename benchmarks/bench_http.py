@@ -0,0 +1,56 @@
+"""
+RISKCAST Benchmarks - HTTP
+End-to-end request latency through the ASGI app (TestClient, no network)
+
+Runs with the settings from harness.configure_environment: thread engine
+executor, rate limiting off, LLM replay backend.
+"""
+
+from .fixtures import HTTP_SHIPMENT
+from .harness import SkipBenchmark, benchmark
+
+_client = None
+
+
+def _get_client():
+    """One TestClient (app start-up runs once for every HTTP benchmark)"""
+    global _client
+    if _client is None:
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        _client = TestClient(app)
+        _client.__enter__()
+    return _client
+
+
+def _post_run(client):
+    response = client.post("/api/run", json=HTTP_SHIPMENT)
+    if response.status_code != 200:
+        raise SkipBenchmark(f"/api/run returned {response.status_code}")
+
+
+@benchmark("http_run", group="http")
+def http_run():
+    from app.core.utils.cache import result_cache
+
+    client = _get_client()
+    _post_run(client)
+
+    def run():
+        result_cache.clear()
+        _post_run(client)
+    return run
+
+
+@benchmark("http_run_cached", group="http", number=20)
+def http_run_cached():
+    client = _get_client()
+    _post_run(client)
+    return lambda: _post_run(client)
+
+
+@benchmark("http_metrics_scrape", group="http", number=20)
+def http_metrics_scrape():
+    client = _get_client()
+    return lambda: client.get("/metrics")
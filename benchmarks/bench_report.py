@@ -0,0 +1,16 @@
+"""
+RISKCAST Benchmarks - Reports
+PDF generation
+"""
+
+from .fixtures import REPORT_DATA, copy_of
+from .harness import benchmark
+
+
+@benchmark("pdf_generate_report", group="report")
+def pdf_generate_report():
+    # ImportError (reportlab missing or broken) reports the benchmark as skipped
+    from app.core.report.pdf_builder import PDFReportBuilder
+
+    builder = PDFReportBuilder()
+    return lambda: builder.generate_report(copy_of(REPORT_DATA))
@@ -0,0 +1,35 @@
+"""
+RISKCAST Benchmarks - V22 assessment
+generate_risk_assessment_v22 with and without the Monte Carlo module
+"""
+
+import random
+
+import numpy as np
+
+from .fixtures import SEED, V22_SHIPMENT, copy_of
+from .harness import benchmark
+
+
+def _assessment(monte_carlo: bool):
+    from app.core.engine.api_response_v22 import generate_risk_assessment_v22
+
+    shipment = copy_of(V22_SHIPMENT)
+    shipment['modules']['monte_carlo'] = monte_carlo
+
+    def run():
+        # V22 modules draw from the global generators
+        np.random.seed(SEED)
+        random.seed(SEED)
+        generate_risk_assessment_v22(copy_of(shipment))
+    return run
+
+
+@benchmark("v22_assessment", group="v22")
+def v22_assessment():
+    return _assessment(monte_carlo=True)
+
+
+@benchmark("v22_assessment_no_mc", group="v22")
+def v22_assessment_no_mc():
+    return _assessment(monte_carlo=False)
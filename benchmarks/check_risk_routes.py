@@ -0,0 +1,167 @@
+"""
+Smoke check for the /api/v1/risk routes (app/api/v1/risk_routes.py)
+
+Calls every route the router exposes with a minimal valid request and
+fails if any of them answers with a 5xx or an unexpected status. A route
+added to risk_routes without a check here is reported as unchecked.
+
+Runs offline with the benchmark settings (harness.configure_environment);
+report jobs run in threads. Scenarios are saved to and deleted from a
+temporary ScenarioStore, never the one in data/scenarios.
+
+Usage:
+    python -m benchmarks.check_risk_routes
+"""
+import base64
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+from . import harness
+
+SHIPMENT = {
+    "transport_mode": "ocean_fcl",
+    "cargo_type": "electronics",
+    "route": "vn_us",
+    "incoterm": "FOB",
+    "container": "40ft",
+    "packaging": "standard",
+    "priority": "standard",
+    "packages": 10,
+    "etd": "2025-12-01",
+    "eta": "2025-12-25",
+    "transit_time": 24,
+    "cargo_value": 100000,
+    "use_fuzzy": True,
+    "use_forecast": True,
+    "use_mc": True,
+    "use_var": True,
+    "seed": 7,
+}
+
+REPORT = {
+    "risk_score": 62.5,
+    "risk_level": "High",
+    "confidence": 0.85,
+    "profile": {"explanation": ["Smoke check report"]},
+    "matrix": {"probability": "medium", "severity": "high", "quadrant": 6,
+               "description": "Medium probability, high impact"},
+    "factors": {"delay": 0.6, "port": 0.4, "climate": 0.5},
+    "drivers": ["Long transit time"],
+    "recommendations": ["Book a backup carrier"],
+    "route": "VNSGN - USLAX",
+}
+
+
+def _png_chart() -> str:
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (800, 500), (0, 200, 160)).save(buffer, "PNG")
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+def main() -> int:
+    harness.configure_environment()
+    os.environ.setdefault("REPORT_EXECUTOR", "thread")
+
+    from app.api.v1 import risk_routes
+    from app.core.scenario_engine.scenario_store import ScenarioStore
+    from app.main import app
+
+    with tempfile.TemporaryDirectory(prefix="riskcast-scenarios-") as scenario_dir:
+        risk_routes.scenario_store = ScenarioStore(scenario_dir)
+        return _check_routes(app, risk_routes.router)
+
+
+def _check_routes(app, router) -> int:
+    from fastapi.testclient import TestClient
+
+    prefix = "/api/v1"
+    checked = set()
+    failures = []
+
+    def check(method: str, template: str, expected: int = 200, path: str = None, **kwargs):
+        checked.add((method, template))
+        response = client.request(method, prefix + (path or template), **kwargs)
+        ok = response.status_code == expected
+        print(f"{'✅' if ok else '❌'} {method:6} {template:45} {response.status_code}")
+        if not ok:
+            failures.append(f"{method} {template}: {response.status_code} {response.text[:300]}")
+        return response
+
+    with TestClient(app) as client:
+        # Analysis
+        check("POST", "/risk/analyze", json=SHIPMENT)
+        check("POST", "/risk/v2/analyze", json=SHIPMENT)
+        check("POST", "/risk/v2/rank", json={"candidates": [
+            dict(SHIPMENT, id="maersk", carrier="Maersk", pol="VNSGN", pod="USLAX"),
+            dict(SHIPMENT, id="msc", carrier="MSC", pol="VNSGN", pod="USLAX"),
+            dict(SHIPMENT, id="local", carrier="Local Feeder", pol="VNHPH", pod="USNYC", transit_time=32),
+        ]})
+
+        # Scenario simulation
+        analysis = client.post(prefix + "/risk/v2/analyze", json=SHIPMENT).json().get("result", {})
+        simulated = check("POST", "/risk/v2/simulate", json={
+            "baseline_result": analysis,
+            "adjustments": {"delay": 20},
+            "original_inputs": SHIPMENT,
+        }).json()
+        scenario = simulated.get("result", simulated)
+        deltas = check("POST", "/risk/v2/simulation/delta", json={"baseline": analysis, "scenario": scenario}).json()
+        check("POST", "/risk/v2/simulation/explain", json={
+            "baseline": analysis, "scenario": scenario, "deltas": deltas.get("result", deltas),
+        })
+        name = f"smoke-{uuid.uuid4().hex[:8]}"
+        check("POST", "/risk/v2/simulation/save", json={"name": name, "adjustments": {"delay": 20}})
+        check("GET", "/risk/v2/simulation/load/{name}", path=f"/risk/v2/simulation/load/{name}")
+        check("GET", "/risk/v2/simulation/list")
+        check("DELETE", "/risk/v2/simulation/delete/{name}", path=f"/risk/v2/simulation/delete/{name}")
+        presets = check("GET", "/risk/v2/simulation/presets").json()
+        preset_names = list(presets.get("presets", presets) or [])
+        preset = preset_names[0] if preset_names else "unknown"
+        if isinstance(preset, dict):
+            preset = preset.get("name") or preset.get("id")
+        check("GET", "/risk/v2/simulation/preset/{name}", path=f"/risk/v2/simulation/preset/{preset}")
+
+        # PDF reports
+        report = dict(REPORT, charts={"radar": _png_chart()})
+        check("POST", "/risk/v2/report/pdf", json=report)
+        job = check("POST", "/risk/v2/report/jobs", expected=202, json=dict(report, layout="a4")).json()
+        check("GET", "/risk/v2/report/jobs/{job_id}", path=f"/risk/v2/report/jobs/{job['job_id']}")
+        for _ in range(100):
+            if client.get(job["status_url"]).json()["status"] != "pending":
+                break
+            time.sleep(0.1)
+        check("GET", "/risk/v2/report/jobs/{job_id}/pdf", path=f"/risk/v2/report/jobs/{job['job_id']}/pdf")
+
+        # Batch scoring
+        batch = "\n".join(json.dumps(dict(SHIPMENT, shipment_id=f"S{i}", seed=i)) for i in range(3))
+        lines = check("POST", "/risk/batch", content=batch,
+                      headers={"content-type": "application/x-ndjson"}).text.splitlines()
+        batch_id = json.loads(lines[0])["job_id"]
+        check("GET", "/risk/batch/{job_id}", path=f"/risk/batch/{batch_id}")
+        check("GET", "/risk/batch/{job_id}/results", path=f"/risk/batch/{batch_id}/results")
+        check("DELETE", "/risk/batch/{job_id}", path=f"/risk/batch/{batch_id}")
+
+    exposed = {(method, route.path) for route in router.routes for method in route.methods}
+    unchecked = sorted(exposed - checked)
+    for method, path in unchecked:
+        print(f"⚠️  {method:6} {path:45} not checked")
+
+    print("\n" + "=" * 50)
+    if failures or unchecked:
+        for failure in failures:
+            print(f"❌ {failure}")
+        print(f"❌ {len(failures)} failing, {len(unchecked)} unchecked of {len(exposed)} routes")
+        return 1
+    print(f"✅ All {len(exposed)} risk routes answered")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""
+RISKCAST Benchmarks - Fixtures
+Fixed seeds and canned shipments shared by every benchmark
+
+Inputs never change between runs so timings are comparable across commits;
+engines that draw random numbers are seeded from SEED.
+"""
+
+import copy
+from typing import Any, Dict
+
+import numpy as np
+
+
+SEED = 20240601
+
+
+# v16 native schema (same shipment as risk_engine_v16.benchmark_engine)
+V16_SHIPMENT: Dict[str, Any] = {
+    'distance': 8500,
+    'cargo_type': 'fragile',
+    'cargo_value': 350000,
+    'packaging_quality': 6,
+    'transport_mode': 'sea',
+    'weather_risk': 7,
+    'priority': 8,
+    'container_match': 7,
+    'port_risk': 5,
+    'shipment_value': 250000,
+    'carrier_rating': 3.5,
+    'route_type': 'complex',
+    'climate_index': 6.5
+}
+
+# Option A form body accepted by POST /api/run
+HTTP_SHIPMENT: Dict[str, Any] = {
+    'transport_mode': 'ocean_fcl',
+    'cargo_type': 'electronics',
+    'route': 'vn_us',
+    'incoterm': 'FOB',
+    'container': '40ft',
+    'packaging': 'standard',
+    'priority': 'standard',
+    'packages': 10,
+    'etd': '2025-12-01',
+    'eta': '2025-12-25',
+    'transit_time': 24,
+    'cargo_value': 100000,
+    'use_fuzzy': True,
+    'use_forecast': True,
+    'use_mc': True,
+    'use_var': True
+}
+
+# Engine v2 pipeline input (Option A fields plus explicit ports)
+PIPELINE_SHIPMENT: Dict[str, Any] = dict(HTTP_SHIPMENT, pol='VNSGN', pod='USLAX')
+
+# V22 input (sample from api_response_v22)
+V22_SHIPMENT: Dict[str, Any] = {
+    "transport": {
+        "trade_lane": "Vietnam to USA",
+        "mode": "sea_freight",
+        "shipment_type": "fcl",
+        "priority": "balanced",
+        "service_route": "VNSGN-USLAX Direct",
+        "carrier": "Maersk Line",
+        "incoterm": "FOB",
+        "incoterm_location": "Ho Chi Minh Port",
+        "pol": "VNSGN",
+        "pod": "USLAX",
+        "container_type": "40hc",
+        "etd": "15/01/2026",
+        "schedule_frequency": "weekly",
+        "transit_time": 22,
+        "reliability_score": 88
+    },
+    "cargo": {
+        "cargo_type": "electronics",
+        "hs_code": "847130",
+        "packing_type": "carton",
+        "packages": 500,
+        "gross_weight": 12000.0,
+        "net_weight": 11500.0,
+        "volume_m3": 60.0,
+        "stackability": True,
+        "insurance_value": 250000.0,
+        "insurance_coverage": "icc_b",
+        "sensitivity": "fragile",
+        "dangerous_goods": False,
+        "special_instructions": "Handle with care, fragile electronics",
+        "cargo_description": "Laptop computers and accessories"
+    },
+    "seller": {
+        "company_name": "VN Electronics Co Ltd",
+        "business_type": "Manufacturer",
+        "country": "Vietnam",
+        "city": "Ho Chi Minh City",
+        "address": "123 Nguyen Hue Street",
+        "contact_person": "Nguyen Van A",
+        "contact_role": "Export Manager",
+        "email": "export@vnelectronics.com",
+        "phone": "+84901234567",
+        "tax_id": "0123456789"
+    },
+    "buyer": {
+        "company_name": "USA Tech Imports Inc",
+        "business_type": "Importer",
+        "country": "USA",
+        "city": "Los Angeles",
+        "address": "456 Main Street",
+        "contact_person": "John Smith",
+        "contact_role": "Procurement Manager",
+        "email": "john@usatechimports.com",
+        "phone": "+13105551234",
+        "tax_id": "987654321"
+    },
+    "modules": {
+        "esg": True,
+        "weather_climate": True,
+        "port_congestion": True,
+        "carrier_performance": True,
+        "market_condition": True,
+        "insurance_optimization": True,
+        "monte_carlo": True,
+        "stress_test": False
+    }
+}
+
+# FAHP/TOPSIS criteria (RiskPipeline.extract_risk_context keys, 0-1, higher = riskier)
+RISK_CONTEXT: Dict[str, float] = {
+    "delay": 0.8,
+    "port": 0.4,
+    "climate": 0.5,
+    "carrier": 0.35,
+    "esg": 0.3,
+    "equipment": 0.25
+}
+
+
+# PDF report payload (charts omitted: image rendering is benchmarked separately)
+REPORT_DATA: Dict[str, Any] = {
+    'route': 'VNSGN → USLAX',
+    'risk_score': 6.4,
+    'risk_level': 'Medium-High',
+    'confidence': 0.86,
+    'profile': {
+        'explanation': [
+            'Peak-season congestion at the destination port',
+            'Fragile electronics raise damage severity',
+            'Typhoon season overlaps the departure window'
+        ]
+    },
+    'matrix': {'probability': 'medium', 'severity': 'high', 'quadrant': 6,
+               'description': 'Medium probability, high impact'},
+    'factors': {
+        'port_congestion': 0.74, 'weather_exposure': 0.66, 'cargo_sensitivity': 0.81,
+        'carrier_reliability': 0.32, 'route_complexity': 0.55, 'climate_hazard': 0.61,
+        'customs_delay': 0.28, 'market_volatility': 0.47
+    },
+    'drivers': ['Port congestion (USLAX)', 'Cargo sensitivity', 'Typhoon exposure',
+                'Climate hazard index', 'Route complexity'],
+    'recommendations': [
+        'Book immediate cargo insurance upgrade to ICC(A)',
+        'Consider alternative routing via USLGB during peak weeks',
+        'Review packaging standards for fragile electronics',
+        'Negotiate long-term capacity agreements with reliable carriers'
+    ],
+    'timeline': [
+        {'description': 'Departure from VNSGN'},
+        {'description': 'Transshipment window'},
+        {'description': 'Arrival at USLAX'}
+    ],
+    'network': {'centrality': 0.42, 'redundancy': 0.35, 'chokepoints': 2},
+    'scenario_comparisons': [
+        {'name': 'Typhoon season', 'baseline_score': 6.4, 'simulation_score': 7.6,
+         'delta_from_baseline': 1.2, 'explanation': {'summary': 'Weather layer dominates'}},
+        {'name': 'Port strike', 'baseline_score': 6.4, 'simulation_score': 8.1,
+         'delta_from_baseline': 1.7, 'explanation': {'summary': 'Destination congestion spikes'}}
+    ],
+    'charts': {}
+}
+
+
+def copy_of(fixture: Dict[str, Any]) -> Dict[str, Any]:
+    """Deep copy so engines that annotate their input cannot leak state between rounds"""
+    return copy.deepcopy(fixture)
+
+
+def monte_carlo_inputs() -> Dict[str, Any]:
+    """
+    Layer means, volatilities, correlation and weights for V16_SHIPMENT
+
+    Returns:
+        Dict with means, volatilities, correlation, weights (numpy arrays)
+    """
+    from app.core.engine.risk_engine_v16 import MonteCarloEngine, get_shared_engine
+
+    prepared = get_shared_engine()._prepare_risk_inputs(copy_of(V16_SHIPMENT))
+    layers = prepared['layers']
+    context = prepared['base_context']
+    return {
+        'means': np.array([layer.calculate_dynamic_score(context) for layer in layers.values()]),
+        'volatilities': np.array([layer.volatility for layer in layers.values()]),
+        'correlation': MonteCarloEngine._build_correlation_matrix(tuple(layers.keys())),
+        'weights': np.asarray(prepared['adjusted_weights'], dtype=float),
+    }
+
+
+def risk_distribution(iterations: int = 50_000) -> np.ndarray:
+    """Seeded weighted risk distribution (input for financial/delay benchmarks)"""
+    from app.core.engine.risk_engine_v16 import MonteCarloEngine
+
+    inputs = monte_carlo_inputs()
+    engine = MonteCarloEngine(iterations)
+    samples = engine.generate_correlated_samples(
+        inputs['means'], inputs['volatilities'], inputs['correlation'],
+        rng=np.random.default_rng(SEED)
+    )
+    return samples @ inputs['weights']
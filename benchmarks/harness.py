@@ -0,0 +1,241 @@
+"""
+RISKCAST Benchmarks - Harness
+Registry, timing loop, result files and baseline comparison
+
+A benchmark is a setup function decorated with @benchmark that returns the
+callable to time. Setup (engine construction, fixture preparation, first-use
+imports) is not timed; each round calls the callable ``number`` times and
+records the mean per call. Results keep min/median/mean/stdev/max over
+rounds; comparisons use the median, which is robust to the odd slow round.
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+DEFAULT_THRESHOLD = 0.20  # 20% slower than baseline = regression
+
+
+class SkipBenchmark(Exception):
+    """Raised by a setup function when the benchmark cannot run here"""
+
+
+@dataclass
+class Benchmark:
+    name: str
+    group: str
+    setup: Callable[[], Callable[[], Any]]
+    rounds: int = 5
+    number: int = 1
+    warmup: int = 1
+
+
+_REGISTRY: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: Optional[str] = None, group: str = "", rounds: int = 5,
+              number: int = 1, warmup: int = 1):
+    """
+    Register a benchmark setup function
+
+    Args:
+        name: Benchmark name (default: function name)
+        group: Group shown in reports (e.g. "engine", "http")
+        rounds: Timed rounds
+        number: Calls per round (raise for sub-millisecond callables)
+        warmup: Untimed calls before the first round
+    """
+    def decorator(setup: Callable[[], Callable[[], Any]]):
+        bench_name = name or setup.__name__
+        if bench_name in _REGISTRY:
+            raise ValueError(f"Duplicate benchmark name: {bench_name}")
+        _REGISTRY[bench_name] = Benchmark(bench_name, group, setup, rounds, number, warmup)
+        return setup
+    return decorator
+
+
+def configure_environment() -> None:
+    """Deterministic, offline settings; explicit environment values win"""
+    defaults = {
+        "LLM_BACKEND": "replay",            # never call the real API
+        "LLM_REASONING_ENABLED": "false",
+        "RATE_LIMIT_ENABLED": "false",
+        "ENGINE_EXECUTOR": "thread",        # same-process timing, no pool start-up
+        "LOG_LEVEL": "WARNING",
+    }
+    for key, value in defaults.items():
+        os.environ.setdefault(key, value)
+    if str(ROOT_DIR) not in sys.path:
+        sys.path.insert(0, str(ROOT_DIR))
+
+
+def load_benchmarks() -> Dict[str, Benchmark]:
+    """Import every benchmarks/bench_*.py module and return the registry"""
+    import importlib
+    for path in sorted(Path(__file__).resolve().parent.glob("bench_*.py")):
+        importlib.import_module(f"benchmarks.{path.stem}")
+    return _REGISTRY
+
+
+def run_benchmark(bench: Benchmark, rounds: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Time one benchmark
+
+    Setup failures from missing optional pieces are reported as "skipped";
+    any other exception is reported as "error" (and fails a comparison).
+    """
+    try:
+        fn = bench.setup()
+    except (SkipBenchmark, ImportError) as e:
+        return {"group": bench.group, "status": "skipped", "reason": f"{type(e).__name__}: {e}"}
+    except Exception as e:
+        return {"group": bench.group, "status": "error", "reason": f"{type(e).__name__}: {e}"}
+
+    timings = []
+    try:
+        for _ in range(bench.warmup):
+            fn()
+        for _ in range(rounds or bench.rounds):
+            start = time.perf_counter()
+            for _ in range(bench.number):
+                fn()
+            timings.append((time.perf_counter() - start) / bench.number)
+    except Exception as e:
+        return {"group": bench.group, "status": "error", "reason": f"{type(e).__name__}: {e}"}
+
+    return {
+        "group": bench.group,
+        "status": "ok",
+        "rounds": len(timings),
+        "number": bench.number,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "max": max(timings),
+    }
+
+
+def environment_info() -> Dict[str, Any]:
+    """Machine/software description stored with results (timings are only comparable on the same setup)"""
+    info = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+    for module in ("numpy", "scipy", "fastapi"):
+        try:
+            info[module] = __import__(module).__version__
+        except ImportError:
+            pass
+    try:
+        info["git_commit"] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+            capture_output=True, text=True, timeout=10,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        info["git_commit"] = None
+    return info
+
+
+def run_all(pattern: Optional[str] = None, rounds: Optional[int] = None,
+            progress: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Run registered benchmarks
+
+    Args:
+        pattern: fnmatch pattern on benchmark names (None = all)
+        rounds: Override every benchmark's round count
+        progress: Called with (name, result) after each benchmark
+
+    Returns:
+        {"environment": {...}, "benchmarks": {name: result}}
+    """
+    results = {}
+    for name, bench in load_benchmarks().items():
+        if pattern and not fnmatch(name, pattern):
+            continue
+        results[name] = run_benchmark(bench, rounds)
+        if progress:
+            progress(name, results[name])
+    return {"environment": environment_info(), "benchmarks": results}
+
+
+def save_results(results: Dict[str, Any], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load_results(path: Path) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any],
+            threshold: float = DEFAULT_THRESHOLD, metric: str = "median") -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Compare two result sets
+
+    Args:
+        baseline: Stored baseline results
+        current: New results
+        threshold: Relative slowdown treated as a regression (0.2 = 20%)
+        metric: Timing statistic to compare
+
+    Returns:
+        (one row per benchmark, names of regressed or failing benchmarks)
+    """
+    rows = []
+    regressions = []
+    base_benchmarks = baseline.get("benchmarks", {})
+    for name, result in current.get("benchmarks", {}).items():
+        base = base_benchmarks.get(name)
+        row = {"name": name, "baseline": None, "current": None, "change": None, "status": "new"}
+        if result.get("status") == "error":
+            row["status"] = "ERROR"
+            regressions.append(name)
+        elif result.get("status") != "ok":
+            row["status"] = "skipped"
+        elif base is None or base.get("status") != "ok":
+            row["current"] = result[metric]
+        else:
+            row["baseline"], row["current"] = base[metric], result[metric]
+            row["change"] = (row["current"] - row["baseline"]) / row["baseline"] if row["baseline"] else 0.0
+            if row["change"] > threshold:
+                row["status"] = "REGRESSION"
+                regressions.append(name)
+            elif row["change"] < -threshold:
+                row["status"] = "improved"
+            else:
+                row["status"] = "ok"
+        rows.append(row)
+    for name in base_benchmarks:
+        if name not in current.get("benchmarks", {}):
+            rows.append({"name": name, "baseline": base_benchmarks[name].get(metric),
+                         "current": None, "change": None, "status": "missing"})
+    return rows, regressions
+
+
+def format_seconds(value: Optional[float]) -> str:
+    if value is None:
+        return "-"
+    if value < 1e-3:
+        return f"{value * 1e6:.1f}us"
+    if value < 1:
+        return f"{value * 1e3:.2f}ms"
+    return f"{value:.3f}s"